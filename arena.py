@@ -0,0 +1,184 @@
+"""
+Multi-snake arena rules
+Dozens to hundreds of AI and human snakes share one board. All collision checks go
+through the shared occupancy grid, so a tick costs O(1) per snake no matter how many
+snakes are alive or how long they are.
+"""
+
+import random
+from collections import deque
+from bots import greedy_direction
+from world import DIRECTIONS, World
+
+# Values stored in the shared occupancy grid
+EMPTY = 0
+FOOD = 1
+SNAKE_BASE = 2  # Snake n is stored as SNAKE_BASE + n
+
+# Change log entries, in the order they happened
+MOVE = 0        # (MOVE, snake id, x, y, grew)
+DIE = 1         # (DIE, snake id)
+SPAWN = 2       # (SPAWN, snake id, x, y, direction index)
+FOOD_ADD = 3    # (FOOD_ADD, x, y)
+FOOD_REMOVE = 4 # (FOOD_REMOVE, x, y)
+
+
+class ArenaSnake:
+    def __init__(self, snake_id, start, direction, is_ai=True):
+        self.id = snake_id
+        self.mark = SNAKE_BASE + snake_id
+        self.body = deque([start])
+        self.direction = direction
+        self.is_ai = is_ai
+        self.alive = True
+        self.score = 0
+        self.target = None  # Food cell an AI snake is heading for
+
+
+class Arena:
+    def __init__(self, width, height, ai_snakes=50, human_snakes=0, food_count=None,
+                 respawn=True, minimap_size=0, seed=None, track_changes=False):
+        self.world = World(width, height, minimap_size)
+        self.random = random.Random(seed)
+        self.respawn = respawn
+        self.food_count = food_count if food_count is not None else max(1, (ai_snakes + human_snakes) * 2)
+        self.ticks = 0
+
+        # Change log for network deltas, emptied by whoever sends them
+        self.track_changes = track_changes
+        self.changes = []
+
+        # Food is kept in a list plus an index so random picks and removals are O(1)
+        self.foods = []
+        self.food_index = {}
+
+        self.snakes = []
+        for _ in range(human_snakes):
+            self.spawn_snake(is_ai=False)
+        for _ in range(ai_snakes):
+            self.spawn_snake(is_ai=True)
+        self.refill_food()
+
+    def random_free_cell(self):
+        """Find a random empty cell (expected O(1) while the board isn't crowded)"""
+        world = self.world
+        while True:
+            x = self.random.randrange(world.width)
+            y = self.random.randrange(world.height)
+            if world.is_free(x, y):
+                return (x, y)
+
+    def spawn_snake(self, is_ai=True):
+        """Add a one-segment snake at a random empty cell"""
+        snake = ArenaSnake(len(self.snakes), self.random_free_cell(),
+                           self.random.choice(DIRECTIONS), is_ai)
+        self.world.occupy(snake.body[0][0], snake.body[0][1], snake.mark)
+        self.snakes.append(snake)
+        if self.track_changes:
+            self.changes.append((SPAWN, snake.id, *snake.body[0], DIRECTIONS.index(snake.direction)))
+        return snake
+
+    def respawn_snake(self, snake):
+        """Bring a dead snake back as a new one-segment snake"""
+        start = self.random_free_cell()
+        snake.body = deque([start])
+        snake.direction = self.random.choice(DIRECTIONS)
+        snake.alive = True
+        snake.score = 0
+        snake.target = None
+        self.world.occupy(start[0], start[1], snake.mark)
+        if self.track_changes:
+            self.changes.append((SPAWN, snake.id, *start, DIRECTIONS.index(snake.direction)))
+
+    def add_food(self, cell):
+        """Place food on an empty cell"""
+        self.food_index[cell] = len(self.foods)
+        self.foods.append(cell)
+        self.world.occupy(cell[0], cell[1], FOOD)
+        if self.track_changes:
+            self.changes.append((FOOD_ADD, *cell))
+
+    def remove_food(self, cell):
+        """Remove eaten food by swapping it with the last entry"""
+        i = self.food_index.pop(cell)
+        last = self.foods.pop()
+        if last != cell:
+            self.foods[i] = last
+            self.food_index[last] = i
+        self.world.vacate(cell[0], cell[1])
+        if self.track_changes:
+            self.changes.append((FOOD_REMOVE, *cell))
+
+    def refill_food(self):
+        """Top the board back up to food_count pieces of food"""
+        while len(self.foods) < self.food_count:
+            self.add_food(self.random_free_cell())
+
+    def is_safe(self, x, y):
+        """Check if a head can move onto a cell without dying"""
+        world = self.world
+        return 0 <= x < world.width and 0 <= y < world.height and world.cells[y * world.width + x] < SNAKE_BASE
+
+    def steer(self, snake):
+        """Choose the next direction for an AI snake"""
+        if snake.target not in self.food_index and self.foods:
+            snake.target = self.random.choice(self.foods)
+        return greedy_direction(snake.body[0], snake.direction, snake.target, self.is_safe)
+
+    def kill(self, snake):
+        """Remove a dead snake's body from the board"""
+        snake.alive = False
+        for x, y in snake.body:
+            self.world.vacate(x, y)
+        if self.track_changes:
+            self.changes.append((DIE, snake.id))
+
+    def tick(self):
+        """Move every live snake one cell; returns the snakes that died this tick"""
+        self.ticks += 1
+        world = self.world
+        width, height, cells = world.width, world.height, world.cells
+
+        # Work out every new head first so moves are simultaneous
+        moves = []
+        claims = {}
+        for snake in self.snakes:
+            if not snake.alive:
+                continue
+            if snake.is_ai:
+                snake.direction = self.steer(snake)
+            head_x, head_y = snake.body[0]
+            new_head = (head_x + snake.direction[0], head_y + snake.direction[1])
+            moves.append((snake, new_head))
+            claims[new_head] = claims.get(new_head, 0) + 1
+
+        # Walls, any body (tails included) and head-on crashes are all deadly
+        dead = []
+        survivors = []
+        for snake, (x, y) in moves:
+            if (not (0 <= x < width and 0 <= y < height) or claims[(x, y)] > 1
+                    or cells[y * width + x] >= SNAKE_BASE):
+                dead.append(snake)
+            else:
+                survivors.append((snake, (x, y)))
+
+        for snake, new_head in survivors:
+            ate = new_head in self.food_index
+            if ate:
+                self.remove_food(new_head)
+                snake.score += 10
+            snake.body.appendleft(new_head)
+            world.occupy(new_head[0], new_head[1], snake.mark)
+            if not ate:
+                tail_x, tail_y = snake.body.pop()
+                world.vacate(tail_x, tail_y)
+            if self.track_changes:
+                self.changes.append((MOVE, snake.id, *new_head, ate))
+
+        for snake in dead:
+            self.kill(snake)
+            if self.respawn and snake.is_ai:
+                self.respawn_snake(snake)
+
+        self.refill_food()
+        return dead
@@ -0,0 +1,118 @@
+"""
+Snake Game - Arena Mode
+You against dozens of AI snakes on one board. Scores go to the same MySQL leaderboard.
+"""
+
+import pygame
+from arena import Arena, FOOD, SNAKE_BASE
+from config import GAME_CONFIG
+from snake_game import SnakeGame
+
+class ArenaGame(SnakeGame):
+    USES_OBSTACLE_MAP = False  # Arena never loads walls, so drawing a map would show walls snakes pass through
+
+    def __init__(self):
+        self.arena = None
+        self.player = None
+        # Colors for AI snakes, picked by snake id
+        self.SNAKE_COLORS = [(30, 144, 255), (255, 165, 0), (186, 85, 211), (255, 215, 0),
+                             (0, 206, 209), (255, 105, 180), (210, 105, 30), (154, 205, 50)]
+        super().__init__()
+        pygame.display.set_caption("Snake Game - Arena Mode")
+    
+    def reset_game(self):
+        """Start a fresh arena with the player as snake 0"""
+        self.arena = Arena(self.GRID_WIDTH, self.GRID_HEIGHT,
+                           ai_snakes=GAME_CONFIG['arena_ai_snakes'], human_snakes=1,
+                           food_count=GAME_CONFIG['arena_food'],
+                           minimap_size=self.world.minimap and GAME_CONFIG['minimap_size'])
+        self.world = self.arena.world
+        self.player = self.arena.snakes[0]
+        self.snake = self.player.body
+        self.direction = self.player.direction
+        self.food = None  # Food lives in the arena's occupancy grid
+        self.score = 0
+        self.level = 1
+        self.speed = 10
+        self.camera.follow(*self.snake[0])
+        self.inputs.clear()
+        self.next_step = 0.0
+        
+        # The arena has its own world, so point the minimap surface at its buffer
+        if self.world.minimap:
+            minimap = self.world.minimap
+            self.minimap_surface = pygame.image.frombuffer(
+                minimap.pixels, (minimap.width, minimap.height), 'RGB')
+    
+    def update_snake(self):
+        """Advance every snake in the arena by one tick"""
+        self.player.direction = self.direction
+        self.arena.tick()
+        self.snake = self.player.body
+        
+        # Level up every 50 points
+        if self.player.score > self.score and self.player.score % 50 == 0:
+            self.level += 1
+            self.speed += 2
+        self.score = self.player.score
+        
+        self.camera.follow(*self.snake[0])
+        return self.player.alive
+    
+    def draw_snake(self):
+        """Draw every visible snake and piece of food from the occupancy grid"""
+        cells = self.world.cells
+        world_width = self.world.width
+        size = self.GRID_SIZE
+        
+        for row in range(self.camera.y, self.camera.y + self.camera.rows):
+            start = row * world_width + self.camera.x
+            visible = cells[start:start + self.camera.cols]
+            if not any(visible):
+                continue
+            
+            for col, mark in enumerate(visible):
+                if not mark:
+                    continue
+                rect = pygame.Rect(col * size, (row - self.camera.y) * size, size, size)
+                if mark == FOOD:
+                    pygame.draw.rect(self.screen, self.RED, rect)
+                    continue
+                
+                snake_id = mark - SNAKE_BASE
+                color = self.GREEN if snake_id == self.player.id else \
+                    self.SNAKE_COLORS[snake_id % len(self.SNAKE_COLORS)]
+                pygame.draw.rect(self.screen, color, rect)
+                pygame.draw.rect(self.screen, (0, 0, 0), rect, 1)
+        
+        # Outline the player's head so it stands out in the crowd
+        if self.player.alive and self.camera.contains(*self.snake[0]):
+            head = pygame.Rect(*self.to_screen(*self.snake[0]), size, size)
+            pygame.draw.rect(self.screen, self.WHITE, head, 2)
+    
+    def save_game(self):
+        """Arena games can't be saved"""
+        print("⚠️  Saving isn't available in arena mode")
+    
+    def resume_game(self):
+        """Arena games can't be resumed"""
+        print("⚠️  Saving isn't available in arena mode")
+    
+    def draw_food(self):
+        """Food is drawn together with the snakes"""
+        pass
+
+if __name__ == "__main__":
+    print("="*60)
+    print("SNAKE GAME - ARENA MODE")
+    print("="*60)
+    print(f"\n🐍 {GAME_CONFIG['arena_ai_snakes']} AI snakes on a "
+          f"{GAME_CONFIG['world_width']}x{GAME_CONFIG['world_height']} board")
+    print("   • Head-on crashes kill both snakes")
+    print("   • Touching any body or wall is deadly")
+    if GAME_CONFIG['obstacle_map']:
+        print("   • Obstacle maps aren't used in arena mode")
+    print("\n" + "="*60)
+    
+    game = ArenaGame()
+    game.run()
@@ -0,0 +1,42 @@
+"""
+Arena tick benchmark
+Ticks hundreds of AI snakes on a large board and reports the cost per snake per tick.
+Run from the project folder: python -m benchmarks.arena_benchmark
+"""
+
+import argparse
+import time
+from arena import Arena
+
+def run(snakes, size, ticks, seed):
+    """Tick an arena and return (seconds, snake moves made)"""
+    arena = Arena(size, size, ai_snakes=snakes, seed=seed)
+    
+    # Let the snakes grow a bit before timing
+    for _ in range(50):
+        arena.tick()
+    
+    moves = 0
+    start = time.perf_counter()
+    for _ in range(ticks):
+        moves += sum(1 for snake in arena.snakes if snake.alive)
+        arena.tick()
+    return time.perf_counter() - start, moves
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark multi-snake arena ticks")
+    parser.add_argument("--snakes", type=int, default=500)
+    parser.add_argument("--size", type=int, default=1000, help="Board width and height in cells")
+    parser.add_argument("--ticks", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    
+    print("="*60)
+    print(f"ARENA BENCHMARK - {args.size}x{args.size} board, {args.ticks} ticks")
+    print("="*60)
+    
+    # Per-snake cost should stay flat as the snake count grows
+    for count in sorted({max(1, args.snakes // 10), args.snakes}):
+        elapsed, moves = run(count, args.size, args.ticks, args.seed)
+        print(f"{count:>5} snakes: {args.ticks / elapsed:8.1f} ticks/s, "
+              f"{elapsed / moves * 1e6:6.2f} µs per snake per tick")
@@ -0,0 +1,69 @@
+"""
+Search state benchmark
+Compares branching a game with copy.deepcopy of a SnakeEngine against GameState.clone,
+and measures step/undo pairs, at several snake lengths.
+Run from the project folder: python -m benchmarks.clone_benchmark
+"""
+
+import argparse
+import copy
+import time
+from engine import SnakeEngine
+from state import GameState
+
+def serpentine(width, length):
+    """A body of the given length laid back and forth across the top rows, head first"""
+    cells = []
+    for i in range(length):
+        row, col = divmod(i, width)
+        cells.append((col if row % 2 == 0 else width - 1 - col, row))
+    return cells[::-1]
+
+def rate(func, seconds):
+    """Calls per second of func over roughly the given time"""
+    calls = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            func()
+        calls += 100
+    return calls / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark state cloning for search bots")
+    parser.add_argument("--size", type=int, default=100, help="Board width and height in cells")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Time per measurement")
+    args = parser.parse_args()
+
+    print("="*60)
+    print(f"CLONE BENCHMARK - {args.size}x{args.size} board")
+    print("="*60)
+
+    for length in (10, 100, 1000, 5000):
+        if length > args.size * (args.size - 1):
+            print(f"{length:>5} segments: skipped, doesn't fit on the board with a free row below")
+            continue
+        body = serpentine(args.size, length)
+        engine = SnakeEngine(args.size, args.size)
+        food = (args.size - 1, args.size - 1)
+        engine.load_state(body, (1, 0) if (length - 1) // args.size % 2 == 0 else (-1, 0),
+                          food, 0, 1, 10, length)
+        state = GameState.from_engine(engine)
+        down = 1  # The row below the head is always free in this layout
+
+        def step_undo():
+            state.step(down)
+            state.undo()
+
+        deepcopies = rate(lambda: copy.deepcopy(engine), args.seconds / 4)
+        clones = rate(state.clone, args.seconds)
+        state.forget()
+        steps = rate(step_undo, args.seconds)
+
+        # A clone that moves pays for its copy-on-write once
+        def branch():
+            state.clone().step(down)
+        branches = rate(branch, args.seconds)
+        print(f"{length:>5} segments: deepcopy {deepcopies:>9,.0f}/s  clone {clones:>10,.0f}/s  "
+              f"clone+step {branches:>9,.0f}/s  step+undo {steps:>9,.0f}/s")
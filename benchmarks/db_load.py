@@ -0,0 +1,127 @@
+"""
+Leaderboard database load test
+Simulated players each get their own DatabaseManager (one connection, like a real game
+client) and follow a simple behavior model: log in, play a few games with a pause between
+them, save every score and now and then look at the leaderboard. Runs against the local
+sqlite stand-in by default, or the MySQL server from config.py with --mysql.
+Run from the project folder: python -m benchmarks.db_load --players 1,10,50
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+import localdb
+from database import DatabaseManager
+from benchmarks.server_load import percentile
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)  # Operation name -> seconds per call
+        self.errors = defaultdict(int)
+
+    def record(self, operation, seconds, ok):
+        with self.lock:
+            self.latencies[operation].append(seconds)
+            if not ok:
+                self.errors[operation] += 1
+
+def timed(stats, operation, func, *args):
+    """Call a DatabaseManager method and record its latency and whether it worked"""
+    start = time.perf_counter()
+    try:
+        result = func(*args)
+        ok = result is not None and result is not False
+    except Exception:
+        result, ok = None, False  # DatabaseManager should catch these - count them anyway
+    stats.record(operation, time.perf_counter() - start, ok)
+    return result
+
+def player(number, args, stats, deadline):
+    """One simulated player session, repeated until the deadline"""
+    rng = random.Random(args.seed * 100003 + number)
+    db = DatabaseManager(connect=False, connector=args.connector, config=args.config)
+    try:
+        while time.perf_counter() < deadline:
+            user_id = timed(stats, "register_user", db.register_user, f"loadbot{number}")
+            if not user_id:
+                time.sleep(args.think)
+                continue
+            for _ in range(rng.randint(1, args.games)):
+                time.sleep(rng.uniform(0, 2 * args.think))  # Playing a game
+                score = rng.randrange(0, 500, 10)
+                timed(stats, "save_score", db.save_score, user_id, score, score // 50 + 1)
+                if rng.random() < args.leaderboard_rate:
+                    timed(stats, "get_leaderboard", db.get_leaderboard, 10)
+                if time.perf_counter() >= deadline:
+                    break
+    finally:
+        db.close()
+
+def run(players, args):
+    """Run one load level and return its Stats and elapsed seconds"""
+    stats = Stats()
+    deadline = time.perf_counter() + args.duration
+    threads = [threading.Thread(target=player, args=(number, args, stats, deadline), daemon=True)
+               for number in range(players)]
+    start = time.perf_counter()
+    # DatabaseManager prints a line per saved score - keep the report readable
+    with open(os.devnull, 'w') as quiet, contextlib.redirect_stdout(quiet):
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return stats, time.perf_counter() - start
+
+def report(players, stats, elapsed):
+    """Print throughput, latency percentiles and error rate per operation"""
+    total = sum(len(values) for values in stats.latencies.values())
+    errors = sum(stats.errors.values())
+    print(f"\n{players} players: {total / elapsed:8.1f} ops/s, "
+          f"{errors / max(total, 1) * 100:.2f}% errors")
+    for operation in ("register_user", "save_score", "get_leaderboard"):
+        values = stats.latencies.get(operation)
+        if not values:
+            continue
+        print(f"   {operation:<16} {len(values):>7} calls  "
+              f"p50 {percentile(values, 50) * 1000:7.2f} ms  "
+              f"p95 {percentile(values, 95) * 1000:7.2f} ms  "
+              f"p99 {percentile(values, 99) * 1000:7.2f} ms  "
+              f"errors {stats.errors.get(operation, 0)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the leaderboard database")
+    parser.add_argument("--players", default="1,10,50", help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per level")
+    parser.add_argument("--games", type=int, default=5, help="Most games per login")
+    parser.add_argument("--think", type=float, default=0.05, help="Average seconds of play per game")
+    parser.add_argument("--leaderboard-rate", type=float, default=0.3,
+                        help="Chance of viewing the leaderboard after a game")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Simulated round trip per statement in ms (local stand-in only)")
+    parser.add_argument("--mysql", action="store_true", help="Use the MySQL server from config.py")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.mysql:
+        args.connector, args.config = None, None
+        target = "MySQL from config.py"
+    else:
+        path = os.path.join(tempfile.mkdtemp(prefix="snake-load-"), "loadtest.sqlite3")
+        args.connector = localdb
+        args.config = {'database': path, 'latency': args.latency / 1000}
+        target = f"local stand-in {path}"
+
+    print("="*60)
+    print(f"DATABASE LOAD TEST - {target}, {args.duration:.0f}s per level")
+    print("="*60)
+
+    # Latency should hold steady until the database saturates, then climb with players
+    for players in [int(count) for count in args.players.split(",")]:
+        stats, elapsed = run(players, args)
+        report(players, stats, elapsed)
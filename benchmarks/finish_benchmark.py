@@ -0,0 +1,85 @@
+"""
+End-of-game database benchmark
+Times what happens after every game three ways: separate save_score (which updates the
+user stats), get_leaderboard and get_rank calls; finish_game as prepared statements in one transaction;
+and finish_game as one call of the stored procedure. Runs against the local sqlite stand-in
+by default (with a simulated round trip per statement), or the MySQL server from config.py
+with --mysql.
+Run from the project folder: python -m benchmarks.finish_benchmark --latency 1
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import tempfile
+import time
+import localdb
+from database import DatabaseManager
+from benchmarks.server_load import percentile
+
+def separate_calls(db, user_id, score, level):
+    """The old path: one call per piece of work"""
+    db.save_score(user_id, score, level)
+    db.get_leaderboard(10)
+    db.get_rank(score)
+
+def measure(db, user_id, games, path, seed):
+    """Seconds per finished game for one path"""
+    rng = random.Random(seed)
+    timings = []
+    for _ in range(games):
+        score = rng.randrange(0, 500, 10)
+        start = time.perf_counter()
+        path(db, user_id, score, score // 50 + 1)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark saving a finished game")
+    parser.add_argument("--games", type=int, default=500, help="Games saved per path")
+    parser.add_argument("--latency", type=float, default=1.0,
+                        help="Simulated round trip per statement in ms (local stand-in only)")
+    parser.add_argument("--mysql", action="store_true", help="Use the MySQL server from config.py")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.mysql:
+        db = DatabaseManager()
+        target = "MySQL from config.py"
+    else:
+        path = os.path.join(tempfile.mkdtemp(prefix="snake-finish-"), "finish.sqlite3")
+        db = DatabaseManager(connector=localdb, config={'database': path, 'latency': args.latency / 1000})
+        target = f"local stand-in, {args.latency:g} ms per round trip"
+    if db.status != "CONNECTED":
+        raise SystemExit(1)
+    user_id = db.register_user("finish_bench")
+
+    print("="*60)
+    print(f"FINISH GAME BENCHMARK - {target}, {args.games} games per path")
+    print("="*60)
+
+    def prepared(db, user_id, score, level):
+        db.use_procedure = False
+        db.finish_game(user_id, score, level)
+
+    def procedure(db, user_id, score, level):
+        db.use_procedure = True
+        db.finish_game(user_id, score, level)
+
+    results = []
+    # DatabaseManager prints a line per saved score - keep the report readable
+    with open(os.devnull, 'w') as quiet, contextlib.redirect_stdout(quiet):
+        for name, path in (("separate calls", separate_calls), ("finish_game, prepared", prepared),
+                           ("finish_game, procedure", procedure)):
+            results.append((name, measure(db, user_id, args.games, path, args.seed)))
+        procedure_installed = db.use_procedure
+    db.close()
+
+    baseline = percentile(results[0][1], 50)
+    for name, timings in results:
+        p50 = percentile(timings, 50)
+        print(f"{name:<24} p50 {p50 * 1000:7.2f} ms  p95 {percentile(timings, 95) * 1000:7.2f} ms  "
+              f"({baseline / p50:.1f}x)")
+    if not procedure_installed:
+        print("⚠️  finish_game procedure not installed - the procedure row used prepared statements")
@@ -0,0 +1,99 @@
+"""
+Snake rendering benchmark
+Draws snakes of growing length with the sprite atlas and with the old two rectangles per
+segment, and reports the cost per frame. Runs without a window (SDL dummy video driver).
+Run from the project folder: python -m benchmarks.render_benchmark
+"""
+
+import argparse
+import os
+import time
+from collections import deque
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+from engine import SnakeEngine
+from snake_game import SnakeGame
+from sprites import SegmentAtlas
+from world import Camera
+
+class Scene(SnakeEngine):
+    """Just enough of SnakeGame to call its draw_snake"""
+    draw_snake = SnakeGame.draw_snake
+    to_screen = SnakeGame.to_screen
+
+    def __init__(self, screen, grid_size, world_size):
+        self.screen = screen
+        self.GRID_SIZE = grid_size
+        self.GREEN = (50, 205, 50)
+        self.camera = Camera(screen.get_width() // grid_size, screen.get_height() // grid_size,
+                             world_size, world_size)
+        self.atlas = SegmentAtlas(grid_size, self.GREEN)
+        super().__init__(world_size, world_size)
+
+    def grow_to(self, length):
+        """Lay out a snake of the given length back and forth across the top rows"""
+        width = self.GRID_WIDTH
+        cells = []
+        for i in range(length):
+            row, col = divmod(i, width)
+            cells.append((col if row % 2 == 0 else width - 1 - col, row))
+        body = deque(reversed(cells))  # Head is the last cell laid out
+        food = (0, self.GRID_HEIGHT - 1)
+        direction = (1, 0) if (length - 1) // width % 2 == 0 else (-1, 0)
+        self.load_state(body, direction, food, 0, 1, 10, length)
+        self.camera.follow(*self.snake[0])
+
+def draw_per_segment(scene):
+    """The renderer the atlas replaced: a shade and two rectangles per visible segment"""
+    camera = scene.camera
+    cells = scene.world.cells
+    length = len(scene.snake)
+    for row in range(camera.y, camera.y + camera.rows):
+        start = row * scene.world.width + camera.x
+        for col, seq in enumerate(cells[start:start + camera.cols]):
+            if not seq:
+                continue
+            i = scene.head_seq - seq
+            gradient = max(0.3, 1.0 - (i / length * 0.7))
+            color = tuple(int(channel * gradient) for channel in scene.GREEN)
+            rect = pygame.Rect(col * scene.GRID_SIZE, (row - camera.y) * scene.GRID_SIZE,
+                               scene.GRID_SIZE, scene.GRID_SIZE)
+            pygame.draw.rect(scene.screen, color, rect)
+            pygame.draw.rect(scene.screen, (0, 100, 0), rect, 1)
+
+def time_frames(draw, scene, frames):
+    """Average milliseconds per call of draw(scene)"""
+    draw(scene)  # Warm up (and bake the atlas)
+    start = time.perf_counter()
+    for _ in range(frames):
+        draw(scene)
+    return (time.perf_counter() - start) / frames * 1000
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark snake body rendering")
+    parser.add_argument("--world", type=int, default=200, help="World width and height in cells")
+    parser.add_argument("--grid", type=int, default=20, help="Cell size in pixels")
+    parser.add_argument("--buckets", type=int, default=32, help="Shades baked into the atlas")
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+
+    pygame.display.init()
+    screen = pygame.display.set_mode((800, 600))
+
+    print("="*60)
+    print(f"RENDER BENCHMARK - {args.world}x{args.world} world, {args.buckets} shades")
+    print("="*60)
+
+    from config import GAME_CONFIG
+    GAME_CONFIG['gradient_buckets'] = args.buckets
+    scene = Scene(screen, args.grid, args.world)
+    for length in (10, 100, 1000, 10000, 40000):
+        if length > args.world * args.world // 2:
+            break
+        scene.grow_to(length)
+        atlas_ms = time_frames(Scene.draw_snake, scene, args.frames)
+        rect_ms = time_frames(draw_per_segment, scene, args.frames)
+        print(f"{length:>6} segments: atlas {atlas_ms:6.3f} ms/frame, "
+              f"per-segment rects {rect_ms:6.3f} ms/frame ({rect_ms / atlas_ms:4.1f}x)")
+    print(f"Atlas builds: {scene.atlas.builds}")
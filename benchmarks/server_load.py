@@ -0,0 +1,129 @@
+"""
+Multiplayer server load test
+Connects hundreds of simulated players over localhost, keeps a mirror of each room from
+the deltas and checks every mirror against a fresh snapshot at the end.
+Run from the project folder: python -m benchmarks.server_load --spawn-server
+"""
+
+import argparse
+import asyncio
+import random
+import subprocess
+import sys
+import time
+from world import DIRECTIONS
+from config import SERVER_CONFIG
+import protocol
+
+class Stats:
+    def __init__(self):
+        self.messages = 0
+        self.bytes = 0
+        self.intervals = []
+        self.errors = 0
+        self.verified = 0
+        self.mismatched = 0
+
+def percentile(values, pct):
+    """Get a percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+async def player(number, args, stats, deadline):
+    """One simulated player: join, turn now and then, mirror the room, then verify it"""
+    rng = random.Random(number)
+    try:
+        reader, writer = await asyncio.open_connection(args.host, args.port)
+    except OSError:
+        stats.errors += 1
+        return
+    writer.write(protocol.encode_join(f"room-{number % args.rooms}", f"loadbot{number}"))
+
+    mirror = protocol.RoomMirror()
+    last_delta = None
+    try:
+        while time.perf_counter() < deadline:
+            payload = await asyncio.wait_for(protocol.read_message(reader, None), 5)
+            now = time.perf_counter()
+            stats.messages += 1
+            stats.bytes += len(payload) + protocol.FRAME.size
+            if payload[:1] == protocol.DELTA:
+                if last_delta:
+                    stats.intervals.append(now - last_delta)
+                last_delta = now
+            mirror.apply(payload)
+
+            # Players change direction every few ticks
+            if rng.random() < args.turn_rate:
+                writer.write(protocol.encode_turn(rng.choice(DIRECTIONS)))
+
+        # The server answers a resync with this tick's delta and then the snapshot
+        writer.write(protocol.encode_resync())
+        while True:
+            payload = await asyncio.wait_for(protocol.read_message(reader, None), 5)
+            if payload[:1] == protocol.SNAPSHOT:
+                break
+            mirror.apply(payload)
+        fresh = protocol.RoomMirror()
+        fresh.apply(payload)
+        if mirror.matches(fresh):
+            stats.verified += 1
+        else:
+            stats.mismatched += 1
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+        stats.errors += 1
+    finally:
+        writer.close()
+
+async def main(args):
+    stats = Stats()
+    deadline = time.perf_counter() + args.seconds
+
+    # Ramp up so the server isn't hit by every connect at once
+    tasks = []
+    for number in range(args.clients):
+        tasks.append(asyncio.create_task(player(number, args, stats, deadline)))
+        if number % 50 == 49:
+            await asyncio.sleep(0.05)
+    await asyncio.gather(*tasks)
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the multiplayer Snake server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=SERVER_CONFIG['port'])
+    parser.add_argument("--clients", type=int, default=300)
+    parser.add_argument("--rooms", type=int, default=10)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--turn-rate", type=float, default=0.2, help="Chance of a turn per tick")
+    parser.add_argument("--spawn-server", action="store_true", help="Start server.py --no-db first")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn_server:
+        server = subprocess.Popen([sys.executable, "server.py", "--no-db", "--port", str(args.port)])
+        time.sleep(1.0)
+
+    print("="*60)
+    print(f"SERVER LOAD TEST - {args.clients} clients in {args.rooms} rooms for {args.seconds:.0f}s")
+    print("="*60)
+
+    try:
+        start = time.perf_counter()
+        stats = asyncio.run(main(args))
+        elapsed = time.perf_counter() - start
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    expected = 1000 / SERVER_CONFIG['tick_rate']
+    intervals = [i * 1000 for i in stats.intervals]
+    print(f"Messages received:  {stats.messages} ({stats.messages / elapsed:.0f}/s)")
+    print(f"Bytes received:     {stats.bytes / 1024:.0f} KiB ({stats.bytes / max(stats.messages, 1):.0f} B/message)")
+    print(f"Delta interval:     p50 {percentile(intervals, 50):.1f} ms, p99 {percentile(intervals, 99):.1f} ms "
+          f"(target {expected:.0f} ms)")
+    print(f"Mirrors verified:   {stats.verified} ok, {stats.mismatched} mismatched")
+    print(f"Errors:             {stats.errors}")
@@ -0,0 +1,123 @@
+"""
+Leaderboard service benchmark
+Runs the same kiosk workload twice: every kiosk with its own DatabaseManager connection
+(direct), then every kiosk through one leaderboard_service.py process (service), and
+compares throughput, latency and how many commits the scores took.
+Runs against the local sqlite stand-in by default, or the MySQL server from config.py with --mysql.
+Run from the project folder: python -m benchmarks.service_load --players 10,50
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import localdb
+from database import DatabaseManager
+from service_client import ServiceClient
+from benchmarks.db_load import Stats, timed, report
+
+def kiosk(number, args, make_db, stats, deadline):
+    """One kiosk: log in, then save a score and look at the leaderboard after every game"""
+    rng = random.Random(args.seed * 100003 + number)
+    db = make_db()
+    try:
+        user_id = timed(stats, "register_user", db.register_user, f"kiosk{number}")
+        while user_id and time.perf_counter() < deadline:
+            time.sleep(rng.uniform(0, 2 * args.think))  # Playing a game
+            score = rng.randrange(0, 500, 10)
+            timed(stats, "save_score", db.save_score, user_id, score, score // 50 + 1)
+            if rng.random() < args.leaderboard_rate:
+                timed(stats, "get_leaderboard", db.get_leaderboard, 10)
+    finally:
+        db.close()
+
+def run(players, args, make_db):
+    """Run one load level and return its Stats and elapsed seconds"""
+    stats = Stats()
+    deadline = time.perf_counter() + args.duration
+    threads = [threading.Thread(target=kiosk, args=(number, args, make_db, stats, deadline), daemon=True)
+               for number in range(players)]
+    start = time.perf_counter()
+    # DatabaseManager prints a line per saved score - keep the report readable
+    with open(os.devnull, 'w') as quiet, contextlib.redirect_stdout(quiet):
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return stats, time.perf_counter() - start
+
+def start_service(args, port):
+    """Start leaderboard_service.py in its own process and wait until it accepts clients"""
+    command = [sys.executable, "leaderboard_service.py", "--port", str(port)]
+    if args.local_db:
+        command += ["--local-db", args.local_db, "--latency", str(args.latency)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise SystemExit("❌ Leaderboard service didn't start")
+
+def commits(client):
+    """Total (commits, scores) so far from the service's counters"""
+    reply = client.call("stats")
+    return reply["commits"], reply["scores"]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare direct MySQL clients with the leaderboard service")
+    parser.add_argument("--players", default="10,50", help="Comma-separated numbers of kiosks")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per level and mode")
+    parser.add_argument("--think", type=float, default=0.05, help="Average seconds of play per game")
+    parser.add_argument("--leaderboard-rate", type=float, default=0.5,
+                        help="Chance of viewing the leaderboard after a game")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Simulated round trip per statement in ms (local stand-in only)")
+    parser.add_argument("--port", type=int, default=8799, help="Port for the benchmark's service")
+    parser.add_argument("--mysql", action="store_true", help="Use the MySQL server from config.py")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.mysql:
+        args.local_db = None
+        make_direct = DatabaseManager
+        target = "MySQL from config.py"
+    else:
+        args.local_db = os.path.join(tempfile.mkdtemp(prefix="snake-service-"), "service.sqlite3")
+        config = {'database': args.local_db, 'latency': args.latency / 1000}
+        make_direct = lambda: DatabaseManager(connector=localdb, config=config)
+        target = f"local stand-in {args.local_db}"
+
+    print("="*60)
+    print(f"LEADERBOARD SERVICE BENCHMARK - {target}, {args.duration:.0f}s per run")
+    print("="*60)
+
+    service = start_service(args, args.port)
+    make_client = lambda: ServiceClient(port=args.port)
+    try:
+        with open(os.devnull, 'w') as quiet, contextlib.redirect_stdout(quiet):
+            monitor = ServiceClient(port=args.port)
+        for players in [int(count) for count in args.players.split(",")]:
+            print(f"\n--- direct: {players} connections to the database ---", end="")
+            stats, elapsed = run(players, args, make_direct)
+            report(players, stats, elapsed)
+
+            print(f"\n--- service: {players} kiosks, 1 database connection ---", end="")
+            before = commits(monitor)
+            stats, elapsed = run(players, args, make_client)
+            after = commits(monitor)
+            report(players, stats, elapsed)
+            saved, transactions = after[1] - before[1], after[0] - before[0]
+            print(f"   {saved} scores in {transactions} commits ({saved / max(transactions, 1):.1f} per commit)")
+        monitor.close()
+    finally:
+        service.terminate()
+        service.wait()
@@ -0,0 +1,28 @@
+"""
+Simple Snake bots
+Bots only look at the cells next to the head, so a decision costs O(1)
+"""
+
+from world import DIRECTIONS
+
+
+def greedy_direction(head, direction, target, is_safe):
+    """Pick a safe turn that moves the head closer to the target cell"""
+    head_x, head_y = head
+    best = None
+    best_distance = None
+    
+    for dir_x, dir_y in DIRECTIONS:
+        # Snakes can't reverse into themselves
+        if (dir_x, dir_y) == (-direction[0], -direction[1]):
+            continue
+        x, y = head_x + dir_x, head_y + dir_y
+        if not is_safe(x, y):
+            continue
+        distance = abs(target[0] - x) + abs(target[1] - y) if target else 0
+        if best is None or distance < best_distance:
+            best = (dir_x, dir_y)
+            best_distance = distance
+    
+    # Boxed in - keep going and die
+    return best or direction
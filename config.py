@@ -17,3 +17,77 @@ DB_CONFIG = {
     'port': 3306,               # Default MySQL port
     'auth_plugin': 'mysql_native_password'  # Important for Windows MySQL
 }
+
+# Read replicas for leaderboard reads, each with the same keys as DB_CONFIG
+# Leave empty to send everything to DB_CONFIG
+DB_REPLICAS = [
+    # {'host': 'replica1.local', 'user': 'snake_reader', 'password': '', 'database': 'snake_game', 'port': 3306},
+]
+
+DB_ROUTING = {
+    'max_replica_lag': 5,       # Seconds behind the primary before a replica is skipped
+    'lag_check_interval': 2,    # Seconds between SHOW REPLICA STATUS checks per replica
+    'read_your_writes': 10,     # Seconds after a write that this client reads from the primary
+    'replica_retry': 30         # Seconds before a replica that failed is tried again
+}
+
+# Board and window settings
+# The world can be much larger than the window; the camera then follows the head
+GAME_CONFIG = {
+    'window_width': 800,        # Window size in pixels
+    'window_height': 600,
+    'grid_size': 20,            # Size of one cell on screen in pixels
+    'world_width': 40,          # Board size in cells (40x30 exactly fills the window)
+    'world_height': 30,         # Try 1000x1000 for huge-board mode
+    'minimap_size': 160,        # Minimap width/height in pixels for huge boards (0 to disable)
+    'obstacle_map': None,       # .snkm level from obstacles.py - its size replaces world_width/height
+    'gradient_buckets': 32,     # Shades of the snake body baked into the sprite atlas
+    'arena_ai_snakes': 10,      # AI opponents in arena mode (python arena_game.py), hundreds on huge boards
+    'arena_food': 20,           # Pieces of food kept on the board in arena mode
+    'save_file': 'savegame.snk',     # F5 saves the game here, F9 resumes it
+    'font_cache': 'font_cache.json', # Resolved font files, so startup skips the system font scan
+    'score_sketch': 'score_sketch.json', # Percentile sketch of all scores, refreshed from MySQL
+    'username_index': 'usernames.json',  # Every username for login suggestions, refreshed from MySQL
+    'sketch_refresh': 300,      # Seconds between pulls of new scores into the sketch
+    'startup_budget_ms': 1000,  # Warn if the login screen takes longer than this to appear
+    'login_timeout': 10,        # Seconds to wait for MySQL to register a player
+    'play_during_login': False, # True = start playing at once, the player ID is attached later
+    'input_queue': 3,           # Turns buffered ahead of the snake, one is applied per tick
+    'input_poll_hz': 120,       # Keyboard polls per second while playing, independent of speed
+    'login_suggestions': 5,     # Usernames listed under the login box as a name is typed
+    'idle_wait_ms': 250         # Menus sleep up to this long waiting for input between checks
+}
+
+# Multiplayer server settings (python server.py)
+SERVER_CONFIG = {
+    'host': '127.0.0.1',
+    'port': 8765,
+    'tick_rate': 10,            # Game ticks per second in every room
+    'room_width': 100,          # Board size of each room in cells
+    'room_height': 100,
+    'room_ai_snakes': 0,        # AI snakes added to every new room
+    'room_food': 50,            # Pieces of food kept in each room
+    'max_send_buffer': 262144   # Bytes queued for a slow client before it is resynced instead
+}
+
+# Leaderboard service (python leaderboard_service.py) - one MySQL connection for many kiosks
+SERVICE_CONFIG = {
+    'host': '127.0.0.1',
+    'port': 8766,
+    'client_mode': False,       # True = the game talks to the service instead of MySQL
+    'client_timeout': 10,       # Seconds a game client waits for a reply
+    'commit_window_ms': 2,      # Scores arriving this close together share one commit
+    'max_batch': 500,           # Most scores per group commit
+    'top_cache': 100,           # Best scores kept in memory for top-N and rank
+    'top_refresh': 60           # Seconds between reloads of the top scores (writes from elsewhere)
+}
+
+# Offline score journal, used while MySQL is unreachable
+JOURNAL_CONFIG = {
+    'enabled': True,
+    'path': 'offline_scores.jsonl',  # Registrations and scores waiting for MySQL
+    'fsync_batch': 8,           # Sync the journal to disk after this many records...
+    'fsync_interval': 2.0,      # ...or after this many seconds, whichever comes first
+    'replay_batch': 500,        # Records sent to MySQL per bulk transaction on reconnect
+    'retry_seconds': 15         # How often to retry the replay while records are pending
+}
@@ -0,0 +1,53 @@
+"""
+Buffered turn input
+Key presses are queued with the time they were read and applied one per game tick, so two
+quick presses within a tick both count and can't add up to a reversal into the snake.
+The time from each press to the move that applied it is kept for latency percentiles.
+"""
+
+from collections import deque
+
+class InputQueue:
+    def __init__(self, size=3, history=10000):
+        self.size = size
+        self.turns = deque()  # (direction, time read) waiting for a tick
+        self.latencies = deque(maxlen=history)  # Seconds from key press to applied move
+        self.dropped = 0  # Presses ignored because the queue was full
+
+    def push(self, direction, current, stamp):
+        """Queue a turn if it changes direction after the turns already waiting"""
+        last = self.turns[-1][0] if self.turns else current
+        if direction == last or direction == (-last[0], -last[1]):
+            return False  # No-op or a reversal into the snake
+        if len(self.turns) >= self.size:
+            self.dropped += 1
+            return False
+        self.turns.append((direction, stamp))
+        return True
+
+    def pop(self):
+        """Next turn to apply as (direction, time read), or None"""
+        return self.turns.popleft() if self.turns else None
+
+    def applied(self, stamp, now):
+        """Record when a turn read at stamp reached the board"""
+        self.latencies.append(now - stamp)
+
+    def clear(self):
+        """Forget turns from a finished or replaced game"""
+        self.turns.clear()
+
+    def percentile(self, pct):
+        """Input-to-move latency in seconds at a percentile, or None with no turns yet"""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    def report(self):
+        """Print input-to-move latency percentiles"""
+        if not self.latencies:
+            return
+        p50, p95, p99 = (self.percentile(pct) * 1000 for pct in (50, 95, 99))
+        print(f"🎮 Input latency over {len(self.latencies)} turns: p50 {p50:.1f} ms, "
+              f"p95 {p95:.1f} ms, p99 {p99:.1f} ms ({self.dropped} presses dropped)")
@@ -0,0 +1,546 @@
+"""
+MySQL access for the Snake Game
+Shared by the pygame client, the arena and the multiplayer server
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import DB_CONFIG, DB_REPLICAS, DB_ROUTING
+
+class Error(Exception):
+    """Base for errors from connectors other than mysql.connector, such as localdb"""
+
+# mysql.connector takes a noticeable time to import, so it is loaded on first connect
+def load_connector():
+    """Import mysql.connector on first use"""
+    import mysql.connector
+    return mysql.connector
+
+# Hot statements, each prepared once per connection by DatabaseManager.execute_prepared
+STATEMENTS = {
+    'save_score': "INSERT INTO scores (user_id, score, level) VALUES (%s, %s, %s)",
+    'save_keyed_score': "INSERT IGNORE INTO scores (user_id, score, level, client_key) VALUES (%s, %s, %s, %s)",
+    'add_user_stats': "INSERT IGNORE INTO user_stats (user_id) VALUES (%s)",
+    'update_user_stats': """
+        UPDATE user_stats
+        SET games = games + 1,
+            total_score = total_score + %s,
+            best_score = CASE WHEN best_score < %s THEN %s ELSE best_score END,
+            best_level = CASE WHEN best_level < %s THEN %s ELSE best_level END,
+            last_played = CURRENT_TIMESTAMP
+        WHERE user_id = %s
+    """,
+    'merge_user_stats': """
+        UPDATE user_stats
+        SET games = games + %s,
+            total_score = total_score + %s,
+            best_score = CASE WHEN best_score < %s THEN %s ELSE best_score END,
+            best_level = CASE WHEN best_level < %s THEN %s ELSE best_level END,
+            last_played = CURRENT_TIMESTAMP
+        WHERE user_id = %s
+    """,
+    'top_scores': """
+        SELECT u.username, s.score, s.level, s.game_date
+        FROM scores s
+        JOIN users u ON s.user_id = u.id
+        ORDER BY s.score DESC
+        LIMIT %s
+    """,
+    'rank': "SELECT COUNT(*) + 1 FROM scores WHERE score > %s",
+}
+
+NO_SUCH_PROCEDURE = 1305  # MySQL error number when finish_game isn't installed
+
+class Replica:
+    """A read-only endpoint, skipped while it is down or lagging behind the primary"""
+    def __init__(self, config):
+        self.config = config
+        self.connection = None
+        self.down_until = 0.0  # Don't retry a failed replica before this time
+        self.lag = None  # Seconds behind the primary, None if not replicating
+        self.lag_checked = 0.0
+
+    def name(self):
+        return f"{self.config.get('host', 'localhost')}:{self.config.get('port', '')}/{self.config.get('database', '')}"
+
+    def usable(self, connector, now):
+        """Get a connection if this replica is up and close enough to the primary"""
+        if now < self.down_until:
+            return None
+        try:
+            if not self.connection or not self.connection.is_connected():
+                self.connection = connector.connect(**self.config)
+                self.lag_checked = 0.0
+            if now - self.lag_checked >= DB_ROUTING['lag_check_interval']:
+                self.lag = self.check_lag(connector)
+                self.lag_checked = now
+        except (Error, connector.Error) as e:
+            self.failed(e)
+            return None
+        if self.lag is None or self.lag > DB_ROUTING['max_replica_lag']:
+            return None
+        return self.connection
+
+    def check_lag(self, connector):
+        """Ask the replica how far behind the primary it is"""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("SHOW REPLICA STATUS")
+        except (Error, connector.Error):
+            cursor.execute("SHOW SLAVE STATUS")  # MySQL before 8.0.22
+        row = cursor.fetchone()
+        columns = [column[0] for column in cursor.description or ()]
+        cursor.close()
+        if not row:
+            return None  # Not set up as a replica
+        status = dict(zip(columns, row))
+        return status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+
+    def failed(self, error):
+        """Take the replica out of rotation for a while"""
+        print(f"⚠️  Replica {self.name()} unavailable, reading from the primary: {error}")
+        self.down_until = time.monotonic() + DB_ROUTING['replica_retry']
+        self.connection = None
+
+class DatabaseManager:
+    def __init__(self, connect=True, connector=None, config=None, replicas=None):
+        # connector is a module with mysql.connector's connect(), e.g. localdb for load tests
+        self.connector = connector
+        self.config = config or DB_CONFIG
+        self.connection = None
+        # Leaderboard reads go to replicas; DB_REPLICAS only applies to the default primary
+        if replicas is None:
+            replicas = DB_REPLICAS if config is None else []
+        self.replicas = [Replica(replica) for replica in replicas]
+        self.next_replica = 0
+        self.primary_reads_until = 0.0  # Read-your-writes: stay on the primary after a write
+        self.status = "DISCONNECTED"  # CONNECTING, CONNECTED or DISCONNECTED
+        self.statements = {}  # Statement name -> prepared cursor on the current connection
+        self.use_procedure = True  # Cleared if the finish_game procedure isn't installed
+        # What to catch from the connector; mysql.connector's Error joins in once it is imported
+        self.errors = (Error, connector.Error) if connector else (Error,)
+        # Calls can come from the game loop and the background worker at once
+        self.lock = threading.RLock()
+        self.worker = None
+        if connect:
+            self.connect()
+
+    def connect(self):
+        """Connect to MySQL database on Windows"""
+        with self.lock:
+            self.status = "CONNECTING"
+            self.statements = {}  # Prepared on the old connection
+            try:
+                connector = self.connector or load_connector()
+                self.errors = (Error, connector.Error)
+                self.connection = connector.connect(**self.config)
+                if self.connection.is_connected():
+                    self.status = "CONNECTED"
+                    print("✅ Connected to MySQL database")
+            except ImportError:
+                print("❌ mysql-connector-python is not installed: pip install mysql-connector-python")
+            except self.errors as e:
+                print(f"❌ Database connection failed: {e}")
+                print("Tip: Make sure MySQL is running and check config.py settings")
+            if self.status != "CONNECTED":
+                self.status = "DISCONNECTED"
+
+    def submit(self, func, *args):
+        """Run a database call on the background worker and return its Future"""
+        if self.worker is None:
+            self.worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="database")
+        return self.worker.submit(func, *args)
+
+    def connect_in_background(self):
+        """Connect on the worker so startup never waits for MySQL"""
+        self.status = "CONNECTING"
+        return self.submit(self.connect)
+
+    def wrote(self):
+        """Note a write, so this client's next reads see it even if replicas lag"""
+        self.primary_reads_until = time.monotonic() + DB_ROUTING['read_your_writes']
+
+    def execute_prepared(self, name, params):
+        """Run one of STATEMENTS on its prepared cursor, preparing it on first use"""
+        # The server parses each statement once per connection, later calls only send the parameters
+        cursor = self.statements.get(name)
+        if cursor is None:
+            cursor = self.statements[name] = self.connection.cursor(prepared=True)
+        cursor.execute(STATEMENTS[name], params)
+        return cursor
+
+    def read_connection(self):
+        """Pick where a read goes: the next healthy replica, or the primary"""
+        now = time.monotonic()
+        if self.replicas and now >= self.primary_reads_until:
+            connector = self.connector or load_connector()
+            for i in range(len(self.replicas)):
+                replica = self.replicas[(self.next_replica + i) % len(self.replicas)]
+                connection = replica.usable(connector, now)
+                if connection:
+                    self.next_replica = (self.next_replica + i + 1) % len(self.replicas)
+                    return connection, replica
+
+        if not self.connection or not self.connection.is_connected():
+            self.connect()
+        return self.connection, None
+
+    def read(self, query, params):
+        """Run a read-only query on a replica, failing over to the primary"""
+        connection, replica = self.read_connection()
+        if replica:
+            try:
+                cursor = connection.cursor()
+                cursor.execute(query, params)
+                results = cursor.fetchall()
+                cursor.close()
+                return results
+            except self.errors as e:
+                replica.failed(e)
+                # Straight to the primary - another replica may be failing the same way
+                if not self.connection or not self.connection.is_connected():
+                    self.connect()
+                connection = self.connection
+        if not connection:
+            return None
+        cursor = connection.cursor()
+        cursor.execute(query, params)
+        results = cursor.fetchall()
+        cursor.close()
+        return results
+
+    def register_user(self, username):
+        """Register a new user or get existing user ID"""
+        with self.lock:
+            try:
+                # Ensure connection exists
+                if not self.connection or not self.connection.is_connected():
+                    self.connect()
+                    if not self.connection:
+                        return None
+
+                cursor = self.connection.cursor()
+
+                # Try to insert new user
+                insert_query = "INSERT IGNORE INTO users (username) VALUES (%s)"
+                cursor.execute(insert_query, (username,))
+                self.connection.commit()
+                self.wrote()
+
+                # Get user ID
+                select_query = "SELECT id FROM users WHERE username = %s"
+                cursor.execute(select_query, (username,))
+                result = cursor.fetchone()
+
+                cursor.close()
+                return result[0] if result else None
+
+            except self.errors as e:
+                print(f"❌ Error registering user: {e}")
+                return None
+
+    def save_score(self, user_id, score, level, client_key=None):
+        """Save score and the player's stats (a client_key makes retries of the same game harmless)"""
+        with self.lock:
+            try:
+                if not self.connection or not self.connection.is_connected():
+                    self.connect()
+                    if not self.connection:
+                        return False
+
+                if client_key:
+                    insert = self.execute_prepared('save_keyed_score', (user_id, score, level, client_key))
+                else:
+                    insert = self.execute_prepared('save_score', (user_id, score, level))
+                if insert.rowcount != 0:  # 0 when a retried game was already saved and counted
+                    self.execute_prepared('add_user_stats', (user_id,))
+                    self.execute_prepared('update_user_stats', (score, score, score, level, level, user_id))
+                self.connection.commit()
+                self.wrote()
+                print("✅ Score saved to database!")
+                return True
+            except self.errors as e:
+                print(f"❌ Error saving score: {e}")
+                try:
+                    self.connection.rollback()
+                except self.errors:
+                    pass
+                return False
+
+    def finish_game(self, user_id, score, level, client_key=None, limit=10):
+        """Save a finished game and update the player's stats, returning (top scores, rank)"""
+        # One round trip through the finish_game stored procedure (see database_setup.py),
+        # or prepared statements in one transaction where it isn't installed
+        with self.lock:
+            try:
+                if not self.connection or not self.connection.is_connected():
+                    self.connect()
+                    if self.status != "CONNECTED":
+                        return None
+
+                result = None
+                if self.use_procedure:
+                    result = self.call_finish_game(user_id, score, level, client_key, limit)
+                if result is None:
+                    result = self.finish_game_statements(user_id, score, level, client_key, limit)
+                self.wrote()
+                print("✅ Score saved to database!")
+                return result
+            except self.errors as e:
+                print(f"❌ Error saving score: {e}")
+                try:
+                    self.connection.rollback()
+                except self.errors:
+                    pass
+                return None
+
+    def call_finish_game(self, user_id, score, level, client_key, limit):
+        """Run the finish_game procedure, or return None (and stop trying) if it isn't installed"""
+        cursor = self.connection.cursor()
+        try:
+            cursor.callproc('finish_game', (user_id, score, level, client_key, limit))
+        except self.errors as e:
+            cursor.close()
+            if getattr(e, 'errno', None) != NO_SUCH_PROCEDURE:
+                raise
+            print("⚠️  finish_game procedure not installed (run database_setup.py), using prepared statements")
+            self.use_procedure = False
+            return None
+        top, rank = [result.fetchall() for result in cursor.stored_results()]
+        cursor.close()
+        return top, rank[0][0]
+
+    def finish_game_statements(self, user_id, score, level, client_key, limit):
+        """finish_game as prepared statements: the writes in one transaction, then the reads"""
+        if client_key:
+            insert = self.execute_prepared('save_keyed_score', (user_id, score, level, client_key))
+        else:
+            insert = self.execute_prepared('save_score', (user_id, score, level))
+        if insert.rowcount != 0:  # 0 when a retried game was already saved and counted
+            self.execute_prepared('add_user_stats', (user_id,))
+            self.execute_prepared('update_user_stats', (score, score, score, level, level, user_id))
+        self.connection.commit()
+        top = self.execute_prepared('top_scores', (limit,)).fetchall()
+        rank = self.execute_prepared('rank', (score,)).fetchall()
+        return top, rank[0][0]
+
+    def unsaved(self, cursor, rows, key_index):
+        """The rows whose client_key isn't in scores yet (or that have none), first copy of each"""
+        keys = sorted({row[key_index] for row in rows if row[key_index]})
+        saved = set()
+        if keys:
+            placeholders = ", ".join(["%s"] * len(keys))
+            cursor.execute(f"SELECT client_key FROM scores WHERE client_key IN ({placeholders})", keys)
+            saved = {key for (key,) in cursor.fetchall()}
+        fresh = []
+        for row in rows:
+            key = row[key_index]
+            if key:
+                if key in saved:
+                    continue  # INSERT IGNORE will skip it, and its game was counted when it was saved
+                saved.add(key)
+            fresh.append(row)
+        return fresh
+
+    def add_user_stats(self, cursor, rows):
+        """Count newly saved (user_id, score, level) games in user_stats, in the caller's transaction"""
+        totals = {}
+        for user_id, score, level in rows:
+            games, total, best_score, best_level = totals.get(user_id, (0, 0, 0, 0))
+            totals[user_id] = (games + 1, total + score, max(best_score, score), max(best_level, level))
+        if totals:
+            cursor.executemany(STATEMENTS['add_user_stats'], [(user_id,) for user_id in totals])
+            cursor.executemany(STATEMENTS['merge_user_stats'],
+                               [(games, total, best_score, best_score, best_level, best_level, user_id)
+                                for user_id, (games, total, best_score, best_level) in totals.items()])
+
+    def save_scores(self, rows):
+        """Save many (user_id, score, level) results and their user stats in one transaction"""
+        # Rows may also carry a client_key, as in save_score, to make retries harmless
+        with self.lock:
+            try:
+                if not self.connection or not self.connection.is_connected():
+                    self.connect()
+                    if not self.connection:
+                        return False
+
+                cursor = self.connection.cursor()
+                if rows and len(rows[0]) == 4:
+                    query = "INSERT IGNORE INTO scores (user_id, score, level, client_key) VALUES (%s, %s, %s, %s)"
+                    counted = [row[:3] for row in self.unsaved(cursor, rows, 3)]
+                else:
+                    query = "INSERT INTO scores (user_id, score, level) VALUES (%s, %s, %s)"
+                    counted = rows
+                cursor.executemany(query, rows)
+                self.add_user_stats(cursor, counted)
+                self.connection.commit()
+                cursor.close()
+                self.wrote()
+                return True
+            except self.errors as e:
+                print(f"❌ Error saving scores: {e}")
+                try:
+                    self.connection.rollback()
+                except self.errors:
+                    pass
+                return False
+
+    def get_leaderboard(self, limit=10):
+        """Get top scores with usernames"""
+        with self.lock:
+            try:
+                query = """
+                    SELECT u.username, s.score, s.level, s.game_date
+                    FROM scores s
+                    JOIN users u ON s.user_id = u.id
+                    ORDER BY s.score DESC
+                    LIMIT %s
+                """
+                return self.read(query, (limit,)) or []
+            except self.errors as e:
+                print(f"❌ Error fetching leaderboard: {e}")
+                return []
+
+    def get_rank(self, score):
+        """Position a score would take on the all-time leaderboard (1 = best)"""
+        with self.lock:
+            try:
+                results = self.read("SELECT COUNT(*) FROM scores WHERE score > %s", (score,))
+                return results[0][0] + 1 if results else None
+            except self.errors as e:
+                print(f"❌ Error fetching rank: {e}")
+                return None
+
+    def stream(self, query, params, callback, batch_size=5000):
+        """Run a read-only query and pass its rows to callback in batches, returning the row count"""
+        # The cursor is unbuffered, so MySQL sends rows as they are fetched and memory stays
+        # at one batch however large the result is. Returns None on error.
+        with self.lock:
+            try:
+                connection, replica = self.read_connection()
+                if not connection:
+                    return None
+                cursor = connection.cursor(buffered=False)
+                cursor.execute(query, params)
+                count = 0
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    callback(rows)
+                    count += len(rows)
+                cursor.close()
+                return count
+            except self.errors as e:
+                print(f"❌ Error reading scores: {e}")
+                if replica:
+                    replica.failed(e)
+                return None
+
+    def scan_scores(self, callback, after_id=0, batch_size=5000):
+        """Stream (id, score, client_key) rows newer than after_id to callback in batches"""
+        # Returns the highest id seen (after_id if there was nothing new), or None on error
+        max_id = after_id
+
+        def track(rows):
+            nonlocal max_id
+            callback(rows)
+            max_id = rows[-1][0]
+
+        query = "SELECT id, score, client_key FROM scores WHERE id > %s ORDER BY id"
+        if self.stream(query, (after_id,), track, batch_size) is None:
+            return None
+        return max_id
+
+    def export_scores(self, callback, after_id=0, batch_size=5000):
+        """Stream (id, username, score, level, game_date) for every score after after_id"""
+        query = """
+            SELECT s.id, u.username, s.score, s.level, s.game_date
+            FROM scores s
+            JOIN users u ON s.user_id = u.id
+            WHERE s.id > %s
+            ORDER BY s.id
+        """
+        return self.stream(query, (after_id,), callback, batch_size)
+
+    def scan_usernames(self, callback, after_id=0, batch_size=5000):
+        """Stream (id, username) rows newer than after_id to callback in batches"""
+        # Returns the highest id seen (after_id if there was nothing new), or None on error
+        max_id = after_id
+
+        def track(rows):
+            nonlocal max_id
+            callback(rows)
+            max_id = rows[-1][0]
+
+        query = "SELECT id, username FROM users WHERE id > %s ORDER BY id"
+        if self.stream(query, (after_id,), track, batch_size) is None:
+            return None
+        return max_id
+
+    def import_offline_batch(self, usernames, scores):
+        """Bulk-insert players and keyed scores recorded offline in one transaction"""
+        # scores are (username, score, level, played_at, client_key) tuples. Returns
+        # ({username: user_id}, scores inserted), or None if the database is unreachable.
+        # Usernames come back spelled as stored; MySQL matches them case-insensitively.
+        with self.lock:
+            try:
+                if not self.connection or not self.connection.is_connected():
+                    self.connect()
+                    if self.status != "CONNECTED":
+                        return None
+
+                cursor = self.connection.cursor()
+                user_ids = {}
+                names = sorted(usernames)
+                if names:
+                    cursor.executemany("INSERT IGNORE INTO users (username) VALUES (%s)",
+                                       [(name,) for name in names])
+                    placeholders = ", ".join(["%s"] * len(names))
+                    cursor.execute(f"SELECT username, id FROM users WHERE username IN ({placeholders})", names)
+                    user_ids = dict(cursor.fetchall())
+                ids_by_key = {name.casefold(): user_id for name, user_id in user_ids.items()}
+                missing = {name for name, *_ in scores if name.casefold() not in ids_by_key}
+                if missing:
+                    print(f"❌ Error importing offline records: no user id for {', '.join(sorted(missing))}")
+                    self.connection.rollback()
+                    return None
+
+                inserted = 0
+                rows = [(ids_by_key[name.casefold()], score, level, played_at, key)
+                        for name, score, level, played_at, key in scores]
+                if rows:
+                    # The unique client_key turns replays of already-saved games into no-ops
+                    counted = [row[:3] for row in self.unsaved(cursor, rows, 4)]
+                    query = """
+                        INSERT IGNORE INTO scores (user_id, score, level, game_date, client_key)
+                        VALUES (%s, %s, %s, %s, %s)
+                    """
+                    cursor.executemany(query, rows)
+                    inserted = cursor.rowcount
+                    self.add_user_stats(cursor, counted)
+                self.connection.commit()
+                cursor.close()
+                self.wrote()
+                return user_ids, inserted
+            except self.errors as e:
+                print(f"❌ Error importing offline records: {e}")
+                try:
+                    self.connection.rollback()
+                except self.errors:
+                    pass
+                return None
+
+    def close(self):
+        """Close database connection"""
+        if self.worker:
+            self.worker.shutdown(wait=True)
+        with self.lock:
+            if self.connection and self.connection.is_connected():
+                self.connection.close()
+            for replica in self.replicas:
+                if replica.connection and replica.connection.is_connected():
+                    replica.connection.close()
+                replica.connection = None
+            self.status = "DISCONNECTED"
@@ -51,14 +51,98 @@ def setup_database():
                     score INT NOT NULL,
                     level INT DEFAULT 1,
                     game_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    client_key CHAR(32) NULL UNIQUE,
                     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
                 )
             ''')
+            
+            # Older installs: add the idempotency key used when offline scores are replayed
+            cursor.execute('''
+                SELECT COUNT(*) FROM information_schema.COLUMNS
+                WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'scores' AND COLUMN_NAME = 'client_key'
+            ''', (DB_CONFIG['database'],))
+            if cursor.fetchone()[0] == 0:
+                cursor.execute('ALTER TABLE scores ADD COLUMN client_key CHAR(32) NULL UNIQUE')
+                print("✅ Added client_key column to scores")
             print("✅ Scores table created")
             
             # Create index for faster leaderboard queries
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_score ON scores(score DESC)')
             
+            # Tables filled by retention.py when old games are rolled out of scores
+            print("🗄️  Creating retention tables...")
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS score_aggregates (
+                    user_id INT NOT NULL,
+                    period DATE NOT NULL,
+                    games INT NOT NULL DEFAULT 0,
+                    total_score BIGINT NOT NULL DEFAULT 0,
+                    best_score INT NOT NULL DEFAULT 0,
+                    best_level INT NOT NULL DEFAULT 0,
+                    PRIMARY KEY (user_id, period)
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS scores_archive (
+                    id INT PRIMARY KEY,
+                    user_id INT,
+                    score INT NOT NULL,
+                    level INT DEFAULT 1,
+                    game_date TIMESTAMP NULL,
+                    client_key CHAR(32) NULL
+                )
+            ''')
+            print("✅ Retention tables created")
+            
+            # Per-player totals, kept up to date by finish_game
+            print("📈 Creating user stats table and finish_game procedure...")
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS user_stats (
+                    user_id INT PRIMARY KEY,
+                    games INT NOT NULL DEFAULT 0,
+                    total_score BIGINT NOT NULL DEFAULT 0,
+                    best_score INT NOT NULL DEFAULT 0,
+                    best_level INT NOT NULL DEFAULT 0,
+                    last_played TIMESTAMP NULL,
+                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+                )
+            ''')
+            
+            # Everything after a game in one round trip: save, stats, new top scores and rank
+            cursor.execute("DROP PROCEDURE IF EXISTS finish_game")
+            cursor.execute('''
+                CREATE PROCEDURE finish_game(IN p_user_id INT, IN p_score INT, IN p_level INT,
+                                             IN p_client_key CHAR(32), IN p_limit INT)
+                BEGIN
+                    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+                    BEGIN
+                        ROLLBACK;
+                        RESIGNAL;
+                    END;
+                    START TRANSACTION;
+                    INSERT IGNORE INTO scores (user_id, score, level, client_key)
+                    VALUES (p_user_id, p_score, p_level, p_client_key);
+                    IF ROW_COUNT() > 0 THEN
+                        INSERT INTO user_stats (user_id, games, total_score, best_score, best_level, last_played)
+                        VALUES (p_user_id, 1, p_score, p_score, p_level, CURRENT_TIMESTAMP)
+                        ON DUPLICATE KEY UPDATE
+                            games = games + 1,
+                            total_score = total_score + p_score,
+                            best_score = GREATEST(best_score, p_score),
+                            best_level = GREATEST(best_level, p_level),
+                            last_played = CURRENT_TIMESTAMP;
+                    END IF;
+                    COMMIT;
+                    SELECT u.username, s.score, s.level, s.game_date
+                    FROM scores s
+                    JOIN users u ON s.user_id = u.id
+                    ORDER BY s.score DESC
+                    LIMIT p_limit;
+                    SELECT COUNT(*) + 1 FROM scores WHERE score > p_score;
+                END
+            ''')
+            print("✅ User stats and finish_game ready")
+            
             print("\n" + "="*50)
             print("🎉 DATABASE SETUP COMPLETED SUCCESSFULLY!")
             print("="*50)
@@ -0,0 +1,172 @@
+"""
+Headless Snake Game rules
+Board, snake body, food, score and level progression without any pygame code
+"""
+
+import random
+from collections import deque
+from world import DIRECTIONS, World
+
+# One-hot direction plane for each direction code
+DIRECTION_PLANES = [bytes(i == code for i in range(len(DIRECTIONS))) for code in range(len(DIRECTIONS))]
+
+
+class SnakeEngine:
+    LEVEL_POINTS = 50  # Level up every this many points
+    SPEED_STEP = 2     # Speed added per level
+
+    def __init__(self, world_width, world_height, minimap_size=0, obstacles=None):
+        if obstacles and (obstacles.width, obstacles.height) != (world_width, world_height):
+            raise ValueError(f"Obstacle map is for a {obstacles.width}x{obstacles.height} board")
+        self.GRID_WIDTH = world_width
+        self.GRID_HEIGHT = world_height
+        self.world = World(world_width, world_height, minimap_size)
+        self.obstacles = obstacles  # obstacles.ObstacleMap of interior walls, or None
+        self.snake = deque()
+        self.head_seq = 0  # Sequence number of the head; segment i holds head_seq - i
+        self.moves = bytearray()  # Direction code of every recent move, oldest first
+        # Board planes for observation.py, only kept up to date once enabled
+        self.planes = None
+        self.reset_game()
+
+    def reset_game(self):
+        """Reset game to initial state"""
+        for x, y in self.snake:
+            self.world.vacate(x, y)
+
+        start = self.obstacles.start if self.obstacles else (self.GRID_WIDTH // 2, self.GRID_HEIGHT // 2)
+        self.head_seq = 1
+        self.snake = deque([start])
+        self.world.occupy(start[0], start[1], self.head_seq)
+        self.moves = bytearray()
+        self.direction = (1, 0)
+        self.food = self.generate_food()
+        self.score = 0
+        self.level = 1
+        self.speed = 10
+        self.sync_planes()
+
+    def enable_planes(self):
+        """Start keeping uint8 occupancy, head, food and direction planes in one buffer"""
+        if self.planes is None:
+            cells = self.GRID_WIDTH * self.GRID_HEIGHT
+            self.planes = bytearray(3 * cells + len(DIRECTIONS))
+            self.sync_planes()
+        return self.planes
+
+    def sync_planes(self):
+        """Rebuild the planes in place from the current state (on reset and load)"""
+        planes = self.planes
+        if planes is None:
+            return
+        cells = self.GRID_WIDTH * self.GRID_HEIGHT
+        planes[:] = bytes(len(planes))  # Same size, so views onto the buffer stay valid
+        for x, y in self.snake:
+            planes[y * self.GRID_WIDTH + x] = 1
+        head_x, head_y = self.snake[0]
+        planes[cells + head_y * self.GRID_WIDTH + head_x] = 1
+        planes[2 * cells + self.food[1] * self.GRID_WIDTH + self.food[0]] = 1
+        planes[3 * cells + DIRECTIONS.index(self.direction)] = 1
+
+    def update_planes(self, old_head, old_food, tail):
+        """Apply one move to the planes without rebuilding them"""
+        planes = self.planes
+        width = self.GRID_WIDTH
+        cells = width * self.GRID_HEIGHT
+        head_x, head_y = self.snake[0]
+        planes[head_y * width + head_x] = 1
+        planes[cells + old_head[1] * width + old_head[0]] = 0
+        planes[cells + head_y * width + head_x] = 1
+        if tail:
+            planes[tail[1] * width + tail[0]] = 0
+        if old_food != self.food:
+            planes[2 * cells + old_food[1] * width + old_food[0]] = 0
+            planes[2 * cells + self.food[1] * width + self.food[0]] = 1
+        direction = 3 * cells
+        planes[direction:direction + 4] = DIRECTION_PLANES[DIRECTIONS.index(self.direction)]
+
+    def generate_food(self):
+        """Generate food at random position not on snake"""
+        while True:
+            food = (random.randint(0, self.GRID_WIDTH - 1),
+                    random.randint(0, self.GRID_HEIGHT - 1))
+            if self.world.is_free(*food) and not (self.obstacles and self.obstacles.is_wall(*food)):
+                return food
+
+    def load_state(self, body, direction, food, score, level, speed, head_seq, moves=None):
+        """Replace the current game with a saved one (see snapshot.py)"""
+        for x, y in self.snake:
+            self.world.vacate(x, y)
+
+        self.snake = deque(body)
+        self.head_seq = head_seq
+        for i, (x, y) in enumerate(self.snake):
+            self.world.occupy(x, y, head_seq - i)
+        if moves is None:
+            # Rebuild the move log from the body: the oldest move went from the tail
+            # to the segment before it, the newest from segment 1 to the head
+            cells = list(self.snake)
+            moves = bytearray(DIRECTIONS.index((cells[i][0] - cells[i + 1][0], cells[i][1] - cells[i + 1][1]))
+                              for i in range(len(cells) - 2, -1, -1))
+        self.moves = bytearray(moves)
+        self.direction = direction
+        self.food = food
+        self.score = score
+        self.level = level
+        self.speed = speed
+        self.sync_planes()
+
+    def segment_index(self, x, y):
+        """Get the body index of the segment on a cell (0 = head), or None if empty"""
+        seq = self.world.get(x, y)
+        return self.head_seq - seq if seq else None
+
+    def update_snake(self):
+        """Update snake position - DIES WHEN TOUCHING WALLS"""
+        # Calculate new head position
+        head_x, head_y = self.snake[0]
+        dir_x, dir_y = self.direction
+        new_head = (head_x + dir_x, head_y + dir_y)  # No wrap-around
+
+        # Check collision with walls (dies on wall contact)
+        if not self.world.in_bounds(*new_head):
+            return False  # Game over - hit wall
+
+        # Check collision with interior walls (O(1) bit lookup in the obstacle map)
+        if self.obstacles and self.obstacles.is_wall(*new_head):
+            return False  # Game over - hit a wall
+
+        # Check collision with self (O(1) lookup in the occupancy grid)
+        if not self.world.is_free(*new_head):
+            return False  # Game over - hit self
+
+        # Move snake
+        old_food = self.food
+        tail = None
+        self.head_seq += 1
+        self.snake.appendleft(new_head)
+        self.world.occupy(new_head[0], new_head[1], self.head_seq)
+        self.moves.append(DIRECTIONS.index(self.direction))
+
+        # Check if food is eaten
+        if new_head == self.food:
+            self.score += 10
+            self.food = self.generate_food()
+
+            # Level up every LEVEL_POINTS points
+            if self.score % self.LEVEL_POINTS == 0:
+                self.level += 1
+                self.speed += self.SPEED_STEP
+        else:
+            # Remove tail if no food eaten
+            tail = self.snake.pop()
+            self.world.vacate(*tail)
+
+        if self.planes is not None:
+            self.update_planes((head_x, head_y), old_food, tail)
+
+        # Only the last len(snake) - 1 moves describe the body; trim the rest now and then
+        if len(self.moves) > 2 * len(self.snake) + 64:
+            del self.moves[:-len(self.snake)]
+
+        return True  # Game continues
@@ -0,0 +1,114 @@
+"""
+Score export for analytics
+Streams every score with its player's name from MySQL in fetchmany batches and writes them
+as CSV or JSON lines while they arrive, so memory stays the same for any table size.
+    python export.py scores.csv.gz
+    python export.py scores.jsonl --after-id 150000
+"""
+
+import argparse
+import csv
+import datetime
+import gzip
+import json
+import sys
+import time
+from database import DatabaseManager
+
+try:
+    import resource  # Unix only - used for the peak memory line of the report
+except ImportError:
+    resource = None
+
+COLUMNS = ("id", "username", "score", "level", "game_date")
+
+def open_output(path, compress):
+    """Open the export file for text, through gzip if asked"""
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+def as_text(value):
+    """Dates as ISO 8601, everything else unchanged"""
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(sep=" ")
+    return value
+
+class CsvWriter:
+    def __init__(self, file):
+        self.writer = csv.writer(file)
+        self.writer.writerow(COLUMNS)
+
+    def write(self, rows):
+        self.writer.writerows([[as_text(value) for value in row] for row in rows])
+
+class JsonLinesWriter:
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, rows):
+        self.file.write("".join(
+            json.dumps(dict(zip(COLUMNS, map(as_text, row))), separators=(",", ":")) + "\n"
+            for row in rows))
+
+def peak_memory_mb():
+    """Peak resident memory of this process, or None where it can't be read"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # Bytes on macOS, KB elsewhere
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export all scores with usernames")
+    parser.add_argument("output", help="File to write, e.g. scores.csv, scores.jsonl or scores.csv.gz")
+    parser.add_argument("--format", choices=["csv", "jsonl"],
+                        help="Output format (default: from the file name, else csv)")
+    parser.add_argument("--gzip", action="store_true", help="Compress the output (default for .gz names)")
+    parser.add_argument("--batch", type=int, default=5000, help="Rows per fetchmany call")
+    parser.add_argument("--after-id", type=int, default=0, help="Only export scores with a higher id")
+    parser.add_argument("--local-db", metavar="PATH", help="Export from a local sqlite stand-in")
+    args = parser.parse_args()
+
+    compress = args.gzip or args.output.endswith(".gz")
+    name = args.output[:-3] if args.output.endswith(".gz") else args.output
+    file_format = args.format or ("jsonl" if name.endswith((".jsonl", ".json")) else "csv")
+
+    if args.local_db:
+        import localdb
+        db = DatabaseManager(connector=localdb, config={'database': args.local_db})
+    else:
+        db = DatabaseManager()
+    if db.status != "CONNECTED":
+        raise SystemExit(1)
+
+    print("="*60)
+    print(f"SCORE EXPORT - {file_format}{' + gzip' if compress else ''} to {args.output}")
+    print("="*60)
+
+    started = time.perf_counter()
+    exported = 0
+    reported = started
+
+    with open_output(args.output, compress) as file:
+        writer = CsvWriter(file) if file_format == "csv" else JsonLinesWriter(file)
+
+        def write(rows):
+            global exported, reported
+            writer.write(rows)
+            exported += len(rows)
+            now = time.perf_counter()
+            if now - reported >= 5:
+                print(f"   {exported} rows ({exported / (now - started):,.0f} rows/s)...")
+                reported = now
+
+        count = db.export_scores(write, args.after_id, args.batch)
+    db.close()
+
+    elapsed = time.perf_counter() - started
+    if count is None:
+        print(f"❌ Export stopped after {exported} rows - {args.output} is incomplete")
+        raise SystemExit(1)
+    print(f"\n📤 Exported {count} scores in {elapsed:.1f}s ({count / max(elapsed, 1e-9):,.0f} rows/s)")
+    peak = peak_memory_mb()
+    if peak is not None:
+        print(f"   peak memory: {peak:.0f} MB ({args.batch} rows per batch)")
@@ -0,0 +1,57 @@
+"""
+Font loading with a persisted resolution cache
+pygame.font.SysFont scans every installed font on each call, which is slow on Windows.
+The font file picked for each name is saved to disk so later starts skip the scan.
+"""
+
+import json
+import os
+import pygame
+
+class FontCache:
+    def __init__(self, path):
+        self.path = path
+        self.paths = {}
+        self.dirty = False
+        try:
+            with open(path) as f:
+                self.paths = json.load(f)
+        except (OSError, ValueError):
+            pass  # No cache yet (or a broken one) - it gets rebuilt as fonts are resolved
+
+    def resolve(self, names, bold=False):
+        """Find the font file for the first installed name (None = pygame's default font)"""
+        key = f"{'|'.join(names)}{':bold' if bold else ''}"
+        if key in self.paths:
+            path = self.paths[key]
+            if path is None or os.path.exists(path):
+                return path
+
+        # Cache miss or the font was uninstalled - do the slow system scan once
+        path = None
+        for name in names:
+            path = pygame.font.match_font(name, bold=bold)
+            if path:
+                break
+        self.paths[key] = path
+        self.dirty = True
+        return path
+
+    def load(self, names, size, bold=False):
+        """Load a font by preferred names, e.g. ['Segoe UI', 'Arial']"""
+        path = self.resolve(names, bold)
+        font = pygame.font.Font(path, size)
+        if bold and path is None:
+            font.set_bold(True)
+        return font
+
+    def save(self):
+        """Write newly resolved fonts back to disk"""
+        if not self.dirty:
+            return
+        try:
+            with open(self.path, 'w') as f:
+                json.dump(self.paths, f, indent=2)
+            self.dirty = False
+        except OSError as e:
+            print(f"⚠️  Could not save font cache: {e}")
@@ -0,0 +1,191 @@
+"""
+Offline score journal
+While MySQL is unreachable, registrations and scores are appended to a local file
+(one JSON record per line) and fsync'd in batches. Once the database is back the
+journal is replayed in bulk batches. Every score carries a client_key, so replaying
+a batch twice (after a crash or a dropped connection) never duplicates rows.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+
+class ScoreJournal:
+    def __init__(self, path, fsync_batch=8, fsync_interval=2.0, replay_batch=500):
+        self.path = path
+        self.checkpoint_path = path + ".offset"  # Bytes of the journal already replayed
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.replay_batch = replay_batch
+
+        # Appends come from the game loop while replays run on the database worker
+        self.lock = threading.Lock()
+        self.drop_torn_tail()
+        self.file = open(path, 'ab')
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+        self.appended = 0
+
+    def drop_torn_tail(self):
+        """Cut off a half-written last record left by a crash, so new records start on a fresh line"""
+        try:
+            with open(self.path, 'rb+') as f:
+                size = f.seek(0, os.SEEK_END)
+                if not size:
+                    return
+                f.seek(max(0, size - 4096))
+                tail = f.read()
+                if not tail.endswith(b"\n"):
+                    f.truncate(size - len(tail) + tail.rfind(b"\n") + 1)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def new_key():
+        """Make an idempotency key for one finished game"""
+        return uuid.uuid4().hex
+
+    def record_registration(self, username):
+        """Remember a player who signed in while offline"""
+        self.append({"op": "register", "username": username})
+
+    def record_score(self, username, score, level, client_key=None):
+        """Remember a finished game that couldn't be saved"""
+        self.append({"op": "score", "username": username, "score": score, "level": level,
+                     "played_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                     "key": client_key or self.new_key()})
+
+    def append(self, record):
+        """Add one record, syncing to disk every fsync_batch records or fsync_interval seconds"""
+        line = json.dumps(record, separators=(",", ":")).encode() + b"\n"
+        with self.lock:
+            self.file.write(line)
+            self.appended += 1
+            self.unsynced += 1
+            if (self.unsynced >= self.fsync_batch
+                    or time.monotonic() - self.last_sync >= self.fsync_interval):
+                self.sync_locked()
+
+    def sync_if_due(self):
+        """Sync records that have waited fsync_interval seconds, even if nothing else is appended"""
+        with self.lock:
+            if self.unsynced and time.monotonic() - self.last_sync >= self.fsync_interval:
+                self.sync_locked()
+
+    def sync(self):
+        """Force buffered records to disk"""
+        with self.lock:
+            self.sync_locked()
+
+    def sync_locked(self):
+        """fsync while already holding the lock"""
+        if self.unsynced:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def read_checkpoint(self):
+        """Get how many bytes of the journal were already replayed"""
+        try:
+            with open(self.checkpoint_path) as f:
+                return int(f.read() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def write_checkpoint(self, offset):
+        """Durably record replay progress"""
+        with open(self.checkpoint_path, 'w') as f:
+            f.write(str(offset))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def size(self):
+        """Journal size in bytes"""
+        with self.lock:
+            self.file.flush()
+            return os.path.getsize(self.path)
+
+    def has_pending(self):
+        """Check if anything is waiting to be replayed"""
+        return self.size() > self.read_checkpoint()
+
+    def read_batches(self, offset, end):
+        """Yield (records, offset after them) for complete lines between two offsets"""
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            batch = []
+            while offset < end:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    break  # Torn write at the end of the file - the record was never synced
+                offset += len(line)
+                try:
+                    batch.append(json.loads(line))
+                except ValueError:
+                    print(f"⚠️  Skipping damaged journal record at byte {offset - len(line)}")
+                if len(batch) >= self.replay_batch:
+                    yield batch, offset
+                    batch = []
+            if batch:
+                yield batch, offset
+
+    def replay(self, db):
+        """Send pending records to the database; returns {username: user_id} for replayed players"""
+        self.sync()
+        start_offset = self.read_checkpoint()
+        end = self.size()
+        if end <= start_offset:
+            return {}
+
+        started = time.perf_counter()
+        offset = start_offset
+        records = inserted = duplicates = 0
+        user_ids = {}
+
+        for batch, batch_end in self.read_batches(start_offset, end):
+            usernames = {record["username"] for record in batch}
+            scores = [(r["username"], r["score"], r["level"], r["played_at"], r["key"])
+                      for r in batch if r["op"] == "score"]
+            result = db.import_offline_batch(usernames, scores)
+            if result is None:
+                break  # Still offline - try again later from the checkpoint
+            ids, batch_inserted = result
+            user_ids.update(ids)
+            inserted += batch_inserted
+            duplicates += len(scores) - batch_inserted
+            records += len(batch)
+            offset = batch_end
+            self.write_checkpoint(offset)
+
+        if records:
+            elapsed = time.perf_counter() - started
+            print(f"📤 Replayed {records} journal records in {elapsed:.2f}s "
+                  f"({records / max(elapsed, 1e-9):.0f} records/s): "
+                  f"{inserted} scores saved, {duplicates} already in MySQL")
+
+        # Everything replayed - start a fresh journal unless new records arrived meanwhile
+        with self.lock:
+            self.file.flush()
+            if offset == os.path.getsize(self.path) and offset > 0:
+                # Checkpoint first: a crash in between replays the old records again, which
+                # client_keys make harmless, instead of leaving the checkpoint past the end
+                self.write_checkpoint(0)
+                self.file.truncate(0)
+                print(f"🧹 Journal emptied ({offset / 1024:.1f} KB replayed)")
+        return user_ids
+
+    def report(self):
+        """Print how much the journal has grown"""
+        size = self.size()
+        pending = size - self.read_checkpoint()
+        print(f"📒 Journal: {self.appended} records this session, {size / 1024:.1f} KB on disk, "
+              f"{pending / 1024:.1f} KB waiting for MySQL")
+
+    def close(self):
+        """Sync and close the journal file"""
+        with self.lock:
+            self.sync_locked()
+            self.file.close()
@@ -0,0 +1,283 @@
+"""
+Leaderboard service
+Holds the one MySQL connection for many game clients (see service_client.py). Scores that
+arrive together from different clients are saved in one transaction (group commit), and
+top-N and rank queries near the top are answered from the best scores kept in memory,
+which are updated as each commit lands.
+    python leaderboard_service.py
+Then set SERVICE_CONFIG['client_mode'] = True so the game talks to it instead of MySQL.
+"""
+
+import argparse
+import asyncio
+import bisect
+import datetime
+import json
+from concurrent.futures import ThreadPoolExecutor
+from config import SERVICE_CONFIG
+import database
+import protocol
+from service_client import encode
+
+KEY_MEMORY = 10000  # client_keys remembered for spotting retried saves
+
+class TopScores:
+    """The best scores as (username, score, level, game_date) rows, best first"""
+    def __init__(self, size):
+        self.size = size
+        self.rows = []
+        self.keys = []  # -score of each row, so bisect works on an ascending list
+
+    def load(self, rows):
+        self.rows = list(rows)[:self.size]
+        self.keys = [-row[1] for row in self.rows]
+
+    def add(self, row):
+        """Merge in a newly committed score"""
+        index = bisect.bisect_right(self.keys, -row[1])  # Behind older games with the same score
+        if index >= self.size:
+            return
+        self.keys.insert(index, -row[1])
+        self.rows.insert(index, row)
+        if len(self.rows) > self.size:
+            self.keys.pop()
+            self.rows.pop()
+
+    def rank(self, score):
+        """Position a score would take, or None if it depends on scores below the cache"""
+        above = bisect.bisect_left(self.keys, -score)
+        if above < len(self.rows) or len(self.rows) < self.size:
+            return above + 1
+        return None
+
+class LeaderboardService:
+    def __init__(self, db_factory):
+        self.db_factory = db_factory
+        self.db = None
+        # DatabaseManager isn't thread-safe, so all database work runs on one thread
+        self.db_executor = ThreadPoolExecutor(max_workers=1)
+        self.top = TopScores(SERVICE_CONFIG['top_cache'])
+        self.usernames = {}  # user_id -> username, learned from registrations
+        self.saved_keys = {}  # Recent client_keys, so a retried save isn't cached twice (insertion ordered)
+        self.pending = []  # (row, future) waiting for the next group commit
+        self.wakeup = None
+        self.clients = 0
+        self.requests = 0
+        self.commits = 0
+        self.committed = 0
+        self.total_commits = 0
+        self.total_committed = 0
+        self.tasks = set()  # Keeps background tasks alive until they finish
+
+    def start_task(self, coro):
+        """Run a coroutine in the background"""
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    def run_db(self, func, *args):
+        """Run a blocking database call without stalling other clients"""
+        return asyncio.get_running_loop().run_in_executor(self.db_executor, func, *args)
+
+    def read_scores(self, after_id, limit):
+        """One page of (id, score, client_key) rows for a client's sketch refresh"""
+        with self.db.lock:
+            try:
+                return self.db.read("SELECT id, score, client_key FROM scores WHERE id > %s ORDER BY id LIMIT %s",
+                                    (after_id, limit))
+            except self.db.errors as e:
+                print(f"❌ Error reading scores: {e}")
+                return None
+
+    def read_usernames(self, after_id, limit):
+        """One page of (id, username) rows for a client's autocomplete index"""
+        with self.db.lock:
+            try:
+                return self.db.read("SELECT id, username FROM users WHERE id > %s ORDER BY id LIMIT %s",
+                                    (after_id, limit))
+            except self.db.errors as e:
+                print(f"❌ Error reading usernames: {e}")
+                return None
+
+    async def refresh_top(self):
+        """Reload the best scores from MySQL"""
+        rows = await self.run_db(self.db.get_leaderboard, self.top.size)
+        if rows or self.db.status == "CONNECTED":
+            self.top.load(rows)
+
+    async def refresher(self):
+        """Pick up scores written or removed by anything other than this service"""
+        while True:
+            await asyncio.sleep(SERVICE_CONFIG['top_refresh'])
+            await self.refresh_top()
+
+    async def writer(self):
+        """Save queued scores, everything that arrived since the last commit in one transaction"""
+        window = SERVICE_CONFIG['commit_window_ms'] / 1000
+        while True:
+            await self.wakeup.wait()
+            if window:
+                await asyncio.sleep(window)  # Let saves arriving at about the same time join in
+            batch = self.pending[:SERVICE_CONFIG['max_batch']]
+            del self.pending[:len(batch)]
+            if not self.pending:
+                self.wakeup.clear()
+
+            rows = [row for row, _ in batch]
+            ok = await self.run_db(self.db.save_scores, rows)
+            self.commits += 1
+            self.total_commits += 1
+            if ok:
+                self.committed += len(rows)
+                self.total_committed += len(rows)
+                now = datetime.datetime.now().replace(microsecond=0)
+                unknown = False
+                for user_id, score, level, client_key in rows:
+                    if client_key:
+                        if client_key in self.saved_keys:
+                            continue  # INSERT IGNORE skipped it too
+                        self.saved_keys[client_key] = True
+                        if len(self.saved_keys) > KEY_MEMORY:
+                            del self.saved_keys[next(iter(self.saved_keys))]
+                    if user_id in self.usernames:
+                        self.top.add((self.usernames[user_id], score, level, now))
+                    else:
+                        unknown = True  # Registered before this service started
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(ok)
+            if ok and unknown:
+                await self.refresh_top()
+
+    async def handle(self, request):
+        """Answer one request"""
+        op = request.get("op")
+        if op == "register":
+            user_id = await self.run_db(self.db.register_user, request["username"])
+            if user_id:
+                self.usernames[user_id] = request["username"]
+            return {"ok": user_id is not None, "user_id": user_id}
+
+        if op == "save":
+            futures = []
+            for user_id, score, level, client_key in request["rows"]:
+                future = asyncio.get_running_loop().create_future()
+                self.pending.append(((user_id, score, level, client_key), future))
+                futures.append(future)
+            self.wakeup.set()
+            results = await asyncio.gather(*futures)
+            return {"ok": all(results)}
+
+        if op == "top":
+            limit = request.get("limit", 10)
+            if limit <= self.top.size:
+                return {"ok": True, "rows": self.top.rows[:limit]}
+            rows = await self.run_db(self.db.get_leaderboard, limit)
+            return {"ok": True, "rows": rows}
+
+        if op == "rank":
+            rank = self.top.rank(request["score"])
+            if rank is None:
+                rank = await self.run_db(self.db.get_rank, request["score"])
+            return {"ok": rank is not None, "rank": rank}
+
+        if op == "scan":
+            rows = await self.run_db(self.read_scores, request["after_id"], request["limit"])
+            return {"ok": rows is not None, "rows": rows or []}
+
+        if op == "users":
+            rows = await self.run_db(self.read_usernames, request["after_id"], request["limit"])
+            return {"ok": rows is not None, "rows": rows or []}
+
+        if op == "import":
+            scores = [tuple(score) for score in request["scores"]]
+            result = await self.run_db(self.db.import_offline_batch, request["usernames"], scores)
+            if result is None:
+                return {"ok": False}
+            user_ids, inserted = result
+            self.usernames.update((user_id, name) for name, user_id in user_ids.items())
+            if inserted:
+                await self.refresh_top()
+            return {"ok": True, "user_ids": user_ids, "inserted": inserted}
+
+        if op == "stats":
+            return {"ok": True, "clients": self.clients, "commits": self.total_commits,
+                    "scores": self.total_committed}
+
+        return {"ok": False, "error": f"unknown op {op!r}"}
+
+    async def handle_client(self, reader, writer):
+        """Serve one connection until it closes"""
+        self.clients += 1
+        try:
+            while True:
+                payload = await protocol.read_message(reader)
+                self.requests += 1
+                try:
+                    reply = await self.handle(json.loads(payload))
+                except (ValueError, KeyError, TypeError) as e:
+                    reply = {"ok": False, "error": f"bad request: {e}"}
+                writer.write(encode(reply))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except ValueError as e:
+            print(f"⚠️  Dropping client after a bad request: {e}")
+        finally:
+            self.clients -= 1
+            writer.close()
+
+    async def report(self, every=5.0):
+        """Print throughput numbers while the service runs"""
+        while True:
+            await asyncio.sleep(every)
+            if not self.requests:
+                continue
+            print(f"📊 {self.clients} clients, {self.requests / every:.0f} requests/s, "
+                  f"{self.committed / every:.0f} scores/s in {self.commits / every:.0f} commits/s "
+                  f"({self.committed / max(self.commits, 1):.1f} per commit)")
+            self.requests = self.commits = self.committed = 0
+
+    async def start(self, host, port):
+        """Connect to MySQL and start listening, returning the asyncio server"""
+        loop = asyncio.get_running_loop()
+        self.db = await loop.run_in_executor(self.db_executor, self.db_factory)
+        if self.db.status != "CONNECTED":
+            raise ConnectionError("The leaderboard service needs MySQL")
+        self.wakeup = asyncio.Event()
+        await self.refresh_top()
+        self.start_task(self.writer())
+        self.start_task(self.refresher())
+        return await asyncio.start_server(self.handle_client, host, port)
+
+    async def serve(self, host, port):
+        """Accept clients forever"""
+        server = await self.start(host, port)
+        print(f"🏆 Leaderboard service listening on {host}:{port} "
+              f"({len(self.top.rows)} top scores cached)")
+        self.start_task(self.report())
+        async with server:
+            await server.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the leaderboard service for game clients")
+    parser.add_argument("--host", default=SERVICE_CONFIG['host'])
+    parser.add_argument("--port", type=int, default=SERVICE_CONFIG['port'])
+    parser.add_argument("--local-db", metavar="PATH", help="Serve a local sqlite stand-in instead of MySQL")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Simulated round trip per statement in ms (local stand-in only)")
+    args = parser.parse_args()
+
+    def open_db():
+        if args.local_db:
+            import localdb
+            return database.DatabaseManager(connector=localdb, config={'database': args.local_db,
+                                                                       'latency': args.latency / 1000})
+        return database.DatabaseManager()
+
+    try:
+        asyncio.run(LeaderboardService(open_db).serve(args.host, args.port))
+    except ConnectionError as e:
+        print(f"❌ {e}")
+    except KeyboardInterrupt:
+        print("\n👋 Leaderboard service stopped")
@@ -0,0 +1,212 @@
+"""
+Local database stand-in for MySQL
+A sqlite3-backed module with the small part of the mysql.connector API that DatabaseManager
+uses, so load tests and offline development can run the real code paths without a server.
+    db = DatabaseManager(connector=localdb, config={'database': 'loadtest.sqlite3'})
+"""
+
+import sqlite3
+import time
+from database import Error as DatabaseError, NO_SUCH_PROCEDURE, STATEMENTS
+
+class Error(DatabaseError):
+    """Raised for any sqlite error, caught by DatabaseManager like a MySQL error"""
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username VARCHAR(50) UNIQUE NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS scores (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INT REFERENCES users(id),
+        score INT NOT NULL,
+        level INT DEFAULT 1,
+        game_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        client_key CHAR(32) NULL UNIQUE
+    );
+    CREATE INDEX IF NOT EXISTS idx_score ON scores(score DESC);
+    CREATE TABLE IF NOT EXISTS score_aggregates (
+        user_id INT NOT NULL,
+        period DATE NOT NULL,
+        games INT NOT NULL DEFAULT 0,
+        total_score BIGINT NOT NULL DEFAULT 0,
+        best_score INT NOT NULL DEFAULT 0,
+        best_level INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, period)
+    );
+    CREATE TABLE IF NOT EXISTS user_stats (
+        user_id INT PRIMARY KEY REFERENCES users(id),
+        games INT NOT NULL DEFAULT 0,
+        total_score BIGINT NOT NULL DEFAULT 0,
+        best_score INT NOT NULL DEFAULT 0,
+        best_level INT NOT NULL DEFAULT 0,
+        last_played TIMESTAMP NULL
+    );
+    CREATE TABLE IF NOT EXISTS scores_archive (
+        id INT PRIMARY KEY,
+        user_id INT,
+        score INT NOT NULL,
+        level INT DEFAULT 1,
+        game_date TIMESTAMP NULL,
+        client_key CHAR(32) NULL
+    );
+"""
+
+# MySQL spellings used by DatabaseManager and their sqlite equivalents
+REWRITES = [("%s", "?"), ("INSERT IGNORE", "INSERT OR IGNORE")]
+translated = {}
+
+def translate(query):
+    """Rewrite a MySQL query for sqlite (cached, queries repeat constantly)"""
+    sql = translated.get(query)
+    if sql is None:
+        sql = query
+        for mysql, sqlite in REWRITES:
+            sql = sql.replace(mysql, sqlite)
+        translated[query] = sql
+    return sql
+
+def finish_game(db, user_id, score, level, client_key, limit):
+    """The finish_game procedure from database_setup.py, run inside sqlite"""
+    inserted = db.execute(translate(STATEMENTS['save_keyed_score']), (user_id, score, level, client_key)).rowcount
+    if inserted:
+        db.execute(translate(STATEMENTS['add_user_stats']), (user_id,))
+        db.execute(translate(STATEMENTS['update_user_stats']), (score, score, score, level, level, user_id))
+    db.commit()
+    return [db.execute(translate(STATEMENTS['top_scores']), (limit,)).fetchall(),
+            db.execute(translate(STATEMENTS['rank']), (score,)).fetchall()]
+
+# Stored procedures, each run with a single simulated round trip like a server-side call
+PROCEDURES = {'finish_game': finish_game}
+
+def connect(database='snake_game', latency=0.0, timeout=30.0, replica_lag=0, **ignored):
+    """Open (and create if needed) the sqlite file named by database"""
+    # host, user, password etc. from DB_CONFIG are accepted and ignored
+    path = database if database.endswith(('.db', '.sqlite3')) or database == ':memory:' \
+        else f"{database}.sqlite3"
+    try:
+        return Connection(path, latency, timeout, replica_lag)
+    except sqlite3.Error as e:
+        raise Error(str(e)) from e
+
+class Connection:
+    def __init__(self, path, latency, timeout, replica_lag):
+        # DatabaseManager serializes calls with its own lock, but they may come from its worker
+        self.db = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")  # Readers don't wait for writers
+        self.db.executescript(SCHEMA)
+        self.latency = latency  # Simulated network round trip per statement, in seconds
+        self.replica_lag = replica_lag  # Reported by SHOW REPLICA STATUS (None = not a replica)
+        self.open = True
+
+    def is_connected(self):
+        return self.open
+
+    def cursor(self, buffered=None, prepared=False):
+        # sqlite cursors always step through results lazily, like an unbuffered MySQL cursor,
+        # and sqlite3 caches compiled statements, so prepared cursors need nothing extra
+        return Cursor(self)
+
+    def commit(self):
+        self.round_trip()
+        try:
+            self.db.commit()
+        except sqlite3.Error as e:
+            raise Error(str(e)) from e
+
+    def rollback(self):
+        self.db.rollback()
+
+    def close(self):
+        self.db.close()
+        self.open = False
+
+    def round_trip(self):
+        """Wait like a remote server would"""
+        if self.latency:
+            time.sleep(self.latency)
+
+class Cursor:
+    def __init__(self, connection):
+        self.connection = connection
+        try:
+            self.cursor = connection.db.cursor()
+        except sqlite3.Error as e:
+            raise Error(str(e)) from e
+        self.rowcount = -1
+        self.lastrowid = None
+        self.status = None  # Row of a SHOW REPLICA STATUS
+        self.results = []  # Result sets of the last callproc
+
+    @property
+    def description(self):
+        if self.status is not None:
+            return (('Seconds_Behind_Source',),)
+        return self.cursor.description
+
+    def execute(self, query, params=()):
+        self.connection.round_trip()
+        self.status = None
+        if query.strip().upper() == "SHOW REPLICA STATUS":
+            # Each file is its own database, so "replication lag" is whatever the test says
+            lag = self.connection.replica_lag
+            self.status = [] if lag is None else [(lag,)]
+            return
+        try:
+            self.cursor.execute(translate(query), tuple(params))
+        except sqlite3.Error as e:
+            raise Error(str(e)) from e
+        self.rowcount = self.cursor.rowcount
+        self.lastrowid = self.cursor.lastrowid
+
+    def executemany(self, query, rows):
+        self.connection.round_trip()
+        try:
+            self.cursor.executemany(translate(query), rows)
+        except sqlite3.Error as e:
+            raise Error(str(e)) from e
+        self.rowcount = self.cursor.rowcount
+
+    def callproc(self, name, args=()):
+        procedure = PROCEDURES.get(name)
+        if procedure is None:
+            error = Error(f"PROCEDURE {name} does not exist")
+            error.errno = NO_SUCH_PROCEDURE
+            raise error
+        self.connection.round_trip()
+        try:
+            self.results = procedure(self.connection.db, *args)
+        except sqlite3.Error as e:
+            self.connection.db.rollback()
+            raise Error(str(e)) from e
+        return args
+
+    def stored_results(self):
+        return [StoredResult(rows) for rows in self.results]
+
+    def fetchone(self):
+        if self.status is not None:
+            return self.status.pop(0) if self.status else None
+        return self.cursor.fetchone()
+
+    def fetchall(self):
+        if self.status is not None:
+            rows, self.status = self.status, []
+            return rows
+        return self.cursor.fetchall()
+
+    def fetchmany(self, size=1):
+        return self.cursor.fetchmany(size)
+
+    def close(self):
+        self.cursor.close()
+
+class StoredResult:
+    """One result set of a procedure call"""
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetchall(self):
+        return self.rows
@@ -4,6 +4,8 @@ import mysql.connector
 from mysql.connector import Error
 from datetime import datetime
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from config import GAME_CONFIG
 
 # Database configuration - UPDATE THESE WITH YOUR DATABASE CREDENTIALS
 DB_CONFIG = {
@@ -16,6 +18,7 @@ DB_CONFIG = {
 class DatabaseHandler:
     def __init__(self):
         self.connection = None
+        self.worker = None  # Runs queries off the game loop, one at a time on one connection
         self.connect()
         self.create_database()
         self.create_table()
@@ -93,8 +96,16 @@ class DatabaseHandler:
             print(f"Error fetching scores: {e}")
             return []
     
+    def submit(self, func, *args):
+        """Run a database call on the background worker and return its Future"""
+        if self.worker is None:
+            self.worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="database")
+        return self.worker.submit(func, *args)
+    
     def close(self):
         """Close database connection"""
+        if self.worker:
+            self.worker.shutdown(wait=True)
         if self.connection and self.connection.is_connected():
             self.connection.close()
             print("Database connection closed")
@@ -127,11 +138,27 @@ class SnakeGame:
         self.font = pygame.font.SysFont('Arial', 25)
         self.big_font = pygame.font.SysFont('Arial', 50)
         
+        # Dimming overlays for the game over and high score screens, built once
+        self.game_over_overlay = self.make_overlay(180)
+        self.high_scores_overlay = self.make_overlay(220)
+        
         # Database
         self.db = DatabaseHandler()
+        self.high_scores = []  # Fetched when the high score screen opens, not every frame
+        self.save_message = ""
+        self.save_future = None  # Score being saved on the database worker
+        self.high_scores_future = None  # High scores being fetched on the worker
         
         # Game state
         self.reset_game()
+        self.drawn_view = None
+    
+    def make_overlay(self, alpha):
+        """Create a translucent black full-screen surface"""
+        overlay = pygame.Surface((self.WIDTH, self.HEIGHT)).convert()
+        overlay.set_alpha(alpha)
+        overlay.fill(self.BLACK)
+        return overlay
         
     def reset_game(self):
         """Reset game to initial state"""
@@ -146,6 +173,7 @@ class SnakeGame:
         self.player_name = ""
         self.input_active = False
         self.show_high_scores = False
+        self.save_message = ""
         
     def generate_food(self):
         """Generate food at random position"""
@@ -155,12 +183,36 @@ class SnakeGame:
             if food not in self.snake:
                 return food
     
+    def is_idle(self):
+        """Check if the board is frozen, so the screen only changes on input"""
+        return self.game_over or self.paused
+    
+    def screen_view(self):
+        """Everything a frozen screen shows - it is repainted when this changes"""
+        return (self.game_over, self.paused, self.show_high_scores, self.input_active,
+                self.player_name, self.save_message, self.score, self.high_scores_future is None)
+    
+    def wait_for_events(self):
+        """Sleep until input arrives instead of redrawing an unchanged screen"""
+        event = pygame.event.wait(GAME_CONFIG['idle_wait_ms'])
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+    
     def handle_events(self):
         """Handle pygame events"""
-        for event in pygame.event.get():
+        if self.is_idle() and self.drawn_view == self.screen_view():
+            events = self.wait_for_events()
+        else:
+            events = pygame.event.get()
+        
+        for event in events:
             if event.type == pygame.QUIT:
                 return False
             
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.drawn_view = None  # The window was uncovered and needs repainting
+            
             if event.type == pygame.KEYDOWN:
                 # Handle player name input
                 if self.input_active:
@@ -181,6 +233,9 @@ class SnakeGame:
                         self.reset_game()
                     elif event.key == pygame.K_h:
                         self.show_high_scores = not self.show_high_scores
+                        if self.show_high_scores:
+                            # Through the worker, which may still be using the connection for a save
+                            self.high_scores_future = self.db.submit(self.db.get_high_scores, 10)
                     elif event.key == pygame.K_s and not self.input_active:
                         self.input_active = True
                 else:
@@ -275,10 +330,7 @@ class SnakeGame:
     
     def draw_game_over(self):
         """Draw game over screen"""
-        overlay = pygame.Surface((self.WIDTH, self.HEIGHT))
-        overlay.set_alpha(180)
-        overlay.fill(self.BLACK)
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.game_over_overlay, (0, 0))
         
         # Game over text
         game_over_text = self.big_font.render("GAME OVER", True, self.RED)
@@ -310,17 +362,13 @@ class SnakeGame:
     
     def draw_high_scores(self):
         """Draw high scores screen"""
-        overlay = pygame.Surface((self.WIDTH, self.HEIGHT))
-        overlay.set_alpha(220)
-        overlay.fill(self.BLACK)
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.high_scores_overlay, (0, 0))
         
         # Title
         title = self.big_font.render("HIGH SCORES", True, self.BLUE)
         self.screen.blit(title, (self.WIDTH // 2 - title.get_width() // 2, 50))
         
-        # Get scores from database
-        scores = self.db.get_high_scores(10)
+        scores = self.high_scores
         
         # Column headers
         headers = ["Rank", "Name", "Score", "Level", "Date"]
@@ -358,6 +406,28 @@ class SnakeGame:
             if not self.show_high_scores:
                 self.update_game()
             
+            # Save score if player entered name
+            if self.game_over and self.input_active == False and self.player_name:
+                # Saved on the worker, so the window keeps responding while MySQL works
+                self.save_future = self.db.submit(self.db.save_score, self.player_name, self.score, self.level)
+                self.player_name = ""  # Reset name after saving
+            if self.save_future and self.save_future.done():
+                if self.save_future.result() and self.game_over:
+                    self.save_message = "Score saved successfully!"
+                self.save_future = None
+            if self.high_scores_future and self.high_scores_future.done():
+                self.high_scores = self.high_scores_future.result()
+                self.high_scores_future = None
+            
+            # A frozen screen stays as it is until something on it changes
+            if self.is_idle():
+                view = self.screen_view()
+                if view == self.drawn_view:
+                    continue
+                self.drawn_view = view
+            else:
+                self.drawn_view = None
+            
             # Drawing
             self.screen.fill(self.BLACK)
             self.draw_grid()
@@ -367,20 +437,16 @@ class SnakeGame:
             
             if self.game_over:
                 self.draw_game_over()
-                
-                # Save score if player entered name
-                if self.input_active == False and self.player_name:
-                    success = self.db.save_score(self.player_name, self.score, self.level)
-                    if success:
-                        status_text = self.font.render("Score saved successfully!", True, self.GREEN)
-                        self.screen.blit(status_text, (self.WIDTH // 2 - status_text.get_width() // 2, 550))
-                    self.player_name = ""  # Reset name after saving
+                if self.save_message:
+                    status_text = self.font.render(self.save_message, True, self.GREEN)
+                    self.screen.blit(status_text, (self.WIDTH // 2 - status_text.get_width() // 2, 550))
             
             if self.show_high_scores:
                 self.draw_high_scores()
             
             pygame.display.flip()
-            self.clock.tick(self.speed)
+            if not self.is_idle():
+                self.clock.tick(self.speed)
         
         # Cleanup
         self.db.close()
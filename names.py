@@ -0,0 +1,98 @@
+"""
+Username prefix index for login autocomplete
+All usernames are kept in a sorted array of case-folded keys, so the names starting with a
+prefix are one bisect away and the first few matches come back in microseconds without a
+LIKE query per keystroke. Saved to disk with the highest users.id it has seen, so after the
+first run a refresh only streams the players who registered since.
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left, insort
+
+class UsernameIndex:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()  # Refreshed on its own thread, searched by the game loop
+        self.keys = []  # Case-folded usernames, sorted (MySQL compares usernames case-insensitively)
+        self.names = {}  # Key -> username as registered
+        self.max_id = 0  # Highest users.id already indexed
+        self.ready = False  # No suggestions until a saved index or the first refresh is in
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            self.names = {name.casefold(): name for name in data["names"]}
+            self.keys = sorted(self.names)
+            self.max_id = data["max_id"]
+            self.ready = True
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass  # No saved index yet - the first refresh reads the whole table
+
+    def add(self, name):
+        """Index a newly registered player"""
+        key = name.casefold()
+        with self.lock:
+            if key not in self.names:
+                insort(self.keys, key)
+                self.names[key] = name
+
+    def matches(self, prefix, limit=5):
+        """The first few usernames starting with prefix, in alphabetical order"""
+        prefix = prefix.casefold()
+        if not prefix or not self.ready:
+            return []
+        with self.lock:
+            start = bisect_left(self.keys, prefix)
+            found = []
+            for key in self.keys[start:start + limit]:
+                if not key.startswith(prefix):
+                    break
+                found.append(self.names[key])
+            return found
+
+    def refresh(self, db, batch_size=5000):
+        """Stream players newer than the index from MySQL in one pass, then save to disk"""
+        started = time.perf_counter()
+        with self.lock:
+            after_id = self.max_id
+        fresh = {}
+
+        def add_rows(rows):
+            for _, name in rows:
+                fresh[name.casefold()] = name
+
+        max_id = db.scan_usernames(add_rows, after_id, batch_size)
+        if max_id is None:
+            return False  # Database unreachable - keep what we have
+
+        with self.lock:
+            if len(fresh) > len(self.keys):
+                # A full load - one sort beats an insort per name
+                fresh.update(self.names)
+                self.names = fresh
+                self.keys = sorted(fresh)
+            else:
+                for key, name in fresh.items():
+                    if key not in self.names:
+                        self.names[key] = name
+                        insort(self.keys, key)
+            self.max_id = max(self.max_id, max_id)
+            self.ready = True
+        self.save()
+        print(f"🔤 Username index: +{len(fresh)} players in {(time.perf_counter() - started) * 1000:.0f} ms "
+              f"({len(self.keys)} total)")
+        return True
+
+    def save(self):
+        """Write the index to disk, replacing the old file atomically"""
+        with self.lock:
+            data = {"max_id": self.max_id, "names": list(self.names.values())}
+        temp = self.path + ".tmp"
+        try:
+            with open(temp, 'w') as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(temp, self.path)
+        except OSError as e:
+            print(f"⚠️  Could not save username index: {e}")
@@ -0,0 +1,55 @@
+"""
+NumPy observations of a SnakeEngine for ML pipelines
+Every array here is a view onto the engine's plane buffer, which the engine updates in
+place on each move, so reading an observation never allocates or copies. Requires numpy.
+"""
+
+import numpy as np
+
+
+class Observation:
+    """Live views of the occupancy, head, food and direction planes"""
+
+    def __init__(self, engine, stack=0):
+        if stack < 0:
+            raise ValueError(f"Frame stack size can't be negative: {stack}")
+        buffer = np.frombuffer(engine.enable_planes(), dtype=np.uint8)
+        height, width = engine.GRID_HEIGHT, engine.GRID_WIDTH
+        cells = width * height
+
+        self.board = buffer[:3 * cells].reshape(3, height, width)  # (channel, y, x)
+        self.occupancy = self.board[0]
+        self.head = self.board[1]
+        self.food = self.board[2]
+        self.direction = buffer[3 * cells:]  # One-hot over world.DIRECTIONS
+
+        self.frames = FrameStack(self.board, stack) if stack else None
+
+    def push(self):
+        """Record the current board in the frame stack (call once per step)"""
+        # Without a stack the live board is the observation
+        if self.frames is None:
+            return self.board
+        self.frames.push(self.board)
+        return self.frames.stacked()
+
+
+class FrameStack:
+    """Ring buffer of the last N boards, readable as one (N, channel, y, x) view"""
+
+    def __init__(self, board, size):
+        self.size = size
+        # Each frame is written twice, N slots apart, so the last N frames are always
+        # one contiguous slice of the ring and never need np.roll or a copy to read
+        self.ring = np.zeros((2 * size,) + board.shape, dtype=board.dtype)
+        self.position = 0
+
+    def push(self, board):
+        """Copy a board into the ring (the only copy made per step)"""
+        np.copyto(self.ring[self.position], board)
+        np.copyto(self.ring[self.position + self.size], board)
+        self.position = (self.position + 1) % self.size
+
+    def stacked(self):
+        """Get the last N boards, oldest first"""
+        return self.ring[self.position:self.position + self.size]
@@ -0,0 +1,189 @@
+"""
+Obstacle maps for custom levels
+A map file is a small header followed by one bit per cell (row-major, least significant
+bit first, 1 = wall). Files are opened with mmap, so loading costs the same for any board
+size and a wall check reads a single byte of the mapping.
+
+Layout (little-endian):
+    header  - magic, version, width, height, start x, start y
+    bits    - ceil(width * height / 8) bytes
+
+    python obstacles.py generate maze.snkm --size 1000 --walls 5000
+    python obstacles.py convert level.txt level.snkm   (# = wall, S = start, anything else = floor)
+    python obstacles.py info maze.snkm
+
+The snake starts heading right, so the start cell and the one to its right must be open.
+"""
+
+import argparse
+import mmap
+import random
+import struct
+import time
+
+MAGIC = b'SNKM'
+VERSION = 1
+
+HEADER = struct.Struct('<4sBxHHHH')
+
+
+class ObstacleMap:
+    def __init__(self, width, height, bits, start, mapping=None):
+        self.width = width
+        self.height = height
+        self.bits = bits  # Anything indexable by byte: bytearray, or a memoryview of the mmap
+        self.start = start
+        self.mapping = mapping
+
+    @classmethod
+    def load(cls, path):
+        """Map a file into memory - nothing but the header is read up front"""
+        with open(path, 'rb') as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mapping) < HEADER.size:
+            mapping.close()
+            raise ValueError("Not a snake obstacle map")
+        magic, version, width, height, start_x, start_y = HEADER.unpack_from(mapping)
+        if magic != MAGIC:
+            mapping.close()
+            raise ValueError("Not a snake obstacle map")
+        if version != VERSION:
+            mapping.close()
+            raise ValueError(f"Unsupported obstacle map version: {version}")
+        if len(mapping) != HEADER.size + -(-width * height // 8):
+            mapping.close()
+            raise ValueError(f"Obstacle map is truncated or padded for a {width}x{height} board")
+        if start_x >= width or start_y >= height:
+            mapping.close()
+            raise ValueError(f"Obstacle map starts outside its {width}x{height} board")
+        obstacles = cls(width, height, memoryview(mapping)[HEADER.size:], (start_x, start_y), mapping)
+        try:
+            obstacles.check_start()
+        except ValueError:
+            obstacles.close()
+            raise
+        return obstacles
+
+    @classmethod
+    def empty(cls, width, height, start=None):
+        """An in-memory map without walls, to be filled with add()"""
+        start = start or (width // 2, height // 2)
+        return cls(width, height, bytearray(-(-width * height // 8)), start)
+
+    def is_wall(self, x, y):
+        """Check if a cell inside the board is a wall"""
+        i = y * self.width + x
+        return self.bits[i >> 3] >> (i & 7) & 1
+
+    def check_start(self):
+        """Raise ValueError unless the snake can start on the start cell and take its first step"""
+        x, y = self.start
+        if self.is_wall(x, y):
+            raise ValueError(f"Obstacle map starts inside a wall at {self.start}")
+        if x + 1 >= self.width or self.is_wall(x + 1, y):
+            raise ValueError(f"Obstacle map has no room to move right from the start at {self.start}")
+
+    def add(self, x, y):
+        """Turn a cell into a wall (in-memory maps only)"""
+        i = y * self.width + x
+        self.bits[i >> 3] |= 1 << (i & 7)
+
+    def count(self):
+        """Number of walls on the board"""
+        return int.from_bytes(self.bits, 'little').bit_count()
+
+    def save(self, path):
+        """Write the map to disk"""
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.width, self.height, *self.start))
+            f.write(self.bits)
+
+    def close(self):
+        """Release the file mapping"""
+        if self.mapping is not None:
+            self.bits.release()
+            self.mapping.close()
+            self.mapping = None
+
+
+def from_text(lines):
+    """Build a map from rows of text: # is a wall, S the start cell (the center if there is none)"""
+    rows = [line.rstrip("\n") for line in lines]
+    while rows and not rows[-1].strip():
+        rows.pop()  # Blank lines inside the level are floor, trailing ones aren't part of it
+    if not rows:
+        raise ValueError("Text level is empty")
+    width = max(len(row) for row in rows)
+    obstacles = ObstacleMap.empty(width, len(rows))
+    for y, row in enumerate(rows):
+        for x, cell in enumerate(row):
+            if cell == "#":
+                obstacles.add(x, y)
+            elif cell == "S":
+                obstacles.start = (x, y)
+    obstacles.check_start()
+    return obstacles
+
+
+def generate(width, height, walls, seed=None, clearing=5):
+    """Random straight wall segments, keeping a clear square around the center start"""
+    rng = random.Random(seed)
+    obstacles = ObstacleMap.empty(width, height)
+    walls = min(walls, width * height // 2)  # Leave room for the snake and food
+    start_x, start_y = obstacles.start
+    placed = 0
+    while placed < walls:
+        x, y = rng.randrange(width), rng.randrange(height)
+        dx, dy = rng.choice([(1, 0), (0, 1)])
+        for _ in range(rng.randint(3, 12)):
+            if not (0 <= x < width and 0 <= y < height) or placed >= walls:
+                break
+            if (abs(x - start_x) > clearing or abs(y - start_y) > clearing) and not obstacles.is_wall(x, y):
+                obstacles.add(x, y)
+                placed += 1
+            x += dx
+            y += dy
+    return obstacles
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create and inspect obstacle maps")
+    commands = parser.add_subparsers(dest="command", required=True)
+    gen = commands.add_parser("generate", help="Write a map of random wall segments")
+    gen.add_argument("output")
+    gen.add_argument("--size", type=int, default=1000, help="Board width and height in cells")
+    gen.add_argument("--walls", type=int, default=5000, help="Wall cells to place")
+    gen.add_argument("--seed", type=int, default=None)
+    convert = commands.add_parser("convert", help="Turn a hand-drawn text level into a map")
+    convert.add_argument("text")
+    convert.add_argument("output")
+    info = commands.add_parser("info", help="Load a map and time wall checks")
+    info.add_argument("map")
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        generate(args.size, args.size, args.walls, args.seed).save(args.output)
+        print(f"🧱 Wrote {args.size}x{args.size} map with {args.walls} walls to {args.output}")
+    elif args.command == "convert":
+        with open(args.text) as f:
+            try:
+                obstacles = from_text(f)
+            except ValueError as e:
+                raise SystemExit(f"❌ {e}")
+        obstacles.save(args.output)
+        print(f"🧱 Wrote {obstacles.width}x{obstacles.height} map with {obstacles.count()} walls "
+              f"to {args.output}")
+    else:
+        started = time.perf_counter()
+        obstacles = ObstacleMap.load(args.map)
+        loaded = time.perf_counter() - started
+        rng = random.Random(1)
+        cells = [(rng.randrange(obstacles.width), rng.randrange(obstacles.height)) for _ in range(100000)]
+        started = time.perf_counter()
+        for x, y in cells:
+            obstacles.is_wall(x, y)
+        checks = time.perf_counter() - started
+        print(f"🧱 {obstacles.width}x{obstacles.height} map, start {obstacles.start}, "
+              f"{obstacles.count()} walls")
+        print(f"   loaded in {loaded * 1000:.2f} ms, wall check {checks / len(cells) * 1e9:.0f} ns")
+        obstacles.close()
@@ -0,0 +1,205 @@
+"""
+Binary wire protocol for multiplayer Snake
+Every message is a 4-byte length followed by a payload whose first byte is the message type.
+Clients only send joins, turns and resync requests. The server sends one full snapshot
+on join or resync and a compact delta of arena changes every tick after that.
+"""
+
+import struct
+from collections import deque
+from arena import MOVE, DIE, SPAWN, FOOD_ADD, FOOD_REMOVE
+from world import DIRECTIONS
+
+# Message types
+JOIN = b'J'
+TURN = b'T'
+RESYNC = b'R'
+SNAPSHOT = b'S'
+DELTA = b'D'
+
+NO_SNAKE = 0xFFFF
+
+# Largest frame read from a peer, so a bogus length can't make us allocate gigabytes
+MAX_FRAME = 1 << 20
+MAX_CLIENT_FRAME = 1024  # Joins, turns and resyncs are all far smaller
+
+FRAME = struct.Struct('<I')
+TURN_MSG = struct.Struct('<cB')
+SNAPSHOT_HEADER = struct.Struct('<cIHHHHI')  # type, tick, width, height, your snake, snakes, foods
+SNAKE_HEADER = struct.Struct('<HBBIH')       # id, alive, direction, score, length
+DELTA_HEADER = struct.Struct('<cIH')         # type, tick, changes
+CELL = struct.Struct('<HH')
+
+# Change entries keyed by their op byte
+CHANGE_STRUCTS = {
+    MOVE: struct.Struct('<BHHHB'),           # op, snake id, x, y, grew
+    DIE: struct.Struct('<BH'),               # op, snake id
+    SPAWN: struct.Struct('<BHHHB'),          # op, snake id, x, y, direction
+    FOOD_ADD: struct.Struct('<BHH'),         # op, x, y
+    FOOD_REMOVE: struct.Struct('<BHH'),      # op, x, y
+}
+
+
+def frame(payload):
+    """Prefix a payload with its length"""
+    return FRAME.pack(len(payload)) + payload
+
+
+async def read_message(reader, limit=MAX_FRAME):
+    """Read one framed payload from an asyncio stream, raising ValueError if it is over limit"""
+    header = await reader.readexactly(FRAME.size)
+    size = FRAME.unpack(header)[0]
+    if limit is not None and size > limit:
+        raise ValueError(f"Frame of {size} bytes is over the {limit} byte limit")
+    return await reader.readexactly(size)
+
+
+def encode_join(room, username):
+    """Ask to join a room (created on demand) as a player"""
+    # Cut to 255 bytes without splitting a UTF-8 character, or the server rejects the join
+    room_bytes = room.encode()[:255].decode(errors='ignore').encode()
+    name_bytes = username.encode()[:255].decode(errors='ignore').encode()
+    return frame(JOIN + bytes([len(room_bytes)]) + room_bytes + bytes([len(name_bytes)]) + name_bytes)
+
+
+def decode_join(payload):
+    """Get (room, username) from a join payload, raising ValueError if it is malformed"""
+    if len(payload) < 3 or len(payload) < 3 + payload[1]:
+        raise ValueError("Join message is truncated")
+    room_length = payload[1]
+    name_start = 2 + room_length
+    if len(payload) != name_start + 1 + payload[name_start]:
+        raise ValueError("Join message is truncated or padded")
+    room = payload[2:name_start].decode()  # UnicodeDecodeError is a ValueError
+    username = payload[name_start + 1:].decode()
+    if not username.strip():
+        raise ValueError("Join without a username")
+    return room, username
+
+
+def encode_turn(direction):
+    """Send a direction change"""
+    return frame(TURN_MSG.pack(TURN, DIRECTIONS.index(direction)))
+
+
+def decode_turn(payload):
+    """Get the direction from a turn payload, raising ValueError if it is malformed"""
+    if len(payload) != TURN_MSG.size:
+        raise ValueError("Turn message has the wrong size")
+    code = payload[1]
+    if code >= len(DIRECTIONS):
+        raise ValueError(f"Unknown direction code {code}")
+    return DIRECTIONS[code]
+
+
+def encode_resync():
+    """Ask for a fresh snapshot"""
+    return frame(RESYNC)
+
+
+def encode_snapshot(arena, your_snake=NO_SNAKE):
+    """Pack the whole arena, used on join and resync"""
+    parts = [SNAPSHOT_HEADER.pack(SNAPSHOT, arena.ticks, arena.world.width, arena.world.height,
+                                  your_snake, len(arena.snakes), len(arena.foods))]
+    for snake in arena.snakes:
+        body = snake.body if snake.alive else ()
+        parts.append(SNAKE_HEADER.pack(snake.id, snake.alive, DIRECTIONS.index(snake.direction),
+                                       snake.score, len(body)))
+        parts.extend(CELL.pack(x, y) for x, y in body)
+    parts.extend(CELL.pack(x, y) for x, y in arena.foods)
+    return frame(b''.join(parts))
+
+
+def encode_delta(tick, changes):
+    """Pack one tick's worth of arena changes"""
+    parts = [DELTA_HEADER.pack(DELTA, tick, len(changes))]
+    for change in changes:
+        parts.append(CHANGE_STRUCTS[change[0]].pack(*change))
+    return frame(b''.join(parts))
+
+
+class MirrorSnake:
+    def __init__(self, snake_id, body, direction, alive=True, score=0):
+        self.id = snake_id
+        self.body = deque(body)
+        self.direction = direction
+        self.alive = alive
+        self.score = score
+
+
+class RoomMirror:
+    """Client-side copy of a room, rebuilt from snapshots and kept current with deltas"""
+
+    def __init__(self):
+        self.tick = 0
+        self.width = 0
+        self.height = 0
+        self.your_snake = NO_SNAKE
+        self.snakes = {}
+        self.foods = set()
+
+    def apply(self, payload):
+        """Apply a snapshot or delta payload"""
+        if payload[:1] == SNAPSHOT:
+            self.apply_snapshot(payload)
+        elif payload[:1] == DELTA:
+            self.apply_delta(payload)
+
+    def apply_snapshot(self, payload):
+        """Replace the mirror with a full snapshot"""
+        _, self.tick, self.width, self.height, self.your_snake, snake_count, food_count = \
+            SNAPSHOT_HEADER.unpack_from(payload)
+        offset = SNAPSHOT_HEADER.size
+        self.snakes = {}
+        for _ in range(snake_count):
+            snake_id, alive, direction, score, length = SNAKE_HEADER.unpack_from(payload, offset)
+            offset += SNAKE_HEADER.size
+            body = [CELL.unpack_from(payload, offset + i * CELL.size) for i in range(length)]
+            offset += length * CELL.size
+            self.snakes[snake_id] = MirrorSnake(snake_id, body, DIRECTIONS[direction], bool(alive), score)
+        self.foods = {CELL.unpack_from(payload, offset + i * CELL.size) for i in range(food_count)}
+
+    def apply_delta(self, payload):
+        """Replay one tick of changes in order"""
+        _, tick, count = DELTA_HEADER.unpack_from(payload)
+        if tick <= self.tick:
+            return  # Already covered by a snapshot
+        self.tick = tick
+        offset = DELTA_HEADER.size
+        for _ in range(count):
+            op = payload[offset]
+            change = CHANGE_STRUCTS[op].unpack_from(payload, offset)
+            offset += CHANGE_STRUCTS[op].size
+
+            if op == MOVE:
+                _, snake_id, x, y, grew = change
+                snake = self.snakes[snake_id]
+                snake.direction = (x - snake.body[0][0], y - snake.body[0][1])
+                snake.body.appendleft((x, y))
+                if grew:
+                    snake.score += 10
+                else:
+                    snake.body.pop()  # Tail removed
+            elif op == DIE:
+                snake = self.snakes[change[1]]
+                snake.alive = False
+                snake.body.clear()
+            elif op == SPAWN:
+                _, snake_id, x, y, direction = change
+                self.snakes[snake_id] = MirrorSnake(snake_id, [(x, y)], DIRECTIONS[direction])
+            elif op == FOOD_ADD:
+                self.foods.add(change[1:])
+            elif op == FOOD_REMOVE:
+                self.foods.discard(change[1:])
+
+    def matches(self, other):
+        """Check if two mirrors hold the same board"""
+        if self.tick != other.tick or self.foods != other.foods:
+            return False
+        for snake_id, snake in self.snakes.items():
+            theirs = other.snakes.get(snake_id)
+            if snake.alive != (theirs is not None and theirs.alive):
+                return False
+            if snake.alive and (snake.body != theirs.body or snake.score != theirs.score):
+                return False
+        return True
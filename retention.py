@@ -0,0 +1,209 @@
+"""
+Score retention job
+Rolls games older than the retention period out of the hot scores table in small batches:
+each batch is added to per-player monthly totals in score_aggregates, copied to
+scores_archive (or a gzip CSV file) and deleted, in one short transaction, with a pause
+between batches so the game and the leaderboard never wait long on locks. The all-time top
+scores stay in scores so the leaderboard doesn't change.
+    python retention.py --days 90
+"""
+
+import argparse
+import csv
+import datetime
+import gzip
+import io
+import os
+import statistics
+import time
+from database import DatabaseManager
+
+LEADERBOARD_SAMPLES = 20
+
+def period_of(game_date):
+    """First day of the month a game was played in"""
+    if isinstance(game_date, datetime.datetime):
+        return game_date.date().replace(day=1)
+    return datetime.date.fromisoformat(str(game_date)[:7] + "-01")
+
+def measure(db):
+    """Row count, table size (MySQL only) and median leaderboard query time"""
+    cursor = db.connection.cursor()
+    cursor.execute("SELECT COUNT(*) FROM scores")
+    rows = cursor.fetchone()[0]
+    size = None
+    try:
+        cursor.execute("""
+            SELECT data_length + index_length FROM information_schema.TABLES
+            WHERE table_schema = DATABASE() AND table_name = 'scores'
+        """)
+        result = cursor.fetchone()
+        size = result[0] if result else None
+    except db.errors:
+        pass  # Not MySQL
+    cursor.close()
+
+    timings = []
+    for _ in range(LEADERBOARD_SAMPLES):
+        start = time.perf_counter()
+        db.get_leaderboard(10)
+        timings.append(time.perf_counter() - start)
+    return rows, size, statistics.median(timings)
+
+def protected_score(db, keep_top):
+    """Lowest score still on the all-time top list - games at or above it are kept"""
+    cursor = db.connection.cursor()
+    cursor.execute("SELECT score FROM scores ORDER BY score DESC LIMIT 1 OFFSET %s", (keep_top - 1,))
+    row = cursor.fetchone()
+    cursor.close()
+    return row[0] if row else None
+
+class FileArchive:
+    """Appends archived games to a gzip CSV file, synced before they are deleted"""
+    def __init__(self, path):
+        self.path = path
+        self.raw = open(path, 'ab')
+        self.gzip = gzip.GzipFile(fileobj=self.raw, mode='ab')  # A new gzip member per run
+        self.text = io.TextIOWrapper(self.gzip, newline='')
+        self.writer = csv.writer(self.text)
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+        self.text.flush()
+        self.gzip.flush()  # Sync flush, so everything so far can be decompressed
+        self.raw.flush()
+        os.fsync(self.raw.fileno())
+
+    def close(self):
+        self.text.close()
+        self.raw.close()
+
+def run_batch(db, rows, archive):
+    """Aggregate, archive and delete one batch of games in a single transaction"""
+    totals = {}
+    for _, user_id, score, level, game_date, _ in rows:
+        key = (user_id, period_of(game_date))
+        games, total, best, best_level = totals.get(key, (0, 0, 0, 0))
+        totals[key] = (games + 1, total + score, max(best, score), max(best_level, level))
+
+    if archive:
+        archive.write(rows)  # On disk before the rows leave MySQL
+
+    cursor = db.connection.cursor()
+    try:
+        cursor.executemany("""
+            INSERT IGNORE INTO score_aggregates (user_id, period, games, total_score, best_score, best_level)
+            VALUES (%s, %s, 0, 0, 0, 0)
+        """, list(totals))
+        cursor.executemany("""
+            UPDATE score_aggregates
+            SET games = games + %s,
+                total_score = total_score + %s,
+                best_score = CASE WHEN best_score < %s THEN %s ELSE best_score END,
+                best_level = CASE WHEN best_level < %s THEN %s ELSE best_level END
+            WHERE user_id = %s AND period = %s
+        """, [(games, total, best, best, best_level, best_level, user_id, period)
+              for (user_id, period), (games, total, best, best_level) in totals.items()])
+        if not archive:
+            cursor.executemany("""
+                INSERT IGNORE INTO scores_archive (id, user_id, score, level, game_date, client_key)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, rows)
+        placeholders = ", ".join(["%s"] * len(rows))
+        cursor.execute(f"DELETE FROM scores WHERE id IN ({placeholders})", [row[0] for row in rows])
+        db.connection.commit()
+    except db.errors:
+        db.connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+def run(db, args):
+    """Roll old games out of scores and return how many were moved"""
+    cutoff = (datetime.datetime.now() - datetime.timedelta(days=args.days)).strftime("%Y-%m-%d %H:%M:%S")
+    threshold = protected_score(db, args.keep_top)
+    if threshold is None:
+        print(f"Fewer than {args.keep_top} scores - nothing to roll up")
+        return 0
+    archive = FileArchive(args.archive_file) if args.archive_file else None
+
+    moved = batches = 0
+    last_id = 0
+    try:
+        while not args.max_batches or batches < args.max_batches:
+            # Walks the primary key, so each batch is a short range scan
+            cursor = db.connection.cursor()
+            cursor.execute("""
+                SELECT id, user_id, score, level, game_date, client_key FROM scores
+                WHERE id > %s AND game_date < %s AND score < %s
+                ORDER BY id LIMIT %s
+            """, (last_id, cutoff, threshold, args.batch))
+            rows = cursor.fetchall()
+            cursor.close()
+            if not rows:
+                break
+            run_batch(db, rows, archive)
+            last_id = rows[-1][0]
+            moved += len(rows)
+            batches += 1
+            if batches % 20 == 0:
+                print(f"   {moved} games rolled up...")
+            time.sleep(args.pause)  # Let other queries and replication catch up
+    finally:
+        if archive:
+            archive.close()
+    return moved
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Roll old games out of the scores table")
+    parser.add_argument("--days", type=int, default=90, help="Keep this many days of games in scores")
+    parser.add_argument("--batch", type=int, default=1000, help="Games per transaction")
+    parser.add_argument("--pause", type=float, default=0.05, help="Seconds to wait between batches")
+    parser.add_argument("--max-batches", type=int, default=0, help="Stop after this many batches (0 = all)")
+    parser.add_argument("--keep-top", type=int, default=100, help="Never move the all-time top N scores")
+    parser.add_argument("--archive-file", metavar="PATH",
+                        help="Append archived games to this .csv.gz instead of scores_archive")
+    parser.add_argument("--optimize", action="store_true", help="OPTIMIZE TABLE scores afterwards (MySQL)")
+    parser.add_argument("--local-db", metavar="PATH", help="Run against a local sqlite stand-in")
+    args = parser.parse_args()
+
+    if args.local_db:
+        import localdb
+        db = DatabaseManager(connector=localdb, config={'database': args.local_db})
+    else:
+        db = DatabaseManager()
+    if db.status != "CONNECTED":
+        raise SystemExit(1)
+
+    print("="*60)
+    print(f"SCORE RETENTION - keeping {args.days} days and the top {args.keep_top} scores")
+    print("="*60)
+
+    rows_before, size_before, latency_before = measure(db)
+    started = time.perf_counter()
+    try:
+        moved = run(db, args)
+    except db.errors as e:
+        print(f"❌ Retention stopped: {e} (finished batches are kept, just run it again)")
+        moved = 0
+
+    if args.optimize and moved:
+        cursor = db.connection.cursor()
+        try:
+            cursor.execute("OPTIMIZE TABLE scores")  # Online rebuild for InnoDB - gives the space back
+            cursor.fetchall()
+        except db.errors as e:
+            print(f"⚠️  OPTIMIZE TABLE failed: {e}")
+        cursor.close()
+    rows_after, size_after, latency_after = measure(db)
+    elapsed = time.perf_counter() - started
+
+    print(f"\n🧹 Rolled {moved} games into score_aggregates in {elapsed:.1f}s "
+          f"({moved / max(elapsed, 1e-9):.0f} games/s)")
+    print(f"   scores rows: {rows_before} -> {rows_after} "
+          f"({(1 - rows_after / max(rows_before, 1)) * 100:.1f}% smaller)")
+    if size_before is not None and size_after is not None:
+        print(f"   scores size: {size_before / 1e6:.1f} MB -> {size_after / 1e6:.1f} MB "
+              "(InnoDB only returns space after --optimize)")
+    print(f"   leaderboard query: {latency_before * 1000:.2f} ms -> {latency_after * 1000:.2f} ms (median)")
+    db.close()
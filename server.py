@@ -0,0 +1,235 @@
+"""
+Authoritative multiplayer Snake server
+Runs the arena rules for many rooms at a fixed tick rate. Clients send direction changes
+and receive per-tick deltas (see protocol.py). Scores go through DatabaseManager.save_score.
+"""
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from arena import Arena
+from config import SERVER_CONFIG
+import protocol
+
+class Client:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.room = None
+        self.snake = None
+        self.username = ""
+        self.user_id = None
+        self.pending_direction = None
+        self.needs_snapshot = True
+        self.synced = False  # Has a snapshot plus every delta since
+
+class Room:
+    def __init__(self, name, server):
+        self.name = name
+        self.server = server
+        self.arena = Arena(SERVER_CONFIG['room_width'], SERVER_CONFIG['room_height'],
+                           ai_snakes=SERVER_CONFIG['room_ai_snakes'],
+                           food_count=SERVER_CONFIG['room_food'], track_changes=True)
+        self.clients = set()
+        self.owners = {}        # Snake id -> client playing it
+        self.free_snakes = []   # Snakes left behind by clients that went away
+        self.task = None
+
+    def join(self, client):
+        """Give a client a snake and schedule its first snapshot"""
+        if self.free_snakes:
+            snake = self.free_snakes.pop()
+            self.arena.respawn_snake(snake)
+        else:
+            snake = self.arena.spawn_snake(is_ai=False)
+        client.room = self
+        client.snake = snake
+        client.needs_snapshot = True
+        self.owners[snake.id] = client
+        self.clients.add(client)
+
+    def leave(self, client):
+        """Remove a client's snake from the board"""
+        self.clients.discard(client)
+        self.owners.pop(client.snake.id, None)
+        if client.snake.alive:
+            self.arena.kill(client.snake)
+        self.free_snakes.append(client.snake)
+
+    def step(self):
+        """Run one tick and send its delta to every client"""
+        arena = self.arena
+
+        # Apply the latest valid turn from each player
+        for client in self.clients:
+            direction = client.pending_direction
+            if direction and client.snake.alive:
+                current = client.snake.direction
+                if direction != (-current[0], -current[1]):
+                    client.snake.direction = direction
+            client.pending_direction = None
+
+        for snake in arena.tick():
+            client = self.owners.get(snake.id)
+            if client:
+                self.server.save_score(client, snake.score)
+                arena.respawn_snake(snake)
+
+        delta = protocol.encode_delta(arena.ticks, arena.changes)
+        arena.changes = []
+
+        for client in self.clients:
+            transport = client.writer.transport
+            if transport.is_closing():
+                continue
+            if transport.get_write_buffer_size() > SERVER_CONFIG['max_send_buffer']:
+                # Too far behind for deltas - skip ahead with a snapshot once it drains
+                client.needs_snapshot = True
+                client.synced = False
+                continue
+            if client.needs_snapshot:
+                message = protocol.encode_snapshot(arena, client.snake.id)
+                if client.synced:
+                    # Clients that asked for a resync get this tick's delta too,
+                    # so they can check their copy against the snapshot
+                    message = delta + message
+                client.needs_snapshot = False
+                client.synced = True
+            else:
+                message = delta
+            client.writer.write(message)
+            self.server.bytes_sent += len(message)
+        self.server.ticks += 1
+
+    async def run(self):
+        """Tick on a fixed schedule until the room is empty"""
+        loop = asyncio.get_running_loop()
+        interval = 1.0 / SERVER_CONFIG['tick_rate']
+        next_tick = loop.time()
+
+        while self.clients:
+            start = time.perf_counter()
+            self.step()
+            self.server.tick_time += time.perf_counter() - start
+
+            next_tick += interval
+            delay = next_tick - loop.time()
+            if delay < -interval:
+                # Fell more than a tick behind - don't try to catch up in a burst
+                self.server.late_ticks += 1
+                next_tick = loop.time()
+                delay = 0
+            await asyncio.sleep(max(0, delay))
+
+        del self.server.rooms[self.name]
+        print(f"🧹 Room '{self.name}' closed")
+
+class GameServer:
+    def __init__(self, use_db=True):
+        self.rooms = {}
+        self.use_db = use_db
+        self.db = None
+        # DatabaseManager isn't thread-safe, so all database work runs on one thread
+        self.db_executor = ThreadPoolExecutor(max_workers=1)
+        self.clients = 0
+        self.ticks = 0
+        self.late_ticks = 0
+        self.tick_time = 0.0
+        self.bytes_sent = 0
+        self.tasks = set()  # Keeps background tasks alive until they finish
+
+    def start_task(self, coro):
+        """Run a coroutine in the background"""
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    def connect_db(self):
+        """Create the database manager (runs on the database thread)"""
+        from database import DatabaseManager
+        self.db = DatabaseManager()
+
+    def run_db(self, func, *args):
+        """Run a blocking database call without stalling the tick loop"""
+        return asyncio.get_running_loop().run_in_executor(self.db_executor, func, *args)
+
+    def save_score(self, client, score):
+        """Queue a finished game for the existing save_score path"""
+        if self.db and client.user_id:
+            level = 1 + score // 50  # Level up every 50 points
+            self.run_db(self.db.save_score, client.user_id, score, level)
+
+    async def register(self, client):
+        """Look up the player's user id in the background"""
+        if self.db:
+            client.user_id = await self.run_db(self.db.register_user, client.username)
+
+    async def handle_client(self, reader, writer):
+        """Serve one connection until it closes"""
+        client = Client(reader, writer)
+        self.clients += 1
+        try:
+            while True:
+                payload = await protocol.read_message(reader, protocol.MAX_CLIENT_FRAME)
+                kind = payload[:1]
+
+                if kind == protocol.TURN and client.room:
+                    client.pending_direction = protocol.decode_turn(payload)
+                elif kind == protocol.RESYNC and client.room:
+                    client.needs_snapshot = True
+                elif kind == protocol.JOIN and not client.room:
+                    room_name, client.username = protocol.decode_join(payload)
+                    room = self.rooms.get(room_name)
+                    if not room:
+                        room = self.rooms[room_name] = Room(room_name, self)
+                    room.join(client)
+                    if not room.task:
+                        room.task = self.start_task(room.run())
+                    self.start_task(self.register(client))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except ValueError as e:
+            print(f"⚠️  Dropping client after a bad message: {e}")
+        finally:
+            self.clients -= 1
+            if client.room:
+                client.room.leave(client)
+            writer.close()
+
+    async def report(self, every=5.0):
+        """Print throughput numbers while the server runs"""
+        while True:
+            await asyncio.sleep(every)
+            ticks = self.ticks or 1
+            print(f"📊 {self.clients} clients, {len(self.rooms)} rooms, "
+                  f"{self.ticks / every:.0f} room ticks/s, "
+                  f"{self.tick_time / ticks * 1000:.2f} ms/tick, "
+                  f"{self.bytes_sent / every / 1024:.0f} KiB/s out, "
+                  f"{self.late_ticks} late ticks")
+            self.ticks = self.late_ticks = self.bytes_sent = 0
+            self.tick_time = 0.0
+
+    async def serve(self, host, port):
+        """Accept clients forever"""
+        if self.use_db:
+            await self.run_db(self.connect_db)
+        server = await asyncio.start_server(self.handle_client, host, port)
+        print(f"🐍 Snake server listening on {host}:{port} "
+              f"({SERVER_CONFIG['tick_rate']} ticks/s per room)")
+        self.start_task(self.report())
+        async with server:
+            await server.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the multiplayer Snake server")
+    parser.add_argument("--host", default=SERVER_CONFIG['host'])
+    parser.add_argument("--port", type=int, default=SERVER_CONFIG['port'])
+    parser.add_argument("--no-db", action="store_true", help="Don't save scores to MySQL")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(GameServer(use_db=not args.no_db).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 Server stopped")
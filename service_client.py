@@ -0,0 +1,157 @@
+"""
+Game-side client for the leaderboard service (leaderboard_service.py)
+ServiceClient has the DatabaseManager methods the game uses but sends them to the service
+over localhost, so kiosks share the service's single MySQL connection and need no database
+credentials. Requests and replies are length-prefixed JSON objects, framed like protocol.py.
+"""
+
+import datetime
+import json
+import socket
+import struct
+from config import SERVICE_CONFIG
+from database import DatabaseManager
+
+FRAME = struct.Struct('<I')
+
+def as_json(value):
+    """Dates as ISO 8601 text, for json.dumps"""
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(sep=" ")
+    raise TypeError(f"Can't send {type(value).__name__} to the leaderboard service")
+
+def encode(message):
+    """Frame a request or reply"""
+    payload = json.dumps(message, default=as_json, separators=(",", ":")).encode()
+    return FRAME.pack(len(payload)) + payload
+
+class ServiceClient(DatabaseManager):
+    def __init__(self, connect=True, host=None, port=None):
+        self.address = (host or SERVICE_CONFIG['host'], port or SERVICE_CONFIG['port'])
+        self.sock = None
+        DatabaseManager.__init__(self, connect=False, replicas=[])
+        if connect:
+            self.connect()
+
+    def connect(self):
+        """Connect to the leaderboard service"""
+        with self.lock:
+            self.status = "CONNECTING"
+            try:
+                self.sock = socket.create_connection(self.address, timeout=SERVICE_CONFIG['client_timeout'])
+                self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # Requests are tiny
+                self.status = "CONNECTED"
+                print("✅ Connected to the leaderboard service")
+            except OSError as e:
+                print(f"❌ Leaderboard service connection failed: {e}")
+                print("Tip: Start it with 'python leaderboard_service.py'")
+                self.sock = None
+                self.status = "DISCONNECTED"
+
+    def receive_exactly(self, size):
+        data = b''
+        while len(data) < size:
+            chunk = self.sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("Leaderboard service closed the connection")
+            data += chunk
+        return data
+
+    def call(self, op, **fields):
+        """Send one request and wait for its reply, or None if the service is unreachable"""
+        with self.lock:
+            if self.sock is None:
+                self.connect()
+                if self.sock is None:
+                    return None
+            try:
+                self.sock.sendall(encode({"op": op, **fields}))
+                size = FRAME.unpack(self.receive_exactly(FRAME.size))[0]
+                reply = json.loads(self.receive_exactly(size))
+            except (OSError, ValueError) as e:
+                print(f"❌ Leaderboard service error: {e}")
+                self.sock.close()
+                self.sock = None
+                self.status = "DISCONNECTED"
+                return None
+            if not reply.get("ok"):
+                print(f"❌ Leaderboard service couldn't {op}: {reply.get('error', 'database error')}")
+            return reply
+
+    def register_user(self, username):
+        """Register a new user or get existing user ID"""
+        reply = self.call("register", username=username)
+        return reply["user_id"] if reply and reply["ok"] else None
+
+    def save_score(self, user_id, score, level, client_key=None):
+        """Save score through the service, committed together with other clients' scores"""
+        if not self.save_scores([(user_id, score, level, client_key)]):
+            return False
+        print("✅ Score saved to database!")
+        return True
+
+    def finish_game(self, user_id, score, level, client_key=None, limit=10):
+        """Save a finished game, returning (top scores, rank) like DatabaseManager.finish_game"""
+        # The save joins the service's group commit, the reads come from its memory
+        if not self.save_score(user_id, score, level, client_key):
+            return None
+        return self.get_leaderboard(limit), self.get_rank(score)
+
+    def save_scores(self, rows):
+        """Save many results in one request"""
+        reply = self.call("save", rows=[list(row) for row in rows])
+        return bool(reply and reply["ok"])
+
+    def get_leaderboard(self, limit=10):
+        """Get top scores with usernames"""
+        reply = self.call("top", limit=limit)
+        if not reply or not reply["ok"]:
+            return []
+        return [(username, score, level, datetime.datetime.fromisoformat(date) if date else None)
+                for username, score, level, date in reply["rows"]]
+
+    def get_rank(self, score):
+        """Position a score would take on the all-time leaderboard (1 = best)"""
+        reply = self.call("rank", score=score)
+        return reply["rank"] if reply and reply["ok"] else None
+
+    def scan_scores(self, callback, after_id=0, batch_size=5000):
+        """Stream (id, score, client_key) rows newer than after_id to callback in batches"""
+        while True:
+            reply = self.call("scan", after_id=after_id, limit=batch_size)
+            if not reply or not reply["ok"]:
+                return None
+            rows = [tuple(row) for row in reply["rows"]]
+            if not rows:
+                return after_id
+            callback(rows)
+            after_id = rows[-1][0]
+
+    def scan_usernames(self, callback, after_id=0, batch_size=5000):
+        """Stream (id, username) rows newer than after_id to callback in batches"""
+        while True:
+            reply = self.call("users", after_id=after_id, limit=batch_size)
+            if not reply or not reply["ok"]:
+                return None
+            rows = [tuple(row) for row in reply["rows"]]
+            if not rows:
+                return after_id
+            callback(rows)
+            after_id = rows[-1][0]
+
+    def import_offline_batch(self, usernames, scores):
+        """Send players and keyed scores recorded offline, saved in one transaction"""
+        reply = self.call("import", usernames=sorted(usernames), scores=[list(score) for score in scores])
+        if not reply or not reply["ok"]:
+            return None
+        return reply["user_ids"], reply["inserted"]
+
+    def close(self):
+        """Close the connection to the service"""
+        if self.worker:
+            self.worker.shutdown(wait=True)
+        with self.lock:
+            if self.sock:
+                self.sock.close()
+                self.sock = None
+            self.status = "DISCONNECTED"
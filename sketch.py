@@ -0,0 +1,189 @@
+"""
+Streaming score percentiles
+KLLSketch is a mergeable quantile sketch (Karnin, Lang & Liberty): it keeps a few hundred
+scores in levels of compactors, where a score on level h stands for 2^h games. With the
+default k = 200 a rank is within about ±1.7% of the exact one (99% of the time), no matter
+how many scores it has seen. ScoreDistribution keeps one seeded from MySQL and persisted to
+disk, so the game over screen can say "you beat X% of scores" without scanning the table.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from itertools import accumulate
+
+class KLLSketch:
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.n = 0  # Scores seen
+        self.levels = [[]]
+        self.size = 0  # Scores held
+        self.max_size = 0
+        self.random = random.Random(seed)
+        self.cache = None  # Sorted (values, cumulative weights) for rank queries
+        self.update_max_size()
+
+    def capacity(self, level):
+        """Most scores a level may hold - lower levels get geometrically less room"""
+        depth = len(self.levels) - level - 1
+        return int(self.k * (2 / 3) ** depth) + 2
+
+    def update_max_size(self):
+        self.max_size = sum(self.capacity(level) for level in range(len(self.levels)))
+
+    def add(self, value):
+        """Count one score"""
+        self.levels[0].append(value)
+        self.n += 1
+        self.size += 1
+        self.cache = None
+        if self.size >= self.max_size:
+            self.compress()
+
+    def merge(self, other):
+        """Add everything another sketch has seen"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, values in enumerate(other.levels):
+            self.levels[level].extend(values)
+        self.n += other.n
+        self.size = sum(len(values) for values in self.levels)
+        self.update_max_size()
+        self.cache = None
+        while self.size >= self.max_size:
+            self.compress()
+
+    def compress(self):
+        """Halve the first full level, promoting every other score with double weight"""
+        for level in range(len(self.levels)):
+            values = self.levels[level]
+            if len(values) < self.capacity(level):
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append([])
+                self.update_max_size()
+            values.sort()
+            # An odd score out stays behind, the rest pair up and one of each pair moves up
+            keep = [values.pop()] if len(values) % 2 else []
+            self.levels[level + 1].extend(values[self.random.getrandbits(1)::2])
+            self.levels[level] = keep
+            self.size = sum(len(values) for values in self.levels)
+            if self.size < self.max_size:
+                break
+
+    def build_cache(self):
+        """Sort the held scores once, so rank queries are a binary search"""
+        weighted = sorted((value, 1 << level) for level, values in enumerate(self.levels)
+                          for value in values)
+        self.cache = ([value for value, _ in weighted],
+                      [0] + list(accumulate(weight for _, weight in weighted)))
+
+    def rank(self, value):
+        """Estimated number of scores below value"""
+        if self.cache is None:
+            self.build_cache()
+        values, cumulative = self.cache
+        return cumulative[bisect_left(values, value)]
+
+    def fraction_below(self, value):
+        """Estimated share of scores below value, 0.0 to 1.0"""
+        return self.rank(value) / self.n if self.n else 0.0
+
+    def quantile(self, fraction):
+        """Estimated score at a share of the distribution, e.g. 0.5 for the median"""
+        if self.cache is None:
+            self.build_cache()
+        values, cumulative = self.cache
+        if not values:
+            return None
+        target = fraction * cumulative[-1]
+        index = bisect_left(cumulative, target, 1) - 1
+        return values[min(index, len(values) - 1)]
+
+    def to_dict(self):
+        return {"k": self.k, "n": self.n, "levels": self.levels}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["k"])
+        sketch.n = data["n"]
+        sketch.levels = [list(values) for values in data["levels"]] or [[]]
+        sketch.size = sum(len(values) for values in sketch.levels)
+        sketch.update_max_size()
+        return sketch
+
+class ScoreDistribution:
+    """All scores ever saved, from MySQL plus the games played since the last refresh"""
+    def __init__(self, path, k=200, max_recent=1000):
+        self.path = path
+        self.lock = threading.Lock()  # Refreshed on its own thread, read by the game loop
+        self.sketch = KLLSketch(k)
+        self.max_id = 0  # Highest scores.id already in the sketch
+        self.recent = {}  # client_key -> score for games played here that no refresh has read back yet
+        self.max_recent = max_recent  # Games that never reach MySQL would otherwise pile up here
+        self.refreshed = 0.0
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            self.sketch = KLLSketch.from_dict(data["sketch"])
+            self.max_id = data["max_id"]
+        except (OSError, ValueError, KeyError):
+            pass  # No saved sketch yet - the first refresh reads the whole table
+
+    def add(self, score, client_key):
+        """Count a game that was just played, until a refresh streams it back under its client_key"""
+        with self.lock:
+            if len(self.recent) >= self.max_recent:
+                del self.recent[next(iter(self.recent))]  # Oldest first
+            self.recent[client_key] = score
+
+    def fraction_below(self, score):
+        """Share of all scores below this one, or None before any scores are known"""
+        with self.lock:
+            below = self.sketch.rank(score) + sum(1 for recent in self.recent.values() if recent < score)
+            total = self.sketch.n + len(self.recent)
+        return below / total if total else None
+
+    def refresh(self, db, batch_size=5000):
+        """Stream scores newer than the sketch from MySQL in one pass, then save to disk"""
+        started = time.perf_counter()
+        with self.lock:
+            after_id = self.max_id
+        fresh = KLLSketch(self.sketch.k)
+        streamed = []  # client_keys of the scores read
+
+        def add_rows(rows):
+            for _, score, client_key in rows:
+                fresh.add(score)
+                if client_key:
+                    streamed.append(client_key)
+
+        max_id = db.scan_scores(add_rows, after_id, batch_size)
+        if max_id is None:
+            return False  # Database unreachable - keep what we have
+
+        with self.lock:
+            self.sketch.merge(fresh)
+            self.max_id = max(self.max_id, max_id)
+            for client_key in streamed:
+                self.recent.pop(client_key, None)  # Now counted in the sketch
+            self.refreshed = time.monotonic()
+        self.save()
+        print(f"📊 Score sketch: +{fresh.n} scores in {(time.perf_counter() - started) * 1000:.0f} ms "
+              f"({self.sketch.n} total, {self.sketch.size} kept)")
+        return True
+
+    def save(self):
+        """Write the sketch to disk, replacing the old file atomically"""
+        with self.lock:
+            data = {"max_id": self.max_id, "sketch": self.sketch.to_dict()}
+        temp = self.path + ".tmp"
+        try:
+            with open(temp, 'w') as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(temp, self.path)
+        except OSError as e:
+            print(f"⚠️  Could not save score sketch: {e}")
@@ -3,113 +3,56 @@ Snake Game with MySQL Leaderboard - Windows Version
 Complete working game with wall collision, user registration, and score tracking
 """
 
+import time
+STARTED = time.perf_counter()  # Startup is measured from here to the first frame
+
 import pygame
-import random
-import mysql.connector
-from mysql.connector import Error
 import datetime
-from config import DB_CONFIG
+import os
+import snapshot
+import threading
+from config import DB_CONFIG, GAME_CONFIG, JOURNAL_CONFIG, SERVICE_CONFIG
+from controls import InputQueue
+from database import DatabaseManager
+from engine import SnakeEngine
+from fonts import FontCache
+from journal import ScoreJournal
+from names import UsernameIndex
+from obstacles import ObstacleMap
+from service_client import ServiceClient
+from sketch import ScoreDistribution
+from sprites import Background, SegmentAtlas
+from world import DIRECTIONS, Camera
 
-class DatabaseManager:
-    def __init__(self):
-        self.connection = None
-        self.connect()
-    
-    def connect(self):
-        """Connect to MySQL database on Windows"""
-        try:
-            self.connection = mysql.connector.connect(**DB_CONFIG)
-            if self.connection.is_connected():
-                print("✅ Connected to MySQL database")
-        except Error as e:
-            print(f"❌ Database connection failed: {e}")
-            print("Tip: Make sure MySQL is running and check config.py settings")
-    
-    def register_user(self, username):
-        """Register a new user or get existing user ID"""
-        try:
-            # Ensure connection exists
-            if not self.connection or not self.connection.is_connected():
-                self.connect()
-                if not self.connection:
-                    return None
-            
-            cursor = self.connection.cursor()
-            
-            # Try to insert new user
-            insert_query = "INSERT IGNORE INTO users (username) VALUES (%s)"
-            cursor.execute(insert_query, (username,))
-            self.connection.commit()
-            
-            # Get user ID
-            select_query = "SELECT id FROM users WHERE username = %s"
-            cursor.execute(select_query, (username,))
-            result = cursor.fetchone()
-            
-            cursor.close()
-            return result[0] if result else None
-            
-        except Error as e:
-            print(f"❌ Error registering user: {e}")
-            return None
-    
-    def save_score(self, user_id, score, level):
-        """Save score to database"""
-        try:
-            if not self.connection or not self.connection.is_connected():
-                self.connect()
-                if not self.connection:
-                    return False
-            
-            cursor = self.connection.cursor()
-            query = "INSERT INTO scores (user_id, score, level) VALUES (%s, %s, %s)"
-            cursor.execute(query, (user_id, score, level))
-            self.connection.commit()
-            cursor.close()
-            print("✅ Score saved to database!")
-            return True
-        except Error as e:
-            print(f"❌ Error saving score: {e}")
-            return False
-    
-    def get_leaderboard(self, limit=10):
-        """Get top scores with usernames"""
-        try:
-            if not self.connection or not self.connection.is_connected():
-                self.connect()
-                if not self.connection:
-                    return []
-            
-            cursor = self.connection.cursor()
-            query = """
-                SELECT u.username, s.score, s.level, s.game_date 
-                FROM scores s 
-                JOIN users u ON s.user_id = u.id 
-                ORDER BY s.score DESC 
-                LIMIT %s
-            """
-            cursor.execute(query, (limit,))
-            results = cursor.fetchall()
-            cursor.close()
-            return results
-        except Error as e:
-            print(f"❌ Error fetching leaderboard: {e}")
-            return []
-    
-    def close(self):
-        """Close database connection"""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
+class SnakeGame(SnakeEngine):
+    USES_OBSTACLE_MAP = True  # Modes whose rules don't know about walls turn this off
 
-class SnakeGame:
     def __init__(self):
-        pygame.init()
+        self.startup_marks = [("imports", time.perf_counter())]
+        
+        # Only the modules the game uses - pygame.init() would also start audio
+        pygame.display.init()
+        pygame.font.init()
         
         # Game constants optimized for Windows display
-        self.WIDTH, self.HEIGHT = 800, 600
-        self.GRID_SIZE = 20
-        self.GRID_WIDTH = self.WIDTH // self.GRID_SIZE
-        self.GRID_HEIGHT = self.HEIGHT // self.GRID_SIZE
+        self.WIDTH, self.HEIGHT = GAME_CONFIG['window_width'], GAME_CONFIG['window_height']
+        self.GRID_SIZE = GAME_CONFIG['grid_size']
+        world_width, world_height = GAME_CONFIG['world_width'], GAME_CONFIG['world_height']
+        
+        # Custom level - the map file sets the board size and the start cell
+        obstacles = None
+        if GAME_CONFIG['obstacle_map'] and self.USES_OBSTACLE_MAP:
+            try:
+                obstacles = ObstacleMap.load(GAME_CONFIG['obstacle_map'])
+                world_width, world_height = obstacles.width, obstacles.height
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Could not load obstacle map, playing without walls: {e}")
+        
+        # Camera over the world - only cells inside it are drawn
+        self.camera = Camera(self.WIDTH // self.GRID_SIZE, self.HEIGHT // self.GRID_SIZE,
+                             world_width, world_height)
+        huge_board = self.camera.cols < world_width or self.camera.rows < world_height
+        minimap_size = GAME_CONFIG['minimap_size'] if huge_board else 0
         
         # Colors
         self.BLACK = (0, 0, 0)
@@ -120,84 +63,171 @@ class SnakeGame:
         self.GRAY = (60, 60, 60)
         self.WALL_COLOR = (178, 34, 34)  # Firebrick red for walls
         
+        # Snake tiles, baked on the first frame
+        self.atlas = SegmentAtlas(self.GRID_SIZE, self.GREEN)
+        # Grid and walls, baked a chunk at a time as the camera reaches them
+        self.background = Background(self.GRID_SIZE, self.GRAY, self.WALL_COLOR, obstacles)
+        
         # Game variables
         self.clock = pygame.time.Clock()
         self.screen = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
         pygame.display.set_caption("Snake Game - Windows MySQL Edition")
-        
-        # Load fonts for Windows
-        try:
-            self.font = pygame.font.SysFont('Segoe UI', 24)
-            self.title_font = pygame.font.SysFont('Segoe UI', 48, bold=True)
-        except:
-            self.font = pygame.font.SysFont('Arial', 24)
-            self.title_font = pygame.font.SysFont('Arial', 48, bold=True)
-        
-        # Database
-        self.db = DatabaseManager()
+        self.startup_marks.append(("window", time.perf_counter()))
+        
+        # Load fonts for Windows (Segoe UI, falling back to Arial) from the resolution cache
+        font_cache = FontCache(GAME_CONFIG['font_cache'])
+        self.font = font_cache.load(['Segoe UI', 'Arial'], 24)
+        self.title_font = font_cache.load(['Segoe UI', 'Arial'], 48, bold=True)
+        font_cache.save()
+        self.startup_marks.append(("fonts", time.perf_counter()))
+        
+        # Database - connects in the background, the login screen shows its status
+        if SERVICE_CONFIG['client_mode']:
+            self.db = ServiceClient(connect=False)  # Through leaderboard_service.py
+        else:
+            self.db = DatabaseManager(connect=False)
+        self.db.connect_in_background()
+        
+        # Every username, for suggestions as a name is typed on the login screen. Refreshed
+        # on its own thread and connection so the scan never queues ahead of a login
+        self.usernames = UsernameIndex(GAME_CONFIG['username_index'])
+        threading.Thread(target=self.refresh_usernames, name="usernames", daemon=True).start()
+        
+        # Distribution of every saved score, for "you beat X%" on the game over screen.
+        # Refreshed once the player is logged in, so its scan never holds up the login
+        self.score_sketch = ScoreDistribution(GAME_CONFIG['score_sketch'])
+        self.sketch_thread = None
+        self.percentile = None
+        self.rank = None  # All-time position of the last game, from finish_game
+        self.finished_top = None  # Top scores that came back with it
+        self.finish_future = None
         self.username = ""
         self.user_id = None
         self.score = 0
         self.level = 1
         self.speed = 10
         
+        # Arrow keys are read every poll and queued, the board takes one turn per tick
+        self.turn_keys = {pygame.K_UP: (0, -1), pygame.K_DOWN: (0, 1),
+                          pygame.K_LEFT: (-1, 0), pygame.K_RIGHT: (1, 0)}
+        self.inputs = InputQueue(GAME_CONFIG['input_queue'])
+        self.next_step = 0.0  # perf_counter time of the next game tick
+        
         # Game states
-        self.game_state = "LOGIN"  # LOGIN, PLAYING, GAME_OVER, LEADERBOARD
+        self.game_state = "LOGIN"  # LOGIN, LOGGING_IN, PLAYING, GAME_OVER, LEADERBOARD
         self.input_text = ""
-        
-        self.reset_game()
+        self.suggestions = []  # Usernames starting with input_text
+        self.suggestion = None  # Index of the highlighted suggestion
+        self.login_message = ""
+        
+        # Login runs on the database worker; scores finished before it resolves wait here
+        self.login_future = None
+        self.login_started = 0.0
+        self.pending_scores = []
+        
+        # Offline mode - registrations and scores go to a local journal until MySQL is back
+        self.journal = None
+        if JOURNAL_CONFIG['enabled']:
+            self.journal = ScoreJournal(JOURNAL_CONFIG['path'], JOURNAL_CONFIG['fsync_batch'],
+                                        JOURNAL_CONFIG['fsync_interval'], JOURNAL_CONFIG['replay_batch'])
+        self.offline = False
+        self.replay_future = None
+        self.replay_checked = None  # Checked right away, so a journal left by a previous run is sent
+        
+        # Menu screens are only repainted when what they show changes
+        self.leaderboard = None  # Top scores, fetched on the worker when the screen opens
+        self.leaderboard_future = None
+        self.drawn_view = None
+        
+        # Board, snake and food (also calls reset_game)
+        SnakeEngine.__init__(self, world_width, world_height, minimap_size, obstacles)
+        self.minimap_surface = None
+        if self.world.minimap:
+            minimap = self.world.minimap
+            # Shares memory with the minimap buffer, so it never needs rebuilding
+            self.minimap_surface = pygame.image.frombuffer(
+                minimap.pixels, (minimap.width, minimap.height), 'RGB')
     
     def reset_game(self):
         """Reset game to initial state"""
-        self.snake = [(self.GRID_WIDTH // 2, self.GRID_HEIGHT // 2)]
-        self.direction = (1, 0)
-        self.food = self.generate_food()
-        self.score = 0
-        self.level = 1
-        self.speed = 10
+        SnakeEngine.reset_game(self)
+        self.camera.follow(*self.snake[0])
+        self.inputs.clear()
+        self.next_step = 0.0
+    
+    def load_state(self, *state):
+        """Replace the current game with a saved one and move the camera to it"""
+        SnakeEngine.load_state(self, *state)
+        self.camera.follow(*self.snake[0])
+        self.inputs.clear()
+    
+    def save_game(self):
+        """Save the current game to disk"""
+        snapshot.save(self, GAME_CONFIG['save_file'])
+        print(f"💾 Game saved to {GAME_CONFIG['save_file']}")
+    
+    def resume_game(self):
+        """Resume the game saved on disk"""
+        if not os.path.exists(GAME_CONFIG['save_file']):
+            print("⚠️  No saved game found")
+            return
+        try:
+            snapshot.load(self, GAME_CONFIG['save_file'])
+            print(f"📂 Game resumed from {GAME_CONFIG['save_file']}")
+        except ValueError as e:
+            print(f"❌ Could not resume game: {e}")
     
-    def generate_food(self):
-        """Generate food at random position not on snake"""
-        while True:
-            food = (random.randint(0, self.GRID_WIDTH - 1), 
-                    random.randint(0, self.GRID_HEIGHT - 1))
-            if food not in self.snake:
-                return food
+    def to_screen(self, x, y):
+        """Convert a world cell to its on-screen pixel position"""
+        return ((x - self.camera.x) * self.GRID_SIZE, (y - self.camera.y) * self.GRID_SIZE)
     
     def draw_grid(self):
-        """Draw grid background"""
-        for x in range(0, self.WIDTH, self.GRID_SIZE):
-            pygame.draw.line(self.screen, self.GRAY, (x, 0), (x, self.HEIGHT), 1)
-        for y in range(0, self.HEIGHT, self.GRID_SIZE):
-            pygame.draw.line(self.screen, self.GRAY, (0, y), (self.WIDTH, y), 1)
+        """Draw grid background and walls from the cached chunks"""
+        # The camera moves in whole cells, so chunks are blitted at whole-cell offsets
+        self.background.draw(self.screen, self.camera)
     
     def draw_snake(self):
         """Draw snake on screen with gradient effect"""
-        for i, segment in enumerate(self.snake):
-            # Gradient from bright head to darker tail
-            if i == 0:  # Head
-                color = self.GREEN
-                border_color = (0, 150, 0)
-            else:
-                # Calculate gradient based on position
-                gradient = max(0.3, 1.0 - (i / len(self.snake) * 0.7))
-                color = (
-                    int(self.GREEN[0] * gradient),
-                    int(self.GREEN[1] * gradient),
-                    int(self.GREEN[2] * gradient)
-                )
-                border_color = (0, 100, 0)
+        # Scan only the visible cells of the occupancy grid instead of the whole body,
+        # so the cost depends on the window size and not on the world or snake size
+        cells = self.world.cells
+        world_width = self.world.width
+        length = len(self.snake)
+        size = self.GRID_SIZE
+        
+        # Shades come from the pre-rendered atlas, a fixed number of them spread along the
+        # body whatever its length, so growing never rebuilds the atlas
+        buckets = GAME_CONFIG['gradient_buckets']
+        self.atlas.ensure(buckets)
+        atlas = self.atlas.surface
+        body_areas = self.atlas.body_areas
+        tiles = []
+        
+        for row in range(self.camera.y, self.camera.y + self.camera.rows):
+            start = row * world_width + self.camera.x
+            visible = cells[start:start + self.camera.cols]
+            if not any(visible):
+                continue
             
-            rect = pygame.Rect(segment[0] * self.GRID_SIZE, 
-                              segment[1] * self.GRID_SIZE, 
-                              self.GRID_SIZE, self.GRID_SIZE)
-            pygame.draw.rect(self.screen, color, rect)
-            pygame.draw.rect(self.screen, border_color, rect, 1)
+            y = (row - self.camera.y) * size
+            for col, seq in enumerate(visible):
+                if seq:
+                    i = self.head_seq - seq
+                    tiles.append((atlas, (col * size, y), body_areas[i * buckets // length]))
+        
+        self.screen.blits(tiles, doreturn=False)
+        
+        # The head tile faces the direction of travel
+        if self.camera.contains(*self.snake[0]):
+            head_area = self.atlas.head_areas[DIRECTIONS.index(self.direction)]
+            self.screen.blit(atlas, self.to_screen(*self.snake[0]), head_area)
     
     def draw_food(self):
         """Draw food on screen with shine effect"""
-        rect = pygame.Rect(self.food[0] * self.GRID_SIZE, 
-                          self.food[1] * self.GRID_SIZE, 
+        if not self.camera.contains(*self.food):
+            return
+        
+        rect = pygame.Rect(*self.to_screen(*self.food), 
                           self.GRID_SIZE, self.GRID_SIZE)
         
         # Main food color
@@ -213,38 +243,29 @@ class SnakeGame:
         pygame.draw.ellipse(self.screen, (255, 200, 200), shine_rect)
     
     def update_snake(self):
-        """Update snake position - DIES WHEN TOUCHING WALLS"""
-        # Calculate new head position
-        head_x, head_y = self.snake[0]
-        dir_x, dir_y = self.direction
-        new_head = (head_x + dir_x, head_y + dir_y)  # No wrap-around
-        
-        # Check collision with walls (dies on wall contact)
-        if (new_head[0] < 0 or new_head[0] >= self.GRID_WIDTH or 
-            new_head[1] < 0 or new_head[1] >= self.GRID_HEIGHT):
-            return False  # Game over - hit wall
-        
-        # Check collision with self
-        if new_head in self.snake:
-            return False  # Game over - hit self
-        
-        # Move snake
-        self.snake.insert(0, new_head)
-        
-        # Check if food is eaten
-        if new_head == self.food:
-            self.score += 10
-            self.food = self.generate_food()
-            
-            # Level up every 50 points
-            if self.score % 50 == 0:
-                self.level += 1
-                self.speed += 2
-        else:
-            # Remove tail if no food eaten
-            self.snake.pop()
-        
-        return True  # Game continues
+        """Update snake position and keep the camera on the head"""
+        alive = SnakeEngine.update_snake(self)
+        self.camera.follow(*self.snake[0])
+        return alive
+    
+    def draw_minimap(self):
+        """Draw the downsampled board in the bottom-right corner"""
+        minimap = self.world.minimap
+        x = self.WIDTH - minimap.width - 10
+        y = self.HEIGHT - minimap.height - 40
+        frame = pygame.Rect(x - 2, y - 2, minimap.width + 4, minimap.height + 4)
+        pygame.draw.rect(self.screen, (30, 30, 30), frame)
+        self.screen.blit(self.minimap_surface, (x, y))
+        pygame.draw.rect(self.screen, self.BLUE, frame, 1)
+        
+        # Viewport outline and food marker
+        scale = minimap.scale
+        view = pygame.Rect(x + self.camera.x // scale, y + self.camera.y // scale,
+                           max(1, self.camera.cols // scale), max(1, self.camera.rows // scale))
+        pygame.draw.rect(self.screen, self.WHITE, view, 1)
+        if self.food:
+            food_dot = pygame.Rect(x + self.food[0] // scale - 1, y + self.food[1] // scale - 1, 3, 3)
+            pygame.draw.rect(self.screen, self.RED, food_dot)
     
     def draw_login_screen(self):
         """Draw login/register screen"""
@@ -275,15 +296,37 @@ class SnakeGame:
             text_surface = self.font.render("Type username here...", True, (180, 180, 180))
         self.screen.blit(text_surface, (input_rect.x + 10, input_rect.y + 8))
         
-        # Info text
-        info = self.font.render("(Creates/loads your player profile in MySQL)", True, (180, 180, 255))
+        # Info text - or what the login is doing
+        if self.game_state == "LOGGING_IN":
+            waited = time.perf_counter() - self.login_started
+            info = self.font.render(f"Signing in as {self.username}... {waited:.1f}s (ESC to cancel)",
+                                    True, (255, 215, 0))
+        elif self.login_message:
+            info = self.font.render(self.login_message, True, (255, 100, 100))
+        else:
+            info = self.font.render("(Creates/loads your player profile in MySQL)", True, (180, 180, 255))
         self.screen.blit(info, (self.WIDTH//2 - info.get_width()//2, 320))
         
         # Database status
-        status_color = (0, 200, 0) if self.db.connection and self.db.connection.is_connected() else (255, 100, 100)
-        status_text = "MySQL: CONNECTED" if self.db.connection and self.db.connection.is_connected() else "MySQL: DISCONNECTED"
+        status_colors = {"CONNECTED": (0, 200, 0), "CONNECTING": (255, 215, 0)}
+        status_color = status_colors.get(self.db.status, (255, 100, 100))
+        status_text = f"MySQL: {self.db.status}"
         status = self.font.render(status_text, True, status_color)
         self.screen.blit(status, (self.WIDTH//2 - status.get_width()//2, 380))
+        
+        # Suggestions drop down from the input box, over the text below it
+        if self.suggestions and self.game_state == "LOGIN":
+            row_height = 30
+            menu_rect = pygame.Rect(input_rect.x, input_rect.bottom, input_rect.width,
+                                    row_height * len(self.suggestions))
+            pygame.draw.rect(self.screen, (240, 240, 240), menu_rect)
+            for i, name in enumerate(self.suggestions):
+                row_rect = pygame.Rect(menu_rect.x, menu_rect.y + i * row_height, menu_rect.width, row_height)
+                if i == self.suggestion:
+                    pygame.draw.rect(self.screen, (180, 200, 255), row_rect)
+                text_surface = self.font.render(name, True, self.BLACK)
+                self.screen.blit(text_surface, (row_rect.x + 10, row_rect.y + 3))
+            pygame.draw.rect(self.screen, self.BLUE, menu_rect, 1)
     
     def draw_game_over_screen(self):
         """Draw game over screen"""
@@ -301,11 +344,20 @@ class SnakeGame:
         # Score details
         score_text = self.font.render(f"Final Score: {self.score}", True, self.WHITE)
         level_text = self.font.render(f"Level Reached: {self.level}", True, self.WHITE)
-        player_text = self.font.render(f"Player: {self.username}", True, self.BLUE)
+        player_name = f"{self.username} (offline)" if self.offline else self.username
+        player_text = self.font.render(f"Player: {player_name}", True, self.BLUE)
         
         self.screen.blit(score_text, (self.WIDTH//2 - score_text.get_width()//2, 220))
         self.screen.blit(level_text, (self.WIDTH//2 - level_text.get_width()//2, 260))
         self.screen.blit(player_text, (self.WIDTH//2 - player_text.get_width()//2, 300))
+        if self.percentile is not None or self.rank:
+            lines = []
+            if self.rank:
+                lines.append(f"Rank #{self.rank}")
+            if self.percentile is not None:
+                lines.append(f"You beat {self.percentile * 100:.0f}% of all scores")
+            beat_text = self.font.render(" - ".join(lines), True, (255, 215, 0))
+            self.screen.blit(beat_text, (self.WIDTH//2 - beat_text.get_width()//2, 340))
         
         # Instructions
         instructions = [
@@ -326,8 +378,7 @@ class SnakeGame:
         title = self.title_font.render("LEADERBOARD", True, self.GREEN)
         self.screen.blit(title, (self.WIDTH//2 - title.get_width()//2, 30))
         
-        # Get leaderboard data
-        leaderboard = self.db.get_leaderboard(10)
+        leaderboard = self.leaderboard
         
         # Table background
         table_rect = pygame.Rect(50, 100, 700, 400)
@@ -343,7 +394,10 @@ class SnakeGame:
             self.screen.blit(header_text, (x_positions[i], 110))
         
         # Draw scores
-        if not leaderboard:
+        if leaderboard is None:
+            loading = self.font.render("Loading scores...", True, self.WHITE)
+            self.screen.blit(loading, (self.WIDTH//2 - loading.get_width()//2, 200))
+        elif not leaderboard:
             no_data = self.font.render("No scores yet! Be the first to play!", True, self.WHITE)
             self.screen.blit(no_data, (self.WIDTH//2 - no_data.get_width()//2, 200))
         else:
@@ -388,7 +442,12 @@ class SnakeGame:
         
         # Draw deadly walls
         wall_thickness = 4
-        pygame.draw.rect(self.screen, self.WALL_COLOR, (0, 0, self.WIDTH, self.HEIGHT), wall_thickness)
+        wall_x, wall_y = self.to_screen(0, 0)
+        wall_rect = (wall_x, wall_y, self.GRID_WIDTH * self.GRID_SIZE, self.GRID_HEIGHT * self.GRID_SIZE)
+        pygame.draw.rect(self.screen, self.WALL_COLOR, wall_rect, wall_thickness)
+        
+        if self.minimap_surface:
+            self.draw_minimap()
         
         # Game info panel
         info_panel = pygame.Rect(10, 10, 200, 100)
@@ -411,51 +470,286 @@ class SnakeGame:
         self.screen.blit(wall_warning, (self.WIDTH - wall_warning.get_width() - 20, 20))
         
         # Controls reminder
-        controls = self.font.render("Arrow Keys: Move | ESC: Menu", True, self.GRAY)
+        controls = self.font.render("Arrow Keys: Move | F5: Save | F9: Load | ESC: Menu", True, self.GRAY)
         self.screen.blit(controls, (self.WIDTH//2 - controls.get_width()//2, self.HEIGHT - 30))
     
     def handle_login_input(self, event):
         """Handle input during login screen"""
         if event.key == pygame.K_RETURN:
+            if self.suggestion is not None:
+                self.input_text = self.suggestions[self.suggestion]
             if self.input_text.strip():
                 self.username = self.input_text.strip()
                 print(f"🔑 Registering user: {self.username}")
-                self.user_id = self.db.register_user(self.username)
-                if self.user_id:
-                    print(f"✅ User registered with ID: {self.user_id}")
-                    self.game_state = "PLAYING"
-                    self.reset_game()
-                else:
-                    print("❌ Failed to register user")
+                self.start_login()
+        elif event.key in (pygame.K_UP, pygame.K_DOWN):
+            if self.suggestions:
+                step = 1 if event.key == pygame.K_DOWN else -1
+                self.suggestion = (step - 1) // 2 if self.suggestion is None else self.suggestion + step
+                self.suggestion %= len(self.suggestions)
+            return
+        elif event.key == pygame.K_TAB:
+            if self.suggestions:
+                self.input_text = self.suggestions[self.suggestion or 0]
         elif event.key == pygame.K_BACKSPACE:
             self.input_text = self.input_text[:-1]
         elif event.unicode.isprintable() and len(self.input_text) < 20:
             self.input_text += event.unicode
+        else:
+            return
+        self.update_suggestions()
+    
+    def refresh_usernames(self):
+        """Bring the username index up to date on a connection of its own"""
+        db = ServiceClient() if SERVICE_CONFIG['client_mode'] else DatabaseManager()
+        try:
+            self.usernames.refresh(db)
+        finally:
+            db.close()
+    
+    def start_sketch_refresh(self):
+        """Pull new scores into the sketch, unless a pull is already running"""
+        if self.sketch_thread and self.sketch_thread.is_alive():
+            return
+        self.sketch_thread = threading.Thread(target=self.refresh_score_sketch, name="score-sketch", daemon=True)
+        self.sketch_thread.start()
+    
+    def refresh_score_sketch(self):
+        """Scan the scores table on a connection of its own, so saves and leaderboards don't queue behind it"""
+        db = ServiceClient() if SERVICE_CONFIG['client_mode'] else DatabaseManager()
+        try:
+            self.score_sketch.refresh(db)
+        finally:
+            db.close()
+    
+    def update_suggestions(self):
+        """Look up the usernames starting with what has been typed so far"""
+        self.suggestions = self.usernames.matches(self.input_text.strip(), GAME_CONFIG['login_suggestions'])
+        if self.suggestions == [self.input_text.strip()]:
+            self.suggestions = []  # Already typed in full
+        self.suggestion = None
+    
+    def start_login(self):
+        """Register the user on the database worker instead of freezing the window"""
+        self.user_id = None
+        self.pending_scores = []
+        self.login_message = ""
+        self.offline = False
+        
+        if self.journal and self.db.status == "DISCONNECTED":
+            # No point waiting on a database we already know is down
+            self.go_offline("MySQL is down - playing offline")
+            return
+        
+        self.login_future = self.db.submit(self.db.register_user, self.username)
+        self.login_started = time.perf_counter()
+        
+        if GAME_CONFIG['play_during_login']:
+            # Start right away - the user ID is attached when the login finishes
+            self.game_state = "PLAYING"
+            self.reset_game()
+        else:
+            self.game_state = "LOGGING_IN"
+    
+    def check_login(self):
+        """Pick up the result of a background login, or give up after the timeout"""
+        if not self.login_future:
+            return
+        
+        if self.login_future.done():
+            self.user_id = self.login_future.result()
+            self.login_future = None
+            if self.user_id:
+                print(f"✅ User registered with ID: {self.user_id}")
+                self.usernames.add(self.username)
+                if self.game_state == "LOGGING_IN":
+                    self.game_state = "PLAYING"
+                    self.reset_game()
+                for score, level, key in self.pending_scores:
+                    self.save_score(score, level, key)
+                if not self.score_sketch.refreshed:
+                    self.start_sketch_refresh()
+            else:
+                print("❌ Failed to register user")
+                self.login_failed("Could not register user - check MySQL")
+            self.pending_scores = []
+        
+        elif time.perf_counter() - self.login_started > GAME_CONFIG['login_timeout']:
+            # The worker can't be interrupted, but the result is ignored from now on
+            print(f"⏰ Login timed out after {GAME_CONFIG['login_timeout']} seconds")
+            self.login_future = None
+            self.login_failed("Login timed out - is MySQL reachable?")
+            self.pending_scores = []
+    
+    def login_failed(self, message):
+        """Play offline if the journal is on, otherwise go back to the login screen"""
+        if self.journal:
+            self.go_offline(f"{message} - playing offline")
+            return
+        self.login_message = message
+        if self.game_state == "LOGGING_IN":
+            self.game_state = "LOGIN"
+    
+    def go_offline(self, message):
+        """Keep playing without MySQL, journaling the player and their scores"""
+        print(f"📴 {message}")
+        self.login_message = message
+        self.offline = True
+        self.journal.record_registration(self.username)
+        for score, level, key in self.pending_scores:
+            self.journal.record_score(self.username, score, level, key)
+        if self.game_state in ("LOGIN", "LOGGING_IN"):
+            self.game_state = "PLAYING"
+            self.reset_game()
+    
+    def save_score(self, score, level, key):
+        """Save a finished game without blocking the game loop"""
+        if self.user_id:
+            if self.journal:
+                self.finish_future = self.db.submit(self.save_or_journal, self.user_id, self.username,
+                                                    score, level, key)
+            else:
+                self.finish_future = self.db.submit(self.db.finish_game, self.user_id, score, level, key)
+        elif self.login_future:
+            self.pending_scores.append((score, level, key))
+        elif self.offline:
+            self.journal.record_score(self.username, score, level, key)
+            print("📒 Score kept in the offline journal")
+    
+    def save_or_journal(self, user_id, username, score, level, key):
+        """Save a score on the worker, journaling it if MySQL dropped out meanwhile"""
+        # The same key goes to MySQL and the journal, so a save that did reach the
+        # database before failing is skipped when the journal is replayed
+        result = self.db.finish_game(user_id, score, level, key)
+        if not result:
+            self.journal.record_score(username, score, level, key)
+            print("📒 Score kept in the offline journal")
+        return result
+    
+    def check_finish(self):
+        """Pick up the rank and top scores that came back with the last saved game"""
+        if self.finish_future and self.finish_future.done():
+            result = self.finish_future.result()
+            self.finish_future = None
+            if result:
+                self.finished_top, self.rank = result
+    
+    def check_journal(self):
+        """Replay the offline journal on the worker every few seconds while it has records"""
+        self.journal.sync_if_due()
+        if self.replay_future:
+            if not self.replay_future.done():
+                return
+            try:
+                user_ids = self.replay_future.result()
+            except Exception as e:
+                # Records stay behind the checkpoint and are retried, the game keeps running
+                print(f"❌ Journal replay failed: {e}")
+                user_ids = {}
+            self.replay_future = None
+            # MySQL matches usernames case-insensitively, so "bob" may come back as "Bob"
+            ids = {name.casefold(): user_id for name, user_id in user_ids.items()}
+            if self.offline and self.username.casefold() in ids:
+                # Back online - later scores go straight to MySQL again
+                self.user_id = ids[self.username.casefold()]
+                self.offline = False
+                self.login_message = ""
+                print(f"✅ Back online, user {self.username} has ID {self.user_id}")
+        
+        now = time.perf_counter()
+        if self.replay_checked is not None and now - self.replay_checked < JOURNAL_CONFIG['retry_seconds']:
+            return
+        self.replay_checked = now
+        if self.journal.has_pending():
+            self.replay_future = self.db.submit(self.journal.replay, self.db)
+    
+    def show_leaderboard(self):
+        """Open the leaderboard and fetch the top scores on the database worker"""
+        self.game_state = "LEADERBOARD"
+        if self.finished_top is not None:
+            # finish_game already brought back the top scores, this game included
+            self.leaderboard, self.finished_top = self.finished_top, None
+            return
+        self.leaderboard = None
+        self.leaderboard_future = self.db.submit(self.db.get_leaderboard, 10)
+    
+    def check_leaderboard(self):
+        """Pick up the top scores once the worker has them"""
+        if self.leaderboard_future and self.leaderboard_future.done():
+            self.leaderboard = self.leaderboard_future.result()
+            self.leaderboard_future = None
+    
+    def screen_view(self):
+        """Everything the current menu screen shows - it is repainted when this changes"""
+        view = (self.game_state, self.input_text, tuple(self.suggestions), self.suggestion,
+                self.login_message, self.db.status, self.username, self.score, self.level, self.offline, self.leaderboard, self.rank)
+        if self.game_state == "LOGGING_IN":
+            view += (int((time.perf_counter() - self.login_started) * 10),)  # Tenths on the wait timer
+        return view
+    
+    def wait_for_events(self):
+        """Sleep until input arrives or it's time to check on the background work"""
+        timeout = 100 if self.game_state == "LOGGING_IN" else GAME_CONFIG['idle_wait_ms']
+        event = pygame.event.wait(timeout)
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+    
+    def report_startup(self):
+        """Print how long it took to get the first frame on screen"""
+        self.startup_marks.append(("first frame", time.perf_counter()))
+        previous = STARTED
+        phases = []
+        for name, mark in self.startup_marks:
+            phases.append(f"{name} {(mark - previous) * 1000:.0f} ms")
+            previous = mark
+        total = (previous - STARTED) * 1000
+        budget = GAME_CONFIG['startup_budget_ms']
+        print(f"⏱️  First frame after {total:.0f} ms ({', '.join(phases)})")
+        if total > budget:
+            print(f"⚠️  Startup went over its {budget} ms budget")
+        self.startup_marks = None
     
     def run(self):
         """Main game loop"""
         running = True
         
         while running:
-            for event in pygame.event.get():
+            if self.game_state != "PLAYING" and self.drawn_view == self.screen_view():
+                # Nothing new to show on a menu screen, so block instead of spinning at 60 FPS
+                events = self.wait_for_events()
+            else:
+                events = pygame.event.get()
+            
+            for event in events:
                 if event.type == pygame.QUIT:
                     running = False
                 
+                elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    self.drawn_view = None  # The window was uncovered and needs repainting
+                
                 elif event.type == pygame.KEYDOWN:
                     # Handle login screen
                     if self.game_state == "LOGIN":
                         self.handle_login_input(event)
                     
+                    # Waiting for the database - ESC goes back to the login screen
+                    elif self.game_state == "LOGGING_IN":
+                        if event.key == pygame.K_ESCAPE:
+                            self.login_future = None
+                            self.game_state = "LOGIN"
+                    
                     # Handle game over screen
                     elif self.game_state == "GAME_OVER":
                         if event.key == pygame.K_SPACE:
                             self.game_state = "PLAYING"
                             self.reset_game()
                         elif event.key == pygame.K_l:
-                            self.game_state = "LEADERBOARD"
+                            self.show_leaderboard()
                         elif event.key == pygame.K_ESCAPE:
                             self.game_state = "LOGIN"
                             self.input_text = ""
+                            self.update_suggestions()
                     
                     # Handle leaderboard screen
                     elif self.game_state == "LEADERBOARD":
@@ -467,45 +761,89 @@ class SnakeGame:
                     
                     # Handle game controls
                     elif self.game_state == "PLAYING":
-                        if event.key == pygame.K_UP and self.direction != (0, 1):
-                            self.direction = (0, -1)
-                        elif event.key == pygame.K_DOWN and self.direction != (0, -1):
-                            self.direction = (0, 1)
-                        elif event.key == pygame.K_LEFT and self.direction != (1, 0):
-                            self.direction = (-1, 0)
-                        elif event.key == pygame.K_RIGHT and self.direction != (-1, 0):
-                            self.direction = (1, 0)
+                        if event.key in self.turn_keys:
+                            self.inputs.push(self.turn_keys[event.key], self.direction, time.perf_counter())
+                        elif event.key == pygame.K_F5:
+                            self.save_game()
+                        elif event.key == pygame.K_F9:
+                            self.resume_game()
                         elif event.key == pygame.K_ESCAPE:
+                            # Quitting isn't a finished game, so there is no rank to show
+                            self.rank = None
+                            self.percentile = None
+                            self.finished_top = None
                             self.game_state = "GAME_OVER"
             
-            # Update game state if playing
-            if self.game_state == "PLAYING":
-                if not self.update_snake():
+            # Update game state if playing - input is polled faster than the game ticks
+            stepped = False
+            now = time.perf_counter()
+            if self.game_state == "PLAYING" and now >= self.next_step:
+                stepped = True
+                interval = 1 / self.speed
+                # Keep a steady tick rate, but don't rush to catch up after a stall
+                self.next_step = self.next_step + interval if now - self.next_step < interval else now + interval
+                turn = self.inputs.pop()
+                if turn:
+                    self.direction = turn[0]
+                alive = self.update_snake()
+                if turn:
+                    self.inputs.applied(turn[1], time.perf_counter())
+                if not alive:
                     # Game over - save score
                     print(f"💀 Game Over! Score: {self.score}, Level: {self.level}")
-                    if self.user_id:
-                        saved = self.db.save_score(self.user_id, self.score, self.level)
-                        if saved:
-                            print("✅ Score saved to MySQL database")
+                    self.inputs.report()
+                    self.percentile = self.score_sketch.fraction_below(self.score)
+                    self.rank = None
+                    self.finished_top = None
+                    # One key follows the game to MySQL or the journal, and back through the sketch
+                    key = ScoreJournal.new_key()
+                    self.score_sketch.add(self.score, key)
+                    self.save_score(self.score, self.level, key)
+                    if time.monotonic() - self.score_sketch.refreshed > GAME_CONFIG['sketch_refresh']:
+                        self.start_sketch_refresh()
                     self.game_state = "GAME_OVER"
             
-            # Draw current screen
-            if self.game_state == "LOGIN":
-                self.draw_login_screen()
-            elif self.game_state == "PLAYING":
+            self.check_login()
+            self.check_leaderboard()
+            self.check_finish()
+            if self.journal:
+                self.check_journal()
+            
+            # Draw current screen - menus keep the last frame on screen until something changes
+            if self.game_state == "PLAYING":
+                if not stepped and self.drawn_view == "PLAYING":
+                    # The board hasn't moved since the last frame - just poll input again
+                    self.clock.tick(GAME_CONFIG['input_poll_hz'])
+                    continue
                 self.draw_game()
-            elif self.game_state == "GAME_OVER":
-                self.draw_game_over_screen()
-            elif self.game_state == "LEADERBOARD":
-                self.draw_leaderboard()
+                self.drawn_view = "PLAYING"
+            else:
+                view = self.screen_view()
+                if view == self.drawn_view:
+                    continue
+                if self.game_state in ("LOGIN", "LOGGING_IN"):
+                    self.draw_login_screen()
+                elif self.game_state == "GAME_OVER":
+                    self.draw_game_over_screen()
+                elif self.game_state == "LEADERBOARD":
+                    self.draw_leaderboard()
+                self.drawn_view = view
             
             pygame.display.flip()
+            if self.startup_marks:
+                self.report_startup()
             
-            # Control game speed
-            self.clock.tick(self.speed if self.game_state == "PLAYING" else 60)
+            # Poll input at a fixed rate while playing, the ticks are timed by next_step
+            if self.game_state == "PLAYING":
+                self.clock.tick(GAME_CONFIG['input_poll_hz'])
         
         # Cleanup
         self.db.close()
+        if self.obstacles:
+            self.obstacles.close()
+        if self.journal:
+            self.journal.report()
+            self.journal.close()
         pygame.quit()
 
 if __name__ == "__main__":
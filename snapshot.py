@@ -0,0 +1,106 @@
+"""
+Versioned binary snapshots of a SnakeEngine
+Used for mid-game save/resume and for sending a game to spectators.
+
+Layout (little-endian):
+    header  - magic, version, body encoding, board size, score, level, speed,
+              direction, food, head sequence number and body length
+    body    - MOVES: head x, y then one direction code per segment, taken straight
+              from the engine's move log (oldest first), so encoding is a slice copy
+              RAW: x, y as uint16 pairs, head first, for engines without a move log
+"""
+
+import struct
+from collections import deque
+from itertools import chain
+from world import DIRECTIONS
+
+MAGIC = b'SNKS'
+VERSION = 1
+
+MOVES = 0
+RAW = 1
+
+HEADER = struct.Struct('<4sBBHHIHHBHHII')
+CELL = struct.Struct('<HH')
+
+
+def encode(engine, encoding=MOVES):
+    """Pack the engine's state into bytes"""
+    body = engine.snake
+    length = len(body)
+    header = HEADER.pack(MAGIC, VERSION, encoding, engine.GRID_WIDTH, engine.GRID_HEIGHT,
+                         engine.score, engine.level, engine.speed, DIRECTIONS.index(engine.direction),
+                         engine.food[0], engine.food[1], engine.head_seq, length)
+    if encoding == MOVES:
+        moves = engine.moves[len(engine.moves) - (length - 1):]
+        return b''.join((header, CELL.pack(*body[0]), moves))
+    if encoding == RAW:
+        return header + struct.pack(f'<{2 * length}H', *chain.from_iterable(body))
+    raise ValueError(f"Unknown snapshot encoding: {encoding}")
+
+
+def decode_into(engine, data):
+    """Load a snapshot into an engine with the same board size"""
+    # Reads straight from the buffer through a memoryview, so bytes, bytearray
+    # and mmap objects are never copied before the body is rebuilt
+    view = memoryview(data)
+    if len(view) < HEADER.size:
+        raise ValueError("Snapshot is truncated")
+    (magic, version, encoding, width, height, score, level, speed, direction,
+     food_x, food_y, head_seq, length) = HEADER.unpack_from(view)
+
+    if magic != MAGIC:
+        raise ValueError("Not a snake snapshot")
+    if version != VERSION:
+        raise ValueError(f"Unsupported snapshot version: {version}")
+    if (width, height) != (engine.GRID_WIDTH, engine.GRID_HEIGHT):
+        raise ValueError(f"Snapshot is for a {width}x{height} board")
+    if direction >= len(DIRECTIONS) or not length or head_seq < length:
+        raise ValueError("Snapshot header is corrupted")
+    if food_x >= width or food_y >= height:
+        raise ValueError("Snapshot food is off the board")
+
+    # The body is rebuilt and checked before the engine is touched, so a bad file changes nothing
+    offset = HEADER.size
+    if encoding == MOVES:
+        if len(view) != offset + CELL.size + length - 1:
+            raise ValueError("Snapshot is truncated")
+        # Walk back from the head, undoing the newest move first
+        x, y = CELL.unpack_from(view, offset)
+        moves = view[offset + CELL.size:]
+        body = deque([(x, y)])
+        for code in reversed(moves):
+            if code >= len(DIRECTIONS):
+                raise ValueError(f"Bad move code in snapshot: {code}")
+            dx, dy = DIRECTIONS[code]
+            x -= dx
+            y -= dy
+            body.append((x, y))
+    elif encoding == RAW:
+        if len(view) != offset + length * CELL.size:
+            raise ValueError("Snapshot is truncated")
+        cells = struct.unpack_from(f'<{2 * length}H', view, offset)
+        body = deque(zip(cells[0::2], cells[1::2]))
+        moves = None
+    else:
+        raise ValueError(f"Unknown snapshot encoding: {encoding}")
+    if any(not (0 <= x < width and 0 <= y < height) for x, y in body):
+        raise ValueError("Snapshot snake is off the board")
+    if len(set(body)) != length:
+        raise ValueError("Snapshot snake crosses itself")
+
+    engine.load_state(body, DIRECTIONS[direction], (food_x, food_y), score, level, speed,
+                      head_seq, moves)
+
+
+def save(engine, path, encoding=MOVES):
+    """Write a snapshot to disk"""
+    with open(path, 'wb') as f:
+        f.write(encode(engine, encoding))
+
+
+def load(engine, path):
+    """Resume a game from a snapshot on disk"""
+    with open(path, 'rb') as f:
+        decode_into(engine, f.read())
@@ -0,0 +1,116 @@
+"""
+Pre-rendered snake tiles
+Body segments are shaded from a bright head to a darker tail. Instead of working out the
+shade and drawing two rectangles per segment every frame, the shades are quantized into
+buckets and baked once into a single atlas surface, so a whole body is one Surface.blits call.
+"""
+
+import pygame
+from world import DIRECTIONS
+
+class SegmentAtlas:
+    def __init__(self, size, color, head_border=(0, 150, 0), body_border=(0, 100, 0)):
+        self.size = size
+        self.color = color
+        self.head_border = head_border
+        self.body_border = body_border
+        self.buckets = 0
+        self.surface = None
+        self.body_areas = []  # Atlas rect of each shade, brightest first
+        self.head_areas = []  # Atlas rect of the head facing each direction code
+        self.builds = 0
+
+    def ensure(self, buckets):
+        """Rebuild the atlas if the number of shades changed"""
+        if buckets != self.buckets:
+            self.build(buckets)
+
+    def build(self, buckets):
+        """Bake one tile per shade plus a head tile per direction"""
+        size = self.size
+        self.buckets = buckets
+        self.surface = pygame.Surface(((buckets + len(DIRECTIONS)) * size, size))
+        if pygame.display.get_surface():
+            self.surface = self.surface.convert()  # Match the screen format so blits don't convert
+
+        self.body_areas = []
+        for bucket in range(buckets):
+            # Same falloff as before, sampled at the start of each bucket
+            gradient = max(0.3, 1.0 - (bucket / buckets * 0.7))
+            shade = tuple(int(channel * gradient) for channel in self.color)
+            area = pygame.Rect(bucket * size, 0, size, size)
+            pygame.draw.rect(self.surface, shade, area)
+            pygame.draw.rect(self.surface, self.body_border, area, 1)
+            self.body_areas.append(area)
+
+        self.head_areas = []
+        eye = max(2, size // 6)
+        for code, (dx, dy) in enumerate(DIRECTIONS):
+            area = pygame.Rect((buckets + code) * size, 0, size, size)
+            pygame.draw.rect(self.surface, self.color, area)
+            pygame.draw.rect(self.surface, self.head_border, area, 1)
+            # Eyes on the leading half, side by side across the direction of travel
+            front_x = area.centerx + dx * size // 4
+            front_y = area.centery + dy * size // 4
+            for side in (-1, 1):
+                eye_x = front_x + dy * side * size // 5
+                eye_y = front_y + dx * side * size // 5
+                pygame.draw.rect(self.surface, (0, 0, 0), (eye_x - eye // 2, eye_y - eye // 2, eye, eye))
+            self.head_areas.append(area)
+        self.builds += 1
+
+class Background:
+    """Grid lines and walls baked into chunks of the world, built when first scrolled into view"""
+    def __init__(self, size, line_color, wall_color, obstacles=None, chunk=32, max_chunks=64):
+        self.size = size
+        self.line_color = line_color
+        self.wall_color = wall_color
+        self.obstacles = obstacles
+        self.chunk = chunk  # Chunk width and height in cells
+        self.max_chunks = max_chunks  # Oldest chunks are dropped past this, for huge boards
+        self.chunks = {}  # (chunk x, chunk y) -> Surface
+        self.builds = 0
+
+    def build(self, chunk_x, chunk_y):
+        """Draw the grid lines and walls of one chunk"""
+        size = self.size
+        span = self.chunk * size
+        surface = pygame.Surface((span, span))
+        if pygame.display.get_surface():
+            surface = surface.convert()
+        for i in range(0, span, size):
+            pygame.draw.line(surface, self.line_color, (i, 0), (i, span), 1)
+            pygame.draw.line(surface, self.line_color, (0, i), (span, i), 1)
+
+        obstacles = self.obstacles
+        if obstacles:
+            left, top = chunk_x * self.chunk, chunk_y * self.chunk
+            for y in range(top, min(top + self.chunk, obstacles.height)):
+                for x in range(left, min(left + self.chunk, obstacles.width)):
+                    if obstacles.is_wall(x, y):
+                        surface.fill(self.wall_color, ((x - left) * size + 1, (y - top) * size + 1,
+                                                       size - 1, size - 1))
+        self.builds += 1
+        return surface
+
+    def draw(self, screen, camera):
+        """Blit the chunks under the camera, building any that are missing"""
+        tiles = []
+        for chunk_y in range(camera.y // self.chunk, (camera.y + camera.rows - 1) // self.chunk + 1):
+            for chunk_x in range(camera.x // self.chunk, (camera.x + camera.cols - 1) // self.chunk + 1):
+                key = (chunk_x, chunk_y)
+                surface = self.chunks.pop(key, None)
+                if surface is None:
+                    surface = self.build(chunk_x, chunk_y)
+                    if len(self.chunks) >= self.max_chunks:
+                        del self.chunks[next(iter(self.chunks))]
+                self.chunks[key] = surface  # Re-inserted, so the dict stays in least recently used order
+                position = ((chunk_x * self.chunk - camera.x) * self.size,
+                            (chunk_y * self.chunk - camera.y) * self.size)
+                tiles.append((surface, position))
+        # Only the visible part of the world - chunks past its edge would draw lines outside the walls
+        view = pygame.Rect(0, 0, camera.cols * self.size, camera.rows * self.size)
+        clip = screen.get_clip()
+        screen.set_clip(view.clip(clip))
+        screen.blits(tiles, doreturn=False)
+        screen.set_clip(clip)
@@ -0,0 +1,208 @@
+"""
+Compact single-player game state for search bots
+A GameState holds only the rules state - no pygame, fonts or database - and can be cloned
+in O(1) and stepped forward and back, so MCTS or beam search can branch thousands of times
+per decision without copy.deepcopy.
+
+The body is a window [tail, head) into an append-only log of cell indices (y * width + x)
+that clones share. A state only writes to the log while it is the log's owner; cloning
+takes ownership away from both copies, and the first one to move somewhere else copies
+its window into a fresh log (copy-on-write). Moves that agree with the shared log just
+advance the window. The occupancy grid behind collision checks is shared the same way.
+"""
+
+from array import array
+from engine import SnakeEngine
+from world import DIRECTIONS
+
+MASK64 = (1 << 64) - 1
+
+
+class BodyLog:
+    """Append-only array of cell indices shared between cloned states"""
+    __slots__ = ('cells', 'base', 'owner')
+
+    def __init__(self, cells, base=0, owner=None):
+        self.cells = cells
+        self.base = base     # Log position of cells[0], so compaction keeps positions valid
+        self.owner = owner   # The only state allowed to write, None once shared
+
+
+class Occupancy:
+    """One byte per board cell, 1 where the body is, shared between cloned states"""
+    __slots__ = ('cells', 'owner')
+
+    def __init__(self, cells, owner=None):
+        self.cells = cells
+        self.owner = owner   # The only state allowed to write, None once shared
+
+
+class GameState:
+    __slots__ = ('width', 'height', 'log', 'grid', 'tail', 'head', 'direction', 'food',
+                 'score', 'level', 'speed', 'seed', 'alive', 'history')
+
+    def __init__(self, width, height, body, direction=3, food=None, score=0, level=1,
+                 speed=10, seed=1):
+        """body is a list of (x, y) cells, head first; direction is a world.DIRECTIONS code"""
+        self.width = width
+        self.height = height
+        cells = array('I', (y * width + x for x, y in reversed(body)))
+        self.log = BodyLog(cells, owner=self)
+        self.grid = Occupancy(bytearray(width * height), owner=self)
+        for cell in cells:
+            self.grid.cells[cell] = 1
+        self.tail = 0
+        self.head = len(cells)  # One past the head's log position
+        self.direction = direction
+        self.score = score
+        self.level = level
+        self.speed = speed
+        self.seed = seed & MASK64  # Food placement RNG, so every branch is reproducible
+        self.alive = True
+        self.history = []  # Undo records, one per step since the last clone or forget()
+        self.food = food[1] * width + food[0] if food else self.place_food()
+
+    @classmethod
+    def from_engine(cls, engine, seed=1):
+        """Capture the rules state of a SnakeEngine (or a running SnakeGame)"""
+        return cls(engine.GRID_WIDTH, engine.GRID_HEIGHT, list(engine.snake),
+                   DIRECTIONS.index(engine.direction), engine.food, engine.score,
+                   engine.level, engine.speed, seed)
+
+    def clone(self):
+        """Branch the state in O(1) - the body log is shared until one side diverges"""
+        other = GameState.__new__(GameState)
+        other.width = self.width
+        other.height = self.height
+        other.log = self.log
+        other.grid = self.grid
+        other.tail = self.tail
+        other.head = self.head
+        other.direction = self.direction
+        other.food = self.food
+        other.score = self.score
+        other.level = self.level
+        other.speed = self.speed
+        other.seed = self.seed
+        other.alive = self.alive
+        other.history = []
+        self.log.owner = None
+        self.grid.owner = None
+        return other
+
+    def __len__(self):
+        return self.head - self.tail
+
+    def head_cell(self):
+        """Get the head as (x, y)"""
+        return divmod(self.log.cells[self.head - 1 - self.log.base], self.width)[::-1]
+
+    def food_cell(self):
+        """Get the food as (x, y)"""
+        return divmod(self.food, self.width)[::-1]
+
+    def body(self):
+        """Get the body as (x, y) cells, head first"""
+        log = self.log
+        window = log.cells[self.tail - log.base:self.head - log.base]
+        return [divmod(cell, self.width)[::-1] for cell in reversed(window)]
+
+    def occupied(self, cell):
+        """Check if a cell index is part of the body"""
+        return self.grid.cells[cell]
+
+    def writable_grid(self):
+        """Get the occupancy cells to change, copying them first while a clone shares them"""
+        if self.grid.owner is not self:
+            self.grid = Occupancy(bytearray(self.grid.cells), owner=self)
+        return self.grid.cells
+
+    def is_safe(self, x, y):
+        """Check if the head could move onto a cell, for bots.greedy_direction"""
+        return 0 <= x < self.width and 0 <= y < self.height and not self.occupied(y * self.width + x)
+
+    def place_food(self):
+        """Pick a free cell with the state's own RNG (64-bit LCG)"""
+        cells = self.width * self.height
+        while True:
+            self.seed = (self.seed * 6364136223846793005 + 1442695040888963407) & MASK64
+            cell = (self.seed >> 33) % cells
+            if not self.occupied(cell):
+                return cell
+
+    def step(self, direction=None):
+        """Move one cell (optionally turning first) with the engine's rules; returns alive"""
+        if not self.alive:
+            return False
+        log = self.log
+        self.history.append((log, self.tail, self.head, self.direction, self.food,
+                             self.score, self.level, self.speed, self.seed))
+        if direction is not None:
+            self.direction = direction
+
+        head = log.cells[self.head - 1 - log.base]
+        y, x = divmod(head, self.width)
+        dx, dy = DIRECTIONS[self.direction]
+        x += dx
+        y += dy
+        cell = y * self.width + x
+        if not (0 <= x < self.width and 0 <= y < self.height) or self.occupied(cell):
+            self.alive = False
+            return False
+
+        tail = log.cells[self.tail - log.base]
+        self.advance(cell)
+        grid = self.writable_grid()
+        grid[cell] = 1
+        if cell == self.food:
+            self.score += 10
+            self.food = self.place_food()
+            if self.score % SnakeEngine.LEVEL_POINTS == 0:
+                self.level += 1
+                self.speed += SnakeEngine.SPEED_STEP
+        else:
+            grid[tail] = 0
+            self.tail += 1
+        return True
+
+    def advance(self, cell):
+        """Put a new head cell after the current head, copying the body if the log is shared"""
+        log = self.log
+        position = self.head - log.base
+        cells = log.cells
+        if log.owner is self:
+            if position < len(cells):
+                del cells[position:]  # Left over from undone moves
+            cells.append(cell)
+            if len(self.history) == 1 and self.tail - log.base > 4096:
+                self.compact()
+        elif position < len(cells) and cells[position] == cell:
+            pass  # Another branch already made this exact move - keep sharing
+        else:
+            window = cells[self.tail - log.base:position]
+            window.append(cell)
+            self.log = BodyLog(window, base=self.tail, owner=self)
+        self.head += 1
+
+    def compact(self):
+        """Drop log entries behind the tail (only while there is nothing to undo)"""
+        log = self.log
+        del log.cells[:self.tail - log.base]
+        log.base = self.tail
+
+    def undo(self):
+        """Take back the last step (copying nothing unless a clone shares the grid)"""
+        (log, tail, head, self.direction, self.food,
+         self.score, self.level, self.speed, self.seed) = self.history.pop()
+        if self.head != head:
+            # Put the head and tail cells of the grid back as they were
+            cells = self.writable_grid()
+            cells[self.log.cells[self.head - 1 - self.log.base]] = 0
+            if self.tail != tail:
+                cells[log.cells[tail - log.base]] = 1
+        self.log, self.tail, self.head = log, tail, head
+        self.alive = True
+
+    def forget(self):
+        """Drop the undo records, e.g. before a long random rollout"""
+        self.history.clear()
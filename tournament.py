@@ -0,0 +1,219 @@
+"""
+Headless bot tournament
+Plays many games of the single-player rules with a greedy bot across a pool of worker
+processes, to see how the speed and level-up settings shape score and level distributions.
+Each game is seeded from its number, so a tournament gives the same results on any number
+of workers. Results stream back in batches through a bounded queue and are aggregated as
+they arrive; they can also be saved to the leaderboard through a batched writer.
+    python tournament.py --games 20000 --workers 8
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue
+import random
+import threading
+import time
+from collections import Counter
+from bots import greedy_direction
+from config import GAME_CONFIG
+from engine import SnakeEngine
+
+RESULT_BATCH = 64  # Games per message from a worker, so the queue isn't hit once per game
+
+def play_game(engine, seed, args):
+    """Play one game with the greedy bot and return (score, level, ticks)"""
+    random.seed(seed)  # The engine places food with the global random module
+    rng = random.Random(seed)
+    engine.reset_game()
+    world = engine.world
+    is_safe = lambda x, y: world.in_bounds(x, y) and world.is_free(x, y)
+    max_ticks = args.max_ticks or 20 * world.width * world.height
+    ticks = 0
+    while ticks < max_ticks:
+        # The bot fumbles more as the game speeds up, which is what makes speed matter
+        if rng.random() >= args.slip * engine.speed:
+            engine.direction = greedy_direction(engine.snake[0], engine.direction,
+                                                engine.food, is_safe)
+        ticks += 1
+        if not engine.update_snake():
+            break
+    return engine.score, engine.level, ticks
+
+def worker(number, args, results):
+    """Play every workers-th game starting at this worker's number"""
+    engine = SnakeEngine(args.width, args.height)
+    engine.LEVEL_POINTS = args.level_points
+    engine.SPEED_STEP = args.speed_step
+    batch = []
+    for game in range(number, args.games, args.workers):
+        batch.append(play_game(engine, args.seed + game, args))
+        if len(batch) >= RESULT_BATCH:
+            results.put(batch)  # Blocks while the queue is full, so workers never run far ahead
+            batch = []
+    if batch:
+        results.put(batch)
+    results.put(None)
+
+class Aggregate:
+    """Running totals that never keep individual games"""
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self.games = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Welford's sum of squared differences
+        self.best = 0
+        self.ticks = 0
+        self.scores = Counter()  # Score bucket -> games
+        self.levels = Counter()
+
+    def add(self, score, level, ticks):
+        self.games += 1
+        delta = score - self.mean
+        self.mean += delta / self.games
+        self.m2 += delta * (score - self.mean)
+        self.best = max(self.best, score)
+        self.ticks += ticks
+        self.scores[score // self.bucket * self.bucket] += 1
+        self.levels[level] += 1
+
+    def stddev(self):
+        return (self.m2 / (self.games - 1)) ** 0.5 if self.games > 1 else 0.0
+
+    def report(self):
+        print(f"\n🏁 {self.games} games: mean score {self.mean:.1f} ± {self.stddev():.1f}, "
+              f"best {self.best}, {self.ticks / max(self.games, 1):.0f} ticks per game")
+        width = 40
+        most = max(self.scores.values(), default=1)
+        print("\nScore distribution:")
+        for start in sorted(self.scores):
+            count = self.scores[start]
+            print(f"   {start:>5}-{start + self.bucket - 1:<5} {count:>7} {'█' * max(1, count * width // most)}")
+        print("\nLevels reached:")
+        for level in sorted(self.levels):
+            count = self.levels[level]
+            print(f"   level {level:>3} {count:>7} ({count / self.games * 100:5.1f}%)")
+
+class ScoreWriter:
+    """Saves results to the leaderboard in batches on a background thread"""
+    def __init__(self, db, user_id, batch_size):
+        self.db = db
+        self.user_id = user_id
+        self.batch_size = batch_size
+        self.rows = queue.Queue(maxsize=batch_size * 8)
+        self.saved = 0
+        self.failed = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def add(self, score, level):
+        self.rows.put((self.user_id, score, level))
+
+    def run(self):
+        done = False
+        while not done:
+            batch = [self.rows.get()]
+            while len(batch) < self.batch_size and batch[-1] is not None:
+                try:
+                    batch.append(self.rows.get(timeout=0.5))
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                batch.pop()
+                done = True
+            if batch:
+                if self.db.save_scores(batch):
+                    self.saved += len(batch)
+                else:
+                    self.failed += len(batch)
+
+    def close(self):
+        self.rows.put(None)
+        self.thread.join()
+        print(f"💾 {self.saved} results saved to the leaderboard"
+              + (f", {self.failed} failed" if self.failed else ""))
+
+def open_writer(args):
+    """Register the tournament's bot player and start the batched writer"""
+    from database import DatabaseManager
+    if args.local_db:
+        import localdb
+        db = DatabaseManager(connector=localdb, config={'database': args.local_db})
+    else:
+        db = DatabaseManager()
+    user_id = db.register_user(args.save_as)
+    if not user_id:
+        print("❌ Could not register the bot player - results won't be saved")
+        db.close()
+        return None, None
+    return db, ScoreWriter(db, user_id, args.db_batch)
+
+def run(args):
+    """Run the tournament and return its Aggregate"""
+    results = multiprocessing.Queue(maxsize=4 * args.workers)
+    processes = [multiprocessing.Process(target=worker, args=(number, args, results), daemon=True)
+                 for number in range(args.workers)]
+    aggregate = Aggregate(args.bucket)
+    db, writer = open_writer(args) if args.save_as else (None, None)
+
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    running = len(processes)
+    next_progress = start + 5
+    while running:
+        try:
+            batch = results.get(timeout=1)
+        except queue.Empty:
+            if not any(process.is_alive() for process in processes):
+                print("❌ Workers stopped without finishing - see the errors above")
+                break
+            continue
+        if batch is None:
+            running -= 1
+            continue
+        for score, level, ticks in batch:
+            aggregate.add(score, level, ticks)
+            if writer:
+                writer.add(score, level)
+        if time.perf_counter() >= next_progress:
+            next_progress += 5
+            print(f"   {aggregate.games}/{args.games} games...")
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+
+    aggregate.report()
+    print(f"\n⚡ {aggregate.games / elapsed:.0f} games/s on {args.workers} workers "
+          f"({aggregate.games / elapsed / args.workers:.0f} per worker) in {elapsed:.1f}s")
+    if writer:
+        writer.close()
+        db.close()
+    return aggregate
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a headless bot tournament")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=1, help="Game n is seeded with seed + n")
+    parser.add_argument("--width", type=int, default=GAME_CONFIG['world_width'])
+    parser.add_argument("--height", type=int, default=GAME_CONFIG['world_height'])
+    parser.add_argument("--level-points", type=int, default=SnakeEngine.LEVEL_POINTS,
+                        help="Points per level up")
+    parser.add_argument("--speed-step", type=int, default=SnakeEngine.SPEED_STEP,
+                        help="Speed added per level")
+    parser.add_argument("--slip", type=float, default=0.001,
+                        help="Chance per tick per point of speed that the bot misses a turn")
+    parser.add_argument("--max-ticks", type=int, default=0, help="End long games (0 = 20 per cell)")
+    parser.add_argument("--bucket", type=int, default=50, help="Score histogram bucket width")
+    parser.add_argument("--save-as", metavar="USERNAME", help="Save results to the leaderboard as this player")
+    parser.add_argument("--local-db", metavar="PATH", help="Save to a local sqlite stand-in instead of MySQL")
+    parser.add_argument("--db-batch", type=int, default=500, help="Results per database transaction")
+    args = parser.parse_args()
+
+    print("="*60)
+    print(f"TOURNAMENT - {args.games} games on {args.width}x{args.height}, {args.workers} workers")
+    print(f"Level up every {args.level_points} points, +{args.speed_step} speed per level")
+    print("="*60)
+    run(args)
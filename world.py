@@ -0,0 +1,91 @@
+"""
+World grid, spatial index and camera for the Snake Game
+The board is stored as a flat array of cells so lookups cost O(1) on any board size
+"""
+
+from array import array
+
+# Up, down, left, right - the index of a direction is its compact code
+DIRECTIONS = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+
+
+class Minimap:
+    """Downsampled occupancy buffer - one RGB pixel per block of scale x scale cells"""
+
+    def __init__(self, world_width, world_height, max_size, color):
+        self.scale = max(1, -(-max(world_width, world_height) // max_size))  # Ceiling division
+        self.width = -(-world_width // self.scale)
+        self.height = -(-world_height // self.scale)
+        self.color = bytes(color)
+        self.counts = array('I', [0]) * (self.width * self.height)
+        self.pixels = bytearray(self.width * self.height * 3)  # RGB buffer, shared with pygame
+
+    def add(self, x, y):
+        """Count an occupied cell and light its block on first use"""
+        block = (y // self.scale) * self.width + x // self.scale
+        self.counts[block] += 1
+        if self.counts[block] == 1:
+            self.pixels[block * 3:block * 3 + 3] = self.color
+
+    def remove(self, x, y):
+        """Uncount an occupied cell and clear its block when it becomes empty"""
+        block = (y // self.scale) * self.width + x // self.scale
+        self.counts[block] -= 1
+        if self.counts[block] == 0:
+            self.pixels[block * 3:block * 3 + 3] = b'\x00\x00\x00'
+
+
+class World:
+    """Board of width x height cells with an occupancy index over snake segments"""
+
+    def __init__(self, width, height, minimap_size=0, minimap_color=(50, 205, 50)):
+        self.width = width
+        self.height = height
+        # 0 = empty, anything else = the value stored by the owner of the cell
+        self.cells = array('I', [0]) * (width * height)
+        self.minimap = Minimap(width, height, minimap_size, minimap_color) if minimap_size else None
+
+    def in_bounds(self, x, y):
+        """Check if a cell is inside the walls"""
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_free(self, x, y):
+        """Check if a cell inside the walls is empty"""
+        return not self.cells[y * self.width + x]
+
+    def get(self, x, y):
+        """Get the value stored in a cell (0 when empty)"""
+        return self.cells[y * self.width + x]
+
+    def occupy(self, x, y, value):
+        """Mark a cell as occupied with a non-zero value"""
+        self.cells[y * self.width + x] = value
+        if self.minimap:
+            self.minimap.add(x, y)
+
+    def vacate(self, x, y):
+        """Mark a cell as empty"""
+        self.cells[y * self.width + x] = 0
+        if self.minimap:
+            self.minimap.remove(x, y)
+
+
+class Camera:
+    """Viewport onto the world, measured in cells, that follows a target cell"""
+
+    def __init__(self, cols, rows, world_width, world_height):
+        self.cols = min(cols, world_width)
+        self.rows = min(rows, world_height)
+        self.world_width = world_width
+        self.world_height = world_height
+        self.x = 0
+        self.y = 0
+
+    def follow(self, x, y):
+        """Center the viewport on a cell, clamped to the world edges"""
+        self.x = min(max(x - self.cols // 2, 0), self.world_width - self.cols)
+        self.y = min(max(y - self.rows // 2, 0), self.world_height - self.rows)
+
+    def contains(self, x, y):
+        """Check if a world cell is inside the viewport"""
+        return self.x <= x < self.x + self.cols and self.y <= y < self.y + self.rows